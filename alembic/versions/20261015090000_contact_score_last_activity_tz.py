@@ -0,0 +1,34 @@
+"""Store contact_scores.last_activity_at with time zone
+
+Revision ID: 20261015090000
+Revises: whatsapp_v1
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '20261015090000'
+down_revision = 'whatsapp_v1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('contact_scores') as batch_op:
+        batch_op.alter_column(
+            'last_activity_at',
+            type_=sa.DateTime(timezone=True),
+            existing_type=sa.DateTime(),
+            existing_nullable=True,
+            postgresql_using="last_activity_at AT TIME ZONE 'UTC'",
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('contact_scores') as batch_op:
+        batch_op.alter_column(
+            'last_activity_at',
+            type_=sa.DateTime(),
+            existing_type=sa.DateTime(timezone=True),
+            existing_nullable=True,
+            postgresql_using="last_activity_at AT TIME ZONE 'UTC'",
+        )
@@ -0,0 +1,33 @@
+"""Add covering index for per-contact email engagement aggregation
+
+Revision ID: 20261015091000
+Revises: 20261015090000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '20261015091000'
+down_revision = '20261015090000'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_email_events_engagement',
+            'email_events',
+            ['contact_id', 'event_type', sa.text('created_at DESC')],
+            postgresql_include=['id'],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_email_events_engagement',
+            table_name='email_events',
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,43 @@
+"""Add contact_scores indexes for lifecycle distribution and leaderboard
+
+Revision ID: 20261015092000
+Revises: 20261015091000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '20261015092000'
+down_revision = '20261015091000'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_contact_scores_stage_total',
+            'contact_scores',
+            ['lifecycle_stage', sa.text('total_score DESC')],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_contact_scores_total_desc',
+            'contact_scores',
+            [sa.text('total_score DESC')],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_contact_scores_total_desc',
+            table_name='contact_scores',
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'ix_contact_scores_stage_total',
+            table_name='contact_scores',
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,31 @@
+"""Add automation_rules (trigger_type, active) index for rule matching
+
+Revision ID: 20261015093000
+Revises: 20261015092000
+"""
+from alembic import op
+
+revision = '20261015093000'
+down_revision = '20261015092000'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_rule_trigger_active',
+            'automation_rules',
+            ['trigger_type', 'active'],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_rule_trigger_active',
+            table_name='automation_rules',
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,31 @@
+"""Add automation_logs (rule_id, status) index for rule stats
+
+Revision ID: 20261015094000
+Revises: 20261015093000
+"""
+from alembic import op
+
+revision = '20261015094000'
+down_revision = '20261015093000'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_automation_logs_rule_status',
+            'automation_logs',
+            ['rule_id', 'status'],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_automation_logs_rule_status',
+            table_name='automation_logs',
+            postgresql_concurrently=True,
+        )
@@ -1,12 +1,15 @@
 """Automation rules — trigger-based workflow automation engine."""
 
 import json
-from datetime import datetime, timezone
-from typing import Optional
+import operator
+from collections.abc import Callable, Sequence
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel, Field
-from sqlalchemy import Column, DateTime, Integer, String, Text, Boolean
+from sqlalchemy import Column, DateTime, Index, Integer, String, Text, Boolean
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 
@@ -16,10 +19,24 @@ from app.models import new_uuid, utcnow
 
 # ── Models ───────────────────────────────────────────────
 
+@lru_cache(maxsize=512)
+def _parse_rule_json(raw: str) -> tuple[dict, ...]:
+    """Decode a rule's conditions/actions JSON once per distinct value; treat the dicts as read-only."""
+    try:
+        value = json.loads(raw)
+    except (json.JSONDecodeError, TypeError):
+        return ()
+    return tuple(value) if isinstance(value, list) else ()
+
+
 class AutomationRule(Base):
     """Event-driven automation rule: trigger → condition → action."""
 
     __tablename__ = "automation_rules"
+    __table_args__ = (
+        # get_matching_rules: active rules for one trigger type
+        Index("ix_rule_trigger_active", "trigger_type", "active"),
+    )
 
     id = Column(String(36), primary_key=True, default=new_uuid)
     name = Column(String(300), nullable=False)
@@ -54,11 +71,27 @@ class AutomationRule(Base):
     created_at = Column(DateTime, default=utcnow)
     updated_at = Column(DateTime, default=utcnow, onupdate=utcnow)
 
+    @property
+    def parsed_conditions(self) -> Sequence[dict]:
+        """Decoded conditions; cached by JSON text, so assigning new JSON takes effect at once."""
+        conditions = self.conditions
+        return _parse_rule_json(conditions) if isinstance(conditions, str) else (conditions or ())
+
+    @property
+    def parsed_actions(self) -> Sequence[dict]:
+        """Decoded actions; cached by JSON text like parsed_conditions."""
+        actions = self.actions
+        return _parse_rule_json(actions) if isinstance(actions, str) else (actions or ())
+
 
 class AutomationLog(Base):
     """Log of automation rule executions."""
 
     __tablename__ = "automation_logs"
+    __table_args__ = (
+        # get_rule_stats: per-status counts for one rule
+        Index("ix_automation_logs_rule_status", "rule_id", "status"),
+    )
 
     id = Column(String(36), primary_key=True, default=new_uuid)
     rule_id = Column(String(36), nullable=False, index=True)
@@ -74,11 +107,36 @@ class AutomationLog(Base):
 
 # ── Rule Engine ──────────────────────────────────────────
 
+def _utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _no_match(actual, expected) -> bool:
+    return False
+
+
+# Condition operators: (actual context value, expected rule value) -> bool
+_OPS: dict[str, Callable[[Any, Any], bool]] = {
+    "eq": operator.eq,
+    "neq": operator.ne,
+    "gt": lambda a, e: a is not None and a > e,
+    "lt": lambda a, e: a is not None and a < e,
+    "gte": lambda a, e: a is not None and a >= e,
+    "lte": lambda a, e: a is not None and a <= e,
+    "contains": lambda a, e: e in str(a) if a else False,
+    "in": lambda a, e: a in (e if isinstance(e, list) else [e]),
+    "is_set": lambda a, e: a is not None and a != "",
+    "not_set": lambda a, e: a is None or a == "",
+}
+
+
 class RuleEngine:
     """Evaluates automation rules against events."""
 
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, now: Optional[Callable[[], datetime]] = None):
         self.db = db
+        # Clock for cooldowns and execution timestamps; injectable for tests
+        self._now = now or _utc_now
 
     async def get_matching_rules(self, trigger_type: str) -> list[AutomationRule]:
         """Find all active rules matching a trigger type."""
@@ -90,68 +148,38 @@ class RuleEngine:
         )
         return list(result.scalars().all())
 
-    def check_conditions(self, rule: AutomationRule, context: dict) -> bool:
+    @staticmethod
+    def check_conditions(rule: AutomationRule, context: dict) -> bool:
         """Evaluate rule conditions against context data."""
-        try:
-            conditions = json.loads(rule.conditions) if isinstance(rule.conditions, str) else rule.conditions
-        except (json.JSONDecodeError, TypeError):
-            conditions = []
-
+        conditions = rule.parsed_conditions
         if not conditions:
             return True
 
         for cond in conditions:
             field = cond.get("field", "")
-            operator = cond.get("operator", "eq")
+            op = cond.get("operator", "eq")
             expected = cond.get("value")
             actual = context.get(field)
 
-            if not self._eval_condition(actual, operator, expected):
+            if not _OPS.get(op, _no_match)(actual, expected):
                 return False
         return True
 
-    def _eval_condition(self, actual, operator: str, expected) -> bool:
-        """Evaluate a single condition."""
-        if operator == "eq":
-            return actual == expected
-        elif operator == "neq":
-            return actual != expected
-        elif operator == "gt":
-            return actual is not None and actual > expected
-        elif operator == "lt":
-            return actual is not None and actual < expected
-        elif operator == "gte":
-            return actual is not None and actual >= expected
-        elif operator == "lte":
-            return actual is not None and actual <= expected
-        elif operator == "contains":
-            return expected in str(actual) if actual else False
-        elif operator == "in":
-            return actual in (expected if isinstance(expected, list) else [expected])
-        elif operator == "is_set":
-            return actual is not None and actual != ""
-        elif operator == "not_set":
-            return actual is None or actual == ""
-        return False
-
-    def check_execution_limits(self, rule: AutomationRule) -> bool:
-        """Check if rule has hit execution limits."""
+    @staticmethod
+    def check_execution_limits(rule: AutomationRule, now: Optional[datetime] = None) -> bool:
+        """Check if rule has hit execution limits (cooldown measured at now, default the current time)."""
         if rule.max_executions > 0 and rule.total_executions >= rule.max_executions:
             return False
         if rule.cooldown_minutes > 0 and rule.last_executed_at:
-            from datetime import timedelta
             cooldown_end = rule.last_executed_at + timedelta(minutes=rule.cooldown_minutes)
-            if datetime.now(timezone.utc) < cooldown_end:
+            if (now or _utc_now()) < cooldown_end:
                 return False
         return True
 
-    def parse_actions(self, rule: AutomationRule) -> list[dict]:
+    @staticmethod
+    def parse_actions(rule: AutomationRule) -> Sequence[dict]:
         """Parse actions from a rule."""
-        try:
-            actions = json.loads(rule.actions) if isinstance(rule.actions, str) else rule.actions
-        except (json.JSONDecodeError, TypeError):
-            actions = []
-        return actions
+        return rule.parsed_actions
 
     async def execute_rule(
         self,
@@ -161,12 +189,24 @@ class RuleEngine:
         context: Optional[dict] = None,
     ) -> AutomationLog:
         """Execute a rule's actions and log the result."""
-        start = datetime.now(timezone.utc)
+        log = await self._stage_rule(rule, contact_id, trigger_data, context)
+        await self.db.commit()
+        return log
+
+    async def _stage_rule(
+        self,
+        rule: AutomationRule,
+        contact_id: Optional[str] = None,
+        trigger_data: Optional[dict] = None,
+        context: Optional[dict] = None,
+    ) -> AutomationLog:
+        """Run a rule and add its log and counter updates to the session without committing."""
+        start = self._now()
         trigger_data = trigger_data or {}
         context = context or {}
 
         # Check conditions
-        if not self.check_conditions(rule, context):
+        if not RuleEngine.check_conditions(rule, context):
             log = AutomationLog(
                 rule_id=rule.id,
                 contact_id=contact_id,
@@ -176,11 +216,10 @@ class RuleEngine:
                 error_message="Conditions not met",
             )
             self.db.add(log)
-            await self.db.commit()
             return log
 
         # Check limits
-        if not self.check_execution_limits(rule):
+        if not RuleEngine.check_execution_limits(rule, start):
             log = AutomationLog(
                 rule_id=rule.id,
                 contact_id=contact_id,
@@ -190,11 +229,10 @@ class RuleEngine:
                 error_message="Execution limit reached",
             )
             self.db.add(log)
-            await self.db.commit()
             return log
 
         # Execute actions
-        actions = self.parse_actions(rule)
+        actions = RuleEngine.parse_actions(rule)
         action_results = []
         status = "success"
         error_msg = ""
@@ -212,9 +250,9 @@ class RuleEngine:
 
         # Update rule counters
         rule.total_executions = (rule.total_executions or 0) + 1
-        rule.last_executed_at = datetime.now(timezone.utc)
+        rule.last_executed_at = self._now()
 
-        end = datetime.now(timezone.utc)
+        end = self._now()
         duration = int((end - start).total_seconds() * 1000)
 
         log = AutomationLog(
@@ -228,7 +266,6 @@ class RuleEngine:
             duration_ms=duration,
         )
         self.db.add(log)
-        await self.db.commit()
         return log
 
     async def _execute_action(
@@ -259,35 +296,22 @@ class RuleEngine:
     async def fire_event(self, trigger_type: str, contact_id: Optional[str] = None, data: Optional[dict] = None):
         """Fire an event and execute all matching rules."""
         rules = await self.get_matching_rules(trigger_type)
-        results = []
-        for rule in rules:
-            log = await self.execute_rule(rule, contact_id, data, data)
-            results.append(log)
+        # Rule actions do no I/O of their own: stage every rule, then commit once
+        results = [await self._stage_rule(rule, contact_id, data, data) for rule in rules]
+        await self.db.commit()
         return results
 
     async def get_rule_stats(self, rule_id: str) -> dict:
         """Get execution stats for a rule."""
-        total = (await self.db.execute(
-            select(func.count(AutomationLog.id)).where(AutomationLog.rule_id == rule_id)
-        )).scalar() or 0
-        success = (await self.db.execute(
-            select(func.count(AutomationLog.id)).where(
-                AutomationLog.rule_id == rule_id,
-                AutomationLog.status == "success",
-            )
-        )).scalar() or 0
-        failed = (await self.db.execute(
-            select(func.count(AutomationLog.id)).where(
-                AutomationLog.rule_id == rule_id,
-                AutomationLog.status == "failed",
-            )
-        )).scalar() or 0
-        skipped = (await self.db.execute(
-            select(func.count(AutomationLog.id)).where(
-                AutomationLog.rule_id == rule_id,
-                AutomationLog.status == "skipped",
-            )
-        )).scalar() or 0
+        row = (await self.db.execute(
+            select(
+                func.count(AutomationLog.id).label("total"),
+                func.count(AutomationLog.id).filter(AutomationLog.status == "success").label("success"),
+                func.count(AutomationLog.id).filter(AutomationLog.status == "failed").label("failed"),
+                func.count(AutomationLog.id).filter(AutomationLog.status == "skipped").label("skipped"),
+            ).where(AutomationLog.rule_id == rule_id)
+        )).one()
+        total, success, failed, skipped = row.total, row.success, row.failed, row.skipped
 
         return {
             "rule_id": rule_id,
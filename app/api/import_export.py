@@ -1,9 +1,12 @@
 """CSV file upload import for contacts — validates, deduplicates, and bulk inserts."""
 
+import asyncio
 import csv
 import io
 import json
 import re
+import string
+from itertools import islice
 from typing import Optional
 
 from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
@@ -39,37 +42,42 @@ class ImportPreview(BaseModel):
     detected_email_column: Optional[str] = None
 
 
-COLUMN_MAP = {
-    "email": "email",
-    "e-mail": "email",
-    "mail": "email",
-    "电子邮件": "email",
-    "邮箱": "email",
-    "first_name": "first_name",
-    "firstname": "first_name",
-    "first name": "first_name",
-    "名": "first_name",
-    "last_name": "last_name",
-    "lastname": "last_name",
-    "last name": "last_name",
-    "姓": "last_name",
-    "phone": "phone",
-    "telephone": "phone",
-    "tel": "phone",
-    "电话": "phone",
-    "手机": "phone",
-    "country": "country",
-    "国家": "country",
-    "language": "language",
-    "lang": "language",
-    "语言": "language",
-}
+# Header spellings per field; matching ignores case, whitespace, "_", "-" and "."
+_COLUMN_ALIASES = (
+    ("email", ("email", "mail", "电子邮件", "邮箱")),
+    ("first_name", ("firstname", "名")),
+    ("last_name", ("lastname", "姓")),
+    ("phone", ("phone", "telephone", "tel", "电话", "手机")),
+    ("country", ("country", "国家")),
+    ("language", ("language", "lang", "语言")),
+)
+COLUMN_MAP = {alias: field for field, aliases in _COLUMN_ALIASES for alias in aliases}
+_HEADER_SEPARATORS = str.maketrans("", "", string.whitespace + "_-.")
 
 
 def normalize_column(col: str) -> Optional[str]:
     """Map CSV column header to a known field name."""
-    key = col.strip().lower()
-    return COLUMN_MAP.get(key)
+    return COLUMN_MAP.get(col.lower().translate(_HEADER_SEPARATORS))
+
+
+def _upload_size(file: UploadFile) -> int:
+    f = file.file
+    f.seek(0, io.SEEK_END)
+    size = f.tell()
+    f.seek(0)
+    return size
+
+
+def _read_csv(file: UploadFile, keep: int) -> tuple[list[str], list[dict], int]:
+    """Header, first `keep` rows and total row count of the uploaded CSV, decoded as read.
+
+    Blocking: large uploads are spooled to disk, so call it through asyncio.to_thread.
+    """
+    text = io.TextIOWrapper(file.file, encoding="utf-8-sig", errors="replace", newline="")
+    reader = csv.DictReader(text)
+    columns = reader.fieldnames or []
+    rows = list(islice(reader, keep))
+    return columns, rows, len(rows) + sum(1 for _ in reader)
 
 
 @router.post("/csv/preview", response_model=ImportPreview)
@@ -78,19 +86,10 @@ async def preview_csv(file: UploadFile = File(...)):
     if not file.filename or not file.filename.lower().endswith(".csv"):
         raise HTTPException(400, "Only CSV files are supported")
 
-    content = await file.read()
-    if len(content) > MAX_FILE_SIZE:
+    if await asyncio.to_thread(_upload_size, file) > MAX_FILE_SIZE:
         raise HTTPException(400, f"File too large. Max size: {MAX_FILE_SIZE // 1024 // 1024} MB")
 
-    text = content.decode("utf-8-sig", errors="replace")
-    reader = csv.DictReader(io.StringIO(text))
-    columns = reader.fieldnames or []
-
-    sample = []
-    for i, row in enumerate(reader):
-        if i >= 5:
-            break
-        sample.append(dict(row))
+    columns, sample, total = await asyncio.to_thread(_read_csv, file, 5)
 
     # Detect email column
     email_col = None
@@ -108,8 +107,6 @@ async def preview_csv(file: UploadFile = File(...)):
             if email_col:
                 break
 
-    total = sum(1 for _ in csv.DictReader(io.StringIO(text)))
-
     return ImportPreview(
         total_rows=total,
         columns=columns,
@@ -136,13 +133,11 @@ async def import_csv(
     if not file.filename or not file.filename.lower().endswith(".csv"):
         raise HTTPException(400, "Only CSV files are supported")
 
-    content = await file.read()
-    if len(content) > MAX_FILE_SIZE:
+    if await asyncio.to_thread(_upload_size, file) > MAX_FILE_SIZE:
         raise HTTPException(400, f"File too large. Max: {MAX_FILE_SIZE // 1024 // 1024} MB")
 
-    text = content.decode("utf-8-sig", errors="replace")
-    reader = csv.DictReader(io.StringIO(text))
-    columns = reader.fieldnames or []
+    columns, rows, _ = await asyncio.to_thread(_read_csv, file, MAX_ROWS)
+    first_row = rows[0] if rows else None
 
     # Build column mapping
     mapping = {}
@@ -156,8 +151,6 @@ async def import_csv(
 
     if "email" not in mapping.values():
         # Try to find email column by content
-        sample_reader = csv.DictReader(io.StringIO(text))
-        first_row = next(sample_reader, None)
         if first_row:
             for col in columns:
                 val = first_row.get(col, "")
@@ -173,12 +166,7 @@ async def import_csv(
     result = ImportResult(total_rows=0, created=0, updated=0, skipped=0)
     errors = []
 
-    reader = csv.DictReader(io.StringIO(text))
-    batch = []
-
-    for i, row in enumerate(reader):
-        if i >= MAX_ROWS:
-            break
+    for i, row in enumerate(rows):
         result.total_rows += 1
 
         # Extract known fields
@@ -198,4 +198,4 @@ async def validate_bulk_emails(body: BulkValidateRequest):
     """Validate a batch of emails and get summary statistics."""
     if len(body.emails) > 1000:
         raise HTTPException(400, "Maximum 1000 emails per batch")
-    return validate_emails_bulk(body.emails, level=ValidationLevel(body.level))
+    return await validate_emails_bulk(body.emails, level=ValidationLevel(body.level))
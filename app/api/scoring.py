@@ -1,10 +1,13 @@
 """Lead Scoring & Suppression API — manage scoring rules, view leaderboards, and suppress contacts."""
 
+import csv
+import io
 import json
 from datetime import datetime
-from typing import Optional
+from typing import Literal, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, EmailStr, Field
 from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -14,13 +17,17 @@ from app.models.lead_score import ContactScore, ScoreEvent, ScoringRule, Suppres
 from app.services.scoring_engine import (
     add_to_suppression,
     check_suppression,
+    check_suppression_bulk,
     get_lifecycle_distribution,
     get_score_leaderboard,
     list_suppression,
     process_scoring_rules,
+    recalculate_all_scores_bulk,
     recalculate_contact_score,
     record_score_event,
     remove_from_suppression,
+    stream_score_leaderboard,
+    stream_suppression,
 )
 
 router = APIRouter(tags=["scoring"])
@@ -119,9 +126,12 @@ class ScoreEventOut(BaseModel):
     model_config = {"from_attributes": True}
 
 
+SuppressionReason = Literal["bounce", "complaint", "unsubscribe", "manual", "compliance"]
+
+
 class SuppressionCreate(BaseModel):
     email: EmailStr
-    reason: str  # bounce|complaint|unsubscribe|manual|compliance
+    reason: SuppressionReason
     source: str = ""
     notes: str = ""
 
@@ -139,10 +149,20 @@ class SuppressionOut(BaseModel):
 
 class BulkSuppressionRequest(BaseModel):
     emails: list[EmailStr]
-    reason: str
+    reason: SuppressionReason
     source: str = ""
 
 
+class BulkSuppressionCheck(BaseModel):
+    emails: list[str] = Field(..., max_length=10000)
+
+
+def _csv_line(values: list) -> str:
+    buf = io.StringIO()
+    csv.writer(buf).writerow(values)
+    return buf.getvalue()
+
+
 # ── Scoring Rules CRUD ─────────────────────────────────
 @router.post("/scoring/rules", response_model=ScoringRuleOut, status_code=201)
 async def create_scoring_rule(body: ScoringRuleCreate, db: AsyncSession = Depends(get_db)):
@@ -235,6 +255,12 @@ async def recalculate_score(contact_id: str, db: AsyncSession = Depends(get_db))
     return score
 
 
+@router.post("/scoring/recalculate")
+async def recalculate_all_scores(db: AsyncSession = Depends(get_db)):
+    scored = await recalculate_all_scores_bulk(db)
+    return {"recalculated": scored}
+
+
 @router.get("/scoring/leaderboard")
 async def leaderboard(
     limit: int = Query(50, le=200),
@@ -245,6 +271,30 @@ async def leaderboard(
     return await get_score_leaderboard(db, limit=limit, min_score=min_score, lifecycle_stage=lifecycle_stage)
 
 
+@router.get("/scoring/leaderboard/export/csv")
+async def export_leaderboard_csv(
+    min_score: float = 0,
+    lifecycle_stage: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """Export the full leaderboard as CSV, streamed row by row."""
+    columns = [
+        "contact_id", "email", "name", "total_score", "engagement_score", "profile_score",
+        "recency_score", "grade", "lifecycle_stage", "last_activity_at",
+    ]
+
+    async def rows():
+        yield _csv_line(columns)
+        async for entry in stream_score_leaderboard(db, min_score=min_score, lifecycle_stage=lifecycle_stage):
+            yield _csv_line([entry[c] if entry[c] is not None else "" for c in columns])
+
+    return StreamingResponse(
+        rows(),
+        media_type="text/csv",
+        headers={"Content-Disposition": "attachment; filename=leaderboard.csv"},
+    )
+
+
 @router.get("/scoring/lifecycle")
 async def lifecycle_distribution(db: AsyncSession = Depends(get_db)):
     return await get_lifecycle_distribution(db)
@@ -322,12 +372,37 @@ async def list_suppressions(
     return await list_suppression(db, reason=reason, skip=skip, limit=limit)
 
 
+@router.get("/suppression/export/csv")
+async def export_suppressions_csv(reason: Optional[str] = None, db: AsyncSession = Depends(get_db)):
+    """Export the suppression list as CSV, streamed row by row."""
+
+    async def rows():
+        yield _csv_line(["email", "reason", "source", "notes", "created_at"])
+        async for entry in stream_suppression(db, reason=reason):
+            yield _csv_line([
+                entry.email, entry.reason, entry.source, entry.notes,
+                entry.created_at.isoformat() if entry.created_at else "",
+            ])
+
+    return StreamingResponse(
+        rows(),
+        media_type="text/csv",
+        headers={"Content-Disposition": "attachment; filename=suppressions.csv"},
+    )
+
+
 @router.get("/suppression/check")
 async def check_suppressed(email: str, db: AsyncSession = Depends(get_db)):
     entry = await check_suppression(db, email)
     return {"suppressed": entry is not None, "entry": entry}
 
 
+@router.post("/suppression/check/bulk")
+async def check_suppressed_bulk(body: BulkSuppressionCheck, db: AsyncSession = Depends(get_db)):
+    suppressed = await check_suppression_bulk(db, body.emails)
+    return {"suppressed": sorted(suppressed), "count": len(suppressed)}
+
+
 @router.delete("/suppression/{email}", status_code=204)
 async def remove_suppression(email: str, db: AsyncSession = Depends(get_db)):
     removed = await remove_from_suppression(db, email)
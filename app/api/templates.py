@@ -1,9 +1,10 @@
 """Email template CRUD + Jinja2 rendering."""
 
 import json
+from functools import lru_cache
 
 from fastapi import APIRouter, Depends, HTTPException, Query
-from jinja2 import BaseLoader, Environment, TemplateSyntaxError
+from jinja2 import BaseLoader, Environment, Template, TemplateSyntaxError
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -16,10 +17,16 @@ router = APIRouter(prefix="/templates", tags=["templates"])
 _jinja_env = Environment(loader=BaseLoader(), autoescape=True)
 
 
+@lru_cache(maxsize=256)
+def _compile_template(template_str: str) -> Template:
+    """Parse and compile a template source once; rendering only evaluates it."""
+    return _jinja_env.from_string(template_str)
+
+
 def render_template_string(template_str: str, variables: dict) -> str:
     """Render a Jinja2 template string with given variables."""
     try:
-        tpl = _jinja_env.from_string(template_str)
+        tpl = _compile_template(template_str)
         return tpl.render(**variables)
     except TemplateSyntaxError as e:
         raise ValueError(f"Template syntax error: {e}") from e
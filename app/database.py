@@ -3,6 +3,7 @@
 from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import StaticPool
 
 from app.config import get_settings
 
@@ -10,16 +11,22 @@ settings = get_settings()
 
 # SQLite needs connect_args for async; PostgreSQL uses pool_size
 if settings.is_sqlite:
+    sqlite_kwargs: dict = {"connect_args": {"check_same_thread": False}}
+    if ":memory:" in settings.database_url:
+        # An in-memory database lives only as long as its connection: share one
+        sqlite_kwargs["poolclass"] = StaticPool
     engine = create_async_engine(
         settings.database_url,
         echo=settings.debug,
-        connect_args={"check_same_thread": False},
+        insertmanyvalues_page_size=settings.db_insert_page_size,
+        **sqlite_kwargs,
     )
 else:
     engine = create_async_engine(
         settings.database_url,
         echo=settings.debug,
         pool_size=10,
+        insertmanyvalues_page_size=settings.db_insert_page_size,
     )
 
 async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
@@ -36,6 +36,11 @@ async def lifespan(app: FastAPI):
 
     yield
 
+    from app.services.email import close_smtp_pool
+    from app.services.webhook_dispatcher import close_http_client
+    await close_http_client()
+    await close_smtp_pool()
+
 
 app = FastAPI(
     title=settings.app_name,
@@ -9,6 +9,7 @@ from sqlalchemy import (
     DateTime,
     Float,
     ForeignKey,
+    Index,
     Integer,
     String,
     Table,
@@ -101,7 +102,7 @@ class Campaign(Base):
     from_email = Column(String(320), default="")
     html_body = Column(Text, default="")
     text_body = Column(Text, default="")
-    status = Column(String(20), default="draft")  # draft|scheduled|sending|sent|paused
+    status = Column(String(20), default="draft")  # draft|scheduled|sending|sent|paused|failed
     scheduled_at = Column(DateTime, nullable=True)
     sent_at = Column(DateTime, nullable=True)
     segment_id = Column(String(36), ForeignKey("segments.id"), nullable=True)
@@ -127,6 +128,17 @@ class EmailEvent(Base):
     metadata_ = Column("metadata", Text, default="{}")
     created_at = Column(DateTime, default=utcnow)
 
+    __table_args__ = (
+        # Covers per-contact engagement aggregation (COUNT/MAX by event_type) as an index-only scan
+        Index(
+            "ix_email_events_engagement",
+            "contact_id",
+            "event_type",
+            created_at.desc(),
+            postgresql_include=["id"],
+        ),
+    )
+
 
 # ── Workflow ────────────────────────────────────────────
 class Workflow(Base):
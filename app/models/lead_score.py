@@ -1,6 +1,6 @@
 """Lead scoring models — rule-based + engagement-driven contact scoring."""
 
-from sqlalchemy import Boolean, Column, DateTime, Float, ForeignKey, Integer, String, Text
+from sqlalchemy import Boolean, Column, DateTime, Float, ForeignKey, Index, Integer, String, Text
 
 from app.database import Base
 from app.models import new_uuid, utcnow
@@ -37,10 +37,17 @@ class ContactScore(Base):
     recency_score = Column(Float, default=0.0)  # time-decay component
     grade = Column(String(2), default="C")  # A+/A/B+/B/C/D/F
     lifecycle_stage = Column(String(30), default="subscriber")  # subscriber|lead|mql|sql|customer|evangelist|churned
-    last_activity_at = Column(DateTime, nullable=True)
+    last_activity_at = Column(DateTime(timezone=True), nullable=True)
     score_updated_at = Column(DateTime, default=utcnow)
     created_at = Column(DateTime, default=utcnow)
 
+    __table_args__ = (
+        # Lifecycle distribution (GROUP BY stage) and per-stage leaderboard
+        Index("ix_contact_scores_stage_total", "lifecycle_stage", total_score.desc()),
+        # Unfiltered leaderboard (ORDER BY total_score DESC LIMIT n)
+        Index("ix_contact_scores_total_desc", total_score.desc()),
+    )
+
 
 class ScoreEvent(Base):
     """Individual scoring event log — audit trail of every point awarded/deducted."""
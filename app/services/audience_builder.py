@@ -6,7 +6,7 @@ from typing import Optional
 
 from sqlalchemy import Column, DateTime, Integer, String, Text, Boolean
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_
+from sqlalchemy import select, func, and_, or_, true
 
 from app.database import Base
 from app.models import new_uuid, utcnow, Contact, SuppressionList
@@ -57,15 +57,15 @@ class Audience(Base):
 class AudienceBuilder:
     """Build dynamic audiences from rules with exclusion logic."""
 
-    VALID_FIELDS = {
+    VALID_FIELDS = frozenset({
         "email", "first_name", "last_name", "phone", "country",
         "language", "subscribed", "created_at",
-    }
-    VALID_OPERATORS = {
+    })
+    VALID_OPERATORS = frozenset({
         "eq", "neq", "contains", "starts_with", "ends_with",
         "gt", "lt", "gte", "lte", "in", "not_in", "between",
         "is_set", "not_set",
-    }
+    })
 
     def __init__(self, db: AsyncSession):
         self.db = db
@@ -111,22 +111,26 @@ class AudienceBuilder:
         if not operator:
             raise ValueError("Rule must have an 'operator'")
         if field not in self.VALID_FIELDS:
-            raise ValueError(f"Invalid field: {field}. Valid: {self.VALID_FIELDS}")
+            raise ValueError(f"Invalid field: {field}. Valid: {sorted(self.VALID_FIELDS)}")
         if operator not in self.VALID_OPERATORS:
-            raise ValueError(f"Invalid operator: {operator}. Valid: {self.VALID_OPERATORS}")
+            raise ValueError(f"Invalid operator: {operator}. Valid: {sorted(self.VALID_OPERATORS)}")
 
-    def _build_condition(self, rule: dict):
-        """Convert a rule dict into a SQLAlchemy condition."""
-        field_name = rule["field"]
-        operator = rule["operator"]
+    @staticmethod
+    def _rule_value(rule: dict):
+        """A rule's value, JSON-decoded when it is a JSON string."""
         value = rule.get("value", "")
-
-        # Parse JSON value if needed
         if isinstance(value, str):
             try:
                 value = json.loads(value)
             except (json.JSONDecodeError, TypeError):
                 pass
+        return value
+
+    def _build_condition(self, rule: dict):
+        """Convert a rule dict into a SQLAlchemy condition."""
+        field_name = rule["field"]
+        operator = rule["operator"]
+        value = self._rule_value(rule)
 
         col = getattr(Contact, field_name, None)
         if col is None:
@@ -164,43 +168,67 @@ class AudienceBuilder:
             return or_(col.is_(None), col == "")
         return None
 
-    async def build_query(self, audience: Audience):
-        """Build a SQLAlchemy query from audience definition."""
+    def _build_filter(self, audience: Audience) -> list:
+        """WHERE criteria for an audience: combined rules plus exclusions."""
         try:
             rules = json.loads(audience.rules) if isinstance(audience.rules, str) else audience.rules
         except (json.JSONDecodeError, TypeError):
             rules = []
 
+        # OR-ed eq rules (match any) or AND-ed neq rules (match all) on one field
+        # fuse into a single IN / NOT IN over the deduplicated values
+        any_match = audience.match_type == "any"
+        fusable = "eq" if any_match else "neq"
+        fused: dict[str, dict] = {}
         conditions = []
         for rule in rules:
+            value = self._rule_value(rule)
+            field_name = rule.get("field", "")
+            if (
+                rule.get("operator") == fusable
+                and isinstance(value, (str, int, float))
+                and getattr(Contact, field_name, None) is not None
+            ):
+                fused.setdefault(field_name, {})[value] = None
+                continue
             cond = self._build_condition(rule)
             if cond is not None:
                 conditions.append(cond)
 
-        query = select(Contact)
+        for field_name, values in fused.items():
+            col = getattr(Contact, field_name)
+            if len(values) == 1:
+                (value,) = values
+                conditions.append(col == value if any_match else col != value)
+            else:
+                conditions.append(col.in_(list(values)) if any_match else col.not_in(list(values)))
 
+        criteria = []
         if conditions:
-            if audience.match_type == "any":
-                query = query.where(or_(*conditions))
+            if any_match:
+                criteria.append(or_(*conditions))
             else:
-                query = query.where(and_(*conditions))
+                criteria.append(and_(*conditions))
 
         # Exclusions
         if audience.exclude_unsubscribed:
-            query = query.where(Contact.subscribed.is_(True))
+            criteria.append(Contact.subscribed.is_(True))
 
         if audience.exclude_suppressed:
             suppressed = select(SuppressionList.email)
-            query = query.where(~Contact.email.in_(suppressed))
+            criteria.append(~Contact.email.in_(suppressed))
 
-        return query
+        return criteria
+
+    async def build_query(self, audience: Audience):
+        """Build a SQLAlchemy query from audience definition."""
+        return select(Contact).where(*self._build_filter(audience))
 
     async def estimate_size(self, audience: Audience) -> int:
         """Estimate the number of contacts matching this audience."""
-        query = await self.build_query(audience)
-        count_query = select(func.count()).select_from(query.subquery())
-        result = await self.db.execute(count_query)
-        count = result.scalar() or 0
+        # Count straight off the contacts table rather than wrapping a full-row subquery
+        count_query = select(func.count()).select_from(Contact).where(*self._build_filter(audience))
+        count = await self.db.scalar(count_query) or 0
 
         # Update cache
         audience.estimated_size = count
@@ -209,6 +237,28 @@ class AudienceBuilder:
 
         return count
 
+    async def estimate_sizes(self, audience_ids: list[str]) -> dict[str, int]:
+        """Estimate several audiences with one scan: a filtered count per audience."""
+        result = await self.db.execute(select(Audience).where(Audience.id.in_(audience_ids)))
+        audiences = list(result.scalars().all())
+        if not audiences:
+            return {}
+
+        counts = [
+            func.count().filter(and_(true(), *self._build_filter(audience)))
+            for audience in audiences
+        ]
+        row = (await self.db.execute(select(*counts).select_from(Contact))).one()
+
+        now = datetime.now(timezone.utc)
+        sizes = {}
+        for audience, count in zip(audiences, row):
+            audience.estimated_size = count
+            audience.last_estimated_at = now
+            sizes[audience.id] = count
+        await self.db.commit()
+        return sizes
+
     async def get_contacts(self, audience: Audience, limit: int = 1000, offset: int = 0) -> list:
         """Retrieve contacts matching the audience rules."""
         query = await self.build_query(audience)
@@ -276,18 +326,11 @@ class AudienceBuilder:
         if not a or not b:
             return {"error": "Audience not found"}
 
-        query_a = await self.build_query(a)
-        query_b = await self.build_query(b)
-
-        contacts_a = set()
-        result = await self.db.execute(select(Contact.id).where(Contact.id.in_(select(Contact.id).select_from(query_a.subquery()))))
-        for row in result:
-            contacts_a.add(row[0])
+        result = await self.db.execute(select(Contact.id).where(*self._build_filter(a)))
+        contacts_a = set(result.scalars())
 
-        contacts_b = set()
-        result = await self.db.execute(select(Contact.id).where(Contact.id.in_(select(Contact.id).select_from(query_b.subquery()))))
-        for row in result:
-            contacts_b.add(row[0])
+        result = await self.db.execute(select(Contact.id).where(*self._build_filter(b)))
+        contacts_b = set(result.scalars())
 
         overlap = contacts_a & contacts_b
         union = contacts_a | contacts_b
@@ -16,7 +16,7 @@ def hash_password(password: str) -> str:
     import bcrypt
 
     pwd = password.encode("utf-8")[:72]  # bcrypt max 72 bytes
-    return bcrypt.hashpw(pwd, bcrypt.gensalt()).decode("utf-8")
+    return bcrypt.hashpw(pwd, bcrypt.gensalt(rounds=settings.bcrypt_rounds)).decode("utf-8")
 
 
 def verify_password(plain: str, hashed: str) -> bool:
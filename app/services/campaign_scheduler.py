@@ -7,7 +7,7 @@ from typing import Optional
 
 from sqlalchemy import Column, DateTime, Integer, String, Text, Boolean
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import insert, select, func
 
 from app.database import Base
 from app.models import new_uuid, utcnow
@@ -205,6 +205,14 @@ class CampaignScheduler:
         await self.db.commit()
         return log
 
+    async def log_sends_bulk(self, records: list[dict]) -> int:
+        """Log many sends in one executemany INSERT; each record holds SendLog column values."""
+        if not records:
+            return 0
+        await self.db.execute(insert(SendLog), records)
+        await self.db.commit()
+        return len(records)
+
     async def complete_run(self, schedule: CampaignSchedule):
         """Mark a run as completed, schedule next run if recurring."""
         schedule.runs_completed = (schedule.runs_completed or 0) + 1
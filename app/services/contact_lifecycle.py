@@ -1,13 +1,15 @@
 """Contact lifecycle management — automated stage transitions, engagement tracking, and dormancy detection."""
 
 import logging
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
 from enum import Enum
-from typing import Optional
+from typing import Optional, Sequence
 
-from sqlalchemy import func, select
+from sqlalchemy import Integer, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
 
 from app.models import Contact, EmailEvent
 from app.models.lead_score import ContactScore
@@ -45,7 +47,7 @@ STAGE_ORDER = {
 
 
 # ── Transition rules ──────────────────────────────────
-@dataclass
+@dataclass(frozen=True)
 class TransitionRule:
     """Rule for automatic stage transition."""
     from_stage: LifecycleStage
@@ -56,10 +58,17 @@ class TransitionRule:
     min_days_in_stage: int = 0
     max_inactive_days: Optional[int] = None  # For dormancy detection
     description: str = ""
+    # Plain-string stage values, resolved once so evaluation loops skip the enum descriptor
+    from_stage_value: str = field(init=False, repr=False, compare=False)
+    to_stage_value: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "from_stage_value", self.from_stage.value)
+        object.__setattr__(self, "to_stage_value", self.to_stage.value)
 
 
 # Default transition rules
-DEFAULT_RULES: list[TransitionRule] = [
+DEFAULT_RULES: tuple[TransitionRule, ...] = (
     TransitionRule(
         from_stage=LifecycleStage.NEW,
         to_stage=LifecycleStage.SUBSCRIBER,
@@ -109,10 +118,10 @@ DEFAULT_RULES: list[TransitionRule] = [
         min_clicks=10,
         description="Top advocate with highest engagement",
     ),
-]
+)
 
 # Dormancy rules (apply to any active stage)
-DORMANCY_RULES: list[TransitionRule] = [
+DORMANCY_RULES: tuple[TransitionRule, ...] = (
     TransitionRule(
         from_stage=LifecycleStage.SUBSCRIBER,
         to_stage=LifecycleStage.DORMANT,
@@ -137,10 +146,24 @@ DORMANCY_RULES: list[TransitionRule] = [
         max_inactive_days=21,
         description="No engagement for 21 days",
     ),
-]
+)
+
+
+def _index_rules(rules: Sequence[TransitionRule]) -> dict[str, tuple[TransitionRule, ...]]:
+    """Group rules by from-stage value, keeping declaration order within each group."""
+    by_stage: dict[str, list[TransitionRule]] = {}
+    for rule in rules:
+        by_stage.setdefault(rule.from_stage_value, []).append(rule)
+    return {stage: tuple(stage_rules) for stage, stage_rules in by_stage.items()}
+
+
+# Progression rules indexed by stage
+RULES_BY_STAGE: dict[str, tuple[TransitionRule, ...]] = _index_rules(DEFAULT_RULES)
+# Dormancy rules indexed the same way
+DORMANCY_BY_STAGE: dict[str, tuple[TransitionRule, ...]] = _index_rules(DORMANCY_RULES)
 
 
-@dataclass
+@dataclass(slots=True)
 class TransitionResult:
     """Result of a lifecycle transition attempt."""
     contact_id: str
@@ -252,27 +275,26 @@ async def evaluate_lifecycle(
     contact_id: str,
     current_stage: str = "new",
     score: float = 0,
-    custom_rules: Optional[list[TransitionRule]] = None,
+    custom_rules: Optional[Sequence[TransitionRule]] = None,
 ) -> TransitionResult:
     """
     Evaluate lifecycle transition rules for a contact.
 
-    Checks both progression rules and dormancy rules.
+    Checks both progression rules and dormancy rules. Rules for the current
+    stage are tried in declaration order and the first one met applies.
     Returns the transition result (may or may not trigger a change).
     """
-    rules = custom_rules or DEFAULT_RULES
+    rules_by_stage = _index_rules(custom_rules) if custom_rules else RULES_BY_STAGE
     engagement = await get_contact_engagement(db, contact_id)
 
     # First check dormancy
-    for rule in DORMANCY_RULES:
-        if rule.from_stage.value != current_stage:
-            continue
+    for rule in DORMANCY_BY_STAGE.get(current_stage, ()):
         if rule.max_inactive_days and engagement["days_since_last_activity"] is not None:
             if engagement["days_since_last_activity"] >= rule.max_inactive_days:
                 return TransitionResult(
                     contact_id=contact_id,
                     previous_stage=current_stage,
-                    new_stage=rule.to_stage.value,
+                    new_stage=rule.to_stage_value,
                     transitioned=True,
                     rule_description=rule.description,
                     reason=f"Inactive for {engagement['days_since_last_activity']} days (threshold: {rule.max_inactive_days})",
@@ -290,11 +312,7 @@ async def evaluate_lifecycle(
         )
 
     # Then check progression
-    for rule in rules:
-        if rule.from_stage.value != current_stage:
-            continue
-
-        # Check all conditions
+    for rule in rules_by_stage.get(current_stage, ()):
         if score < rule.min_score:
             continue
         if engagement["total_opens"] < rule.min_opens:
@@ -305,7 +323,7 @@ async def evaluate_lifecycle(
         return TransitionResult(
             contact_id=contact_id,
             previous_stage=current_stage,
-            new_stage=rule.to_stage.value,
+            new_stage=rule.to_stage_value,
             transitioned=True,
             rule_description=rule.description,
             reason=f"Score={score:.0f}, opens={engagement['total_opens']}, clicks={engagement['total_clicks']}",
@@ -435,6 +453,23 @@ async def get_lifecycle_report(db: AsyncSession) -> dict:
 
 
 # ── Re-engagement candidates ─────────────────────────
+class days_since(FunctionElement):
+    """Whole days elapsed between a timestamp column and now, computed by the database."""
+
+    type = Integer()
+    inherit_cache = True
+
+
+@compiles(days_since)
+def _days_since_default(element, compiler, **kw):
+    return "CAST(EXTRACT(DAY FROM (now() - %s)) AS INTEGER)" % compiler.process(element.clauses, **kw)
+
+
+@compiles(days_since, "sqlite")
+def _days_since_sqlite(element, compiler, **kw):
+    return "CAST(julianday('now') - julianday(%s) AS INTEGER)" % compiler.process(element.clauses, **kw)
+
+
 async def get_reengagement_candidates(
     db: AsyncSession,
     min_inactive_days: int = 30,
@@ -456,7 +491,7 @@ async def get_reengagement_candidates(
             ContactScore.lifecycle_stage,
             ContactScore.total_score,
             ContactScore.engagement_score,
-            ContactScore.last_activity_at,
+            days_since(ContactScore.last_activity_at).label("days_inactive"),
             Contact.email,
             Contact.first_name,
         )
@@ -473,24 +508,17 @@ async def get_reengagement_candidates(
     )
 
     result = await db.execute(stmt)
-    rows = result.all()
-
-    candidates = []
-    for row in rows:
-        last_active = row.last_activity_at
-        if last_active and last_active.tzinfo is None:
-            last_active = last_active.replace(tzinfo=timezone.utc)
-        days_inactive = (now - last_active).days if last_active else None
 
-        candidates.append({
+    return [
+        {
             "contact_id": row.contact_id,
             "email": row.email,
             "name": row.first_name or "",
             "lifecycle_stage": row.lifecycle_stage,
             "total_score": round(row.total_score or 0, 1),
             "engagement_score": round(row.engagement_score or 0, 1),
-            "days_inactive": days_inactive,
+            "days_inactive": row.days_inactive,
             "reengagement_priority": "high" if (row.engagement_score or 0) > 30 else "medium",
-        })
-
-    return candidates
+        }
+        for row in result.all()
+    ]
@@ -1,8 +1,12 @@
 """Email sending service — SMTP and SES backends."""
 
+import asyncio
 import logging
+from email.message import Message
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
+from email.policy import compat32
+from functools import lru_cache
 
 import aiosmtplib
 
@@ -11,6 +15,103 @@ from app.config import get_settings
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Serialization policy for SMTP: the email package's defaults with CRLF line endings
+_WIRE_POLICY = compat32.clone(linesep="\r\n")
+
+
+async def _connect_smtp() -> aiosmtplib.SMTP:
+    """Open an authenticated SMTP connection.
+
+    TLS is negotiated once per connection (implicit TLS or STARTTLS), so a
+    connection that is kept open amortizes the handshake over many messages.
+    """
+    smtp = aiosmtplib.SMTP(
+        hostname=settings.smtp_host,
+        port=settings.smtp_port,
+        use_tls=settings.smtp_use_tls,
+        start_tls=settings.smtp_start_tls,
+    )
+    await smtp.connect()
+    if settings.smtp_user:
+        await smtp.login(settings.smtp_user, settings.smtp_password)
+    return smtp
+
+
+# Idle authenticated connections, reused across sends on the same event loop
+_smtp_pool: asyncio.Queue | None = None
+_smtp_pool_loop: asyncio.AbstractEventLoop | None = None
+
+
+def _get_smtp_pool() -> asyncio.Queue:
+    """Idle-connection queue holding up to smtp_concurrency connections, per event loop."""
+    global _smtp_pool, _smtp_pool_loop
+    loop = asyncio.get_running_loop()
+    if _smtp_pool is None or _smtp_pool_loop is not loop:
+        _smtp_pool = asyncio.Queue(maxsize=settings.smtp_concurrency)
+        _smtp_pool_loop = loop
+    return _smtp_pool
+
+
+async def _acquire_smtp() -> aiosmtplib.SMTP:
+    """Take a live pooled connection, or open a new one if none is idle."""
+    pool = _get_smtp_pool()
+    while not pool.empty():
+        smtp = pool.get_nowait()
+        if smtp.is_connected:
+            return smtp
+    return await _connect_smtp()
+
+
+async def _release_smtp(smtp: aiosmtplib.SMTP) -> None:
+    """Return a connection to the pool, or close it when the pool is full."""
+    try:
+        _get_smtp_pool().put_nowait(smtp)
+    except asyncio.QueueFull:
+        await smtp.quit()
+
+
+async def close_smtp_pool() -> None:
+    """Quit every idle pooled connection (application / worker shutdown)."""
+    global _smtp_pool, _smtp_pool_loop
+    if _smtp_pool is not None and _smtp_pool_loop is asyncio.get_running_loop():
+        while not _smtp_pool.empty():
+            smtp = _smtp_pool.get_nowait()
+            try:
+                await smtp.quit()
+            except Exception:
+                smtp.close()
+    _smtp_pool = None
+    _smtp_pool_loop = None
+
+
+@lru_cache(maxsize=32)
+def build_mime(subject: str, html_body: str, text_body: str, from_header: str) -> bytes:
+    """
+    Serialize everything but the To: header once.
+
+    Campaign blasts send the same subject/body to every recipient, so the MIME
+    tree, header folding and body encoding are done once and reused per send.
+    """
+    msg = MIMEMultipart("alternative")
+    msg["Subject"] = subject
+    msg["From"] = from_header
+
+    if text_body:
+        msg.attach(MIMEText(text_body, "plain", "utf-8"))
+    msg.attach(MIMEText(html_body, "html", "utf-8"))
+    return msg.as_bytes(policy=_WIRE_POLICY)
+
+
+def _to_header(to_email: str) -> bytes:
+    """Serialize one recipient's To: header with the email package's encoding and checks.
+
+    Raises HeaderParseError if the address smuggles in CR/LF (header injection).
+    """
+    header = Message()
+    header["To"] = to_email
+    # Drop the blank line that ends a header-only message
+    return header.as_bytes(policy=_WIRE_POLICY)[:-2]
+
 
 async def send_email_smtp(
     to_email: str,
@@ -20,33 +121,41 @@ async def send_email_smtp(
     from_name: str = "",
     from_email: str = "",
 ) -> bool:
-    """Send a single email via SMTP."""
+    """Send a single email via SMTP over a pooled connection.
+
+    Returns False when this message is refused. Failing to reach or log in to the
+    server, or losing the connection mid-send, raises instead: those are not the
+    recipient's fault, and the caller can retry the send later.
+    """
     from_name = from_name or settings.smtp_from_name
     from_email = from_email or settings.smtp_from_email
 
-    msg = MIMEMultipart("alternative")
-    msg["Subject"] = subject
-    msg["From"] = f"{from_name} <{from_email}>"
-    msg["To"] = to_email
-
-    if text_body:
-        msg.attach(MIMEText(text_body, "plain", "utf-8"))
-    msg.attach(MIMEText(html_body, "html", "utf-8"))
+    template = build_mime(subject, html_body, text_body, f"{from_name} <{from_email}>")
+    try:
+        wire = _to_header(to_email) + template
+    except Exception as e:
+        logger.error(f"Failed to send email to {to_email}: {e}")
+        return False
 
+    smtp = await _acquire_smtp()
     try:
-        await aiosmtplib.send(
-            msg,
-            hostname=settings.smtp_host,
-            port=settings.smtp_port,
-            username=settings.smtp_user,
-            password=settings.smtp_password,
-            use_tls=settings.smtp_use_tls,
-        )
-        logger.info(f"Email sent to {to_email}")
-        return True
+        try:
+            await smtp.sendmail(from_email, [to_email], wire)
+        except aiosmtplib.SMTPServerDisconnected:
+            # The server dropped an idle pooled connection; retry once on a fresh one
+            smtp = await _connect_smtp()
+            await smtp.sendmail(from_email, [to_email], wire)
+    except OSError:
+        # Disconnects and timeouts (aiosmtplib's subclass OSError)
+        smtp.close()
+        raise
     except Exception as e:
+        smtp.close()
         logger.error(f"Failed to send email to {to_email}: {e}")
         return False
+    await _release_smtp(smtp)
+    logger.info(f"Email sent to {to_email}")
+    return True
 
 
 async def send_email_ses(
@@ -1,12 +1,20 @@
 """Email validation service — syntax, disposable domain detection, MX record verification."""
 
+import asyncio
 import re
 import socket
+import time
 from dataclasses import dataclass, field
 from enum import Enum
 
+try:
+    import dns.asyncresolver
+    import dns.resolver
+except ImportError:  # dnspython is optional; fall back to socket lookups
+    dns = None
+
 # ── Disposable email domains (top 200+) ─────────────────
-DISPOSABLE_DOMAINS: set[str] = {
+DISPOSABLE_DOMAINS: frozenset[str] = frozenset({
     "10minutemail.com", "guerrillamail.com", "guerrillamailblock.com",
     "mailinator.com", "tempmail.com", "throwaway.email", "fakeinbox.com",
     "sharklasers.com", "guerrillamail.info", "grr.la", "guerrillamail.net",
@@ -43,37 +51,98 @@ DISPOSABLE_DOMAINS: set[str] = {
     "sofimail.com", "spamcero.com", "spamoff.de", "tafmail.com",
     "tittbit.in", "tradermail.info", "veryreallyrealmail.com",
     "webemail.me", "weg-werf-email.de", "wegwerfmail.org", "wuzupmail.net",
-}
+})
 
 # ── Free email providers (not necessarily disposable) ──
-FREE_EMAIL_PROVIDERS: set[str] = {
+FREE_EMAIL_PROVIDERS: frozenset[str] = frozenset({
     "gmail.com", "yahoo.com", "outlook.com", "hotmail.com", "live.com",
     "aol.com", "icloud.com", "me.com", "mac.com", "protonmail.com",
     "proton.me", "zoho.com", "yandex.com", "mail.com", "gmx.com",
     "gmx.net", "inbox.com", "fastmail.com", "tutanota.com", "qq.com",
     "163.com", "126.com", "yeah.net", "foxmail.com", "sina.com",
     "sohu.com", "aliyun.com",
-}
+})
+
+# ── Domain lookup ──────────────────────────────────────
+def _parent_domains(domain: str):
+    """Yield each parent suffix of a domain, nearest first ("a.b.com" -> "b.com", "com")."""
+    while (dot := domain.find(".")) != -1:
+        domain = domain[dot + 1:]
+        yield domain
+
+
+def _index_domain_kinds() -> dict[str, tuple[bool, bool]]:
+    """(is_disposable, is_free_provider) per listed domain, with listed parents' flags folded in.
+
+    Folding makes the first listed suffix found for a domain the complete answer,
+    so one walk up its parents classifies it for both lists.
+    """
+    listed = DISPOSABLE_DOMAINS | FREE_EMAIL_PROVIDERS
+    kinds = {}
+    for domain in listed:
+        disposable = domain in DISPOSABLE_DOMAINS
+        free = domain in FREE_EMAIL_PROVIDERS
+        for parent in _parent_domains(domain):
+            if parent in listed:
+                disposable = disposable or parent in DISPOSABLE_DOMAINS
+                free = free or parent in FREE_EMAIL_PROVIDERS
+        kinds[domain] = (disposable, free)
+    return kinds
+
+
+_DOMAIN_KINDS = _index_domain_kinds()
+_UNLISTED = (False, False)
+
+
+def _classify_domain(domain: str) -> tuple[bool, bool]:
+    """(is_disposable, is_free_provider) for a lower-cased domain or any of its subdomains."""
+    kind = _DOMAIN_KINDS.get(domain)
+    if kind is not None:
+        return kind
+    for parent in _parent_domains(domain):
+        kind = _DOMAIN_KINDS.get(parent)
+        if kind is not None:
+            return kind
+    return _UNLISTED
+
 
 # ── Role-based prefixes (high bounce risk) ─────────────
-ROLE_BASED_PREFIXES: set[str] = {
+ROLE_BASED_PREFIXES: frozenset[str] = frozenset({
     "admin", "info", "support", "sales", "contact", "help", "office",
     "billing", "webmaster", "postmaster", "hostmaster", "abuse",
     "noreply", "no-reply", "mailer-daemon", "root", "security",
     "marketing", "team", "hello", "feedback", "newsletter", "careers",
     "jobs", "press", "media", "legal", "compliance", "privacy",
     "accounting", "hr", "it", "ops", "operations",
-}
+})
+_ROLE_PREFIX_MAX_LEN = max(map(len, ROLE_BASED_PREFIXES))
 
 # ── Email regex (RFC 5322 simplified) ──────────────────
+# Every quantifier is bounded by a literal "@" or "." or a 61-char label cap,
+# so backtracking stays linear; inputs are also capped at 320 chars first.
 EMAIL_REGEX = re.compile(
     r"^[a-zA-Z0-9.!#$%&'*+/=?^_`{|}~-]+@[a-zA-Z0-9]"
     r"(?:[a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?"
-    r"(?:\.[a-zA-Z0-9](?:[a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?)*$"
+    r"(?:\.[a-zA-Z0-9](?:[a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?)*$",
+    re.ASCII,
+)
+
+# Exactly the addresses _check_syntax accepts, with every length, dot and label rule
+# folded into one match; only failures take the step-by-step path that names the error.
+_LABEL = r"[a-z0-9](?:[a-z0-9-]{0,61}[a-z0-9])?"
+_LOCAL_CHARS = r"[a-z0-9!#$%&'*+/=?^_`{|}~-]"
+_VALID_EMAIL_REGEX = re.compile(
+    rf"(?=.{{1,320}}\Z)"
+    rf"(?P<local>(?=[^@]{{1,64}}@){_LOCAL_CHARS}+(?:\.{_LOCAL_CHARS}+)*)"
+    rf"@(?P<domain>(?=.{{1,255}}\Z){_LABEL}(?:\.(?P<tld>{_LABEL}))+)",
+    re.ASCII,
 )
 
+# Short alphabetic prefix followed by a run of digits (e.g. "ab12345")
+SUSPICIOUS_LOCAL_REGEX = re.compile(r"^[a-z]{1,2}\d{5,}$", re.ASCII)
+
 # ── TLD validation ─────────────────────────────────────
-VALID_TLDS: set[str] = {
+VALID_TLDS: frozenset[str] = frozenset({
     "com", "net", "org", "edu", "gov", "mil", "int",
     "io", "co", "ai", "app", "dev", "me", "us", "uk", "de", "fr",
     "jp", "cn", "kr", "au", "ca", "br", "in", "ru", "nl", "se",
@@ -83,7 +152,7 @@ VALID_TLDS: set[str] = {
     "info", "biz", "name", "pro", "aero", "coop", "museum",
     "xyz", "online", "site", "store", "shop", "tech", "cloud",
     "space", "live", "blog", "email", "work", "company",
-}
+})
 
 
 class ValidationLevel(str, Enum):
@@ -102,7 +171,7 @@ class RiskLevel(str, Enum):
     CRITICAL = "critical"       # Disposable or invalid
 
 
-@dataclass
+@dataclass(slots=True)
 class ValidationResult:
     """Result of email validation."""
     email: str
@@ -144,8 +213,16 @@ def validate_syntax(email: str) -> tuple[bool, str, str, str, list[str]]:
     Validate email syntax and extract parts.
     Returns: (valid, local_part, domain, tld, errors)
     """
+    return _check_syntax(email.strip().lower())
+
+
+def _check_syntax(email: str) -> tuple[bool, str, str, str, list[str]]:
+    """validate_syntax for an address that is already stripped and lower-cased."""
+    m = _VALID_EMAIL_REGEX.fullmatch(email)
+    if m:
+        return True, m["local"], m["domain"], m["tld"], []
+
     errors = []
-    email = email.strip().lower()
 
     if not email:
         return False, "", "", "", ["Email is empty"]
@@ -196,77 +273,155 @@ def validate_syntax(email: str) -> tuple[bool, str, str, str, list[str]]:
 
 
 def check_disposable(domain: str) -> bool:
-    """Check if domain is a known disposable email provider."""
-    return domain.lower() in DISPOSABLE_DOMAINS
+    """Check if domain (or a parent domain) is a known disposable email provider."""
+    return _classify_domain(domain.lower())[0]
 
 
 def check_free_provider(domain: str) -> bool:
-    """Check if domain is a free email provider."""
-    return domain.lower() in FREE_EMAIL_PROVIDERS
+    """Check if domain (or a parent domain) is a free email provider."""
+    return _classify_domain(domain.lower())[1]
 
 
 def check_role_based(local_part: str) -> bool:
     """Check if the local part is a role-based address."""
-    # Remove dots and plus-addressing for check
-    clean = local_part.split("+")[0].replace(".", "")
-    return clean.lower() in ROLE_BASED_PREFIXES
+    return _is_role_based(local_part.lower())
+
+
+def _is_role_based(local_part: str) -> bool:
+    """check_role_based for an already lower-cased local part."""
+    # Remove plus-addressing and dots; common addresses need neither copy
+    plus = local_part.find("+")
+    if plus != -1:
+        local_part = local_part[:plus]
+    if "." in local_part:
+        local_part = local_part.replace(".", "")
+    return len(local_part) <= _ROLE_PREFIX_MAX_LEN and local_part in ROLE_BASED_PREFIXES
+
+
+# ── MX lookup cache ────────────────────────────────────
+_MX_CACHE_MAXSIZE = 8192
+_MX_NEGATIVE_TTL = 30.0     # seconds to remember domains with no MX/A records
+_MX_FALLBACK_TTL = 300.0    # socket fallback exposes no record TTL
+_mx_cache: dict[str, tuple[float, bool, tuple[str, ...]]] = {}
+
+
+def _mx_cache_get(domain: str) -> tuple[bool, list[str]] | None:
+    entry = _mx_cache.get(domain)
+    if entry is None:
+        return None
+    expires, has_records, hosts = entry
+    if expires <= time.monotonic():
+        _mx_cache.pop(domain, None)
+        return None
+    return has_records, list(hosts)
+
+
+def _mx_cache_put(
+    domain: str, has_records: bool, hosts: list[str], ttl: float = _MX_NEGATIVE_TTL,
+) -> tuple[bool, list[str]]:
+    if domain not in _mx_cache and len(_mx_cache) >= _MX_CACHE_MAXSIZE:
+        _mx_cache.pop(next(iter(_mx_cache)), None)
+    if not has_records:
+        ttl = _MX_NEGATIVE_TTL
+    _mx_cache[domain] = (time.monotonic() + ttl, has_records, tuple(hosts))
+    return has_records, list(hosts)
+
+
+def _sorted_mx_hosts(answers) -> list[str]:
+    mx_hosts = sorted(
+        [(r.preference, str(r.exchange).rstrip(".")) for r in answers],
+        key=lambda x: x[0],
+    )
+    return [host for _, host in mx_hosts]
+
+
+_resolver = None
+_async_resolver = None
+
+
+def _get_resolver():
+    """Shared dnspython resolver (reads resolv.conf once)."""
+    global _resolver
+    if _resolver is None:
+        _resolver = dns.resolver.Resolver()
+    return _resolver
+
+
+def _get_async_resolver():
+    """Shared async dnspython resolver."""
+    global _async_resolver
+    if _async_resolver is None:
+        _async_resolver = dns.asyncresolver.Resolver()
+    return _async_resolver
 
 
 def check_mx_records(domain: str, timeout: float = 5.0) -> tuple[bool, list[str]]:
     """
     Check if domain has valid MX records.
     Falls back to A record check if no MX.
+    Results are cached per domain for the record TTL (30s for misses).
     Returns: (has_records, list_of_mx_hosts)
     """
-    try:
-        import dns.resolver
-        try:
-            answers = dns.resolver.resolve(domain, "MX", lifetime=timeout)
-            mx_hosts = sorted(
-                [(r.preference, str(r.exchange).rstrip(".")) for r in answers],
-                key=lambda x: x[0],
-            )
-            return True, [host for _, host in mx_hosts]
-        except (dns.resolver.NoAnswer, dns.resolver.NXDOMAIN):
-            # Try A record as fallback
-            try:
-                dns.resolver.resolve(domain, "A", lifetime=timeout)
-                return True, [domain]
-            except Exception:
-                return False, []
-        except dns.resolver.NoNameservers:
-            return False, []
-    except ImportError:
+    domain = domain.lower()
+    cached = _mx_cache_get(domain)
+    if cached is not None:
+        return cached
+
+    if dns is None:
         # Fallback to socket-based MX check
         try:
             socket.setdefaulttimeout(timeout)
             mx_host = socket.getfqdn(domain)
             socket.getaddrinfo(domain, 25, socket.AF_INET)
-            return True, [mx_host]
+            return _mx_cache_put(domain, True, [mx_host], _MX_FALLBACK_TTL)
         except (socket.gaierror, socket.herror, OSError):
-            return False, []
+            return _mx_cache_put(domain, False, [])
 
+    resolver = _get_resolver()
+    try:
+        answers = resolver.resolve(domain, "MX", lifetime=timeout)
+        return _mx_cache_put(domain, True, _sorted_mx_hosts(answers), answers.rrset.ttl)
+    except (dns.resolver.NoAnswer, dns.resolver.NXDOMAIN):
+        # Try A record as fallback
+        try:
+            answers = resolver.resolve(domain, "A", lifetime=timeout)
+            return _mx_cache_put(domain, True, [domain], answers.rrset.ttl)
+        except Exception:
+            return _mx_cache_put(domain, False, [])
+    except dns.resolver.NoNameservers:
+        return _mx_cache_put(domain, False, [])
+
+
+async def check_mx_records_async(domain: str, timeout: float = 5.0) -> tuple[bool, list[str]]:
+    """Async variant of check_mx_records sharing its cache, for concurrent bulk lookups."""
+    domain = domain.lower()
+    cached = _mx_cache_get(domain)
+    if cached is not None:
+        return cached
+    if dns is None:
+        return await asyncio.to_thread(check_mx_records, domain, timeout)
+
+    resolver = _get_async_resolver()
+    try:
+        answers = await resolver.resolve(domain, "MX", lifetime=timeout)
+        return _mx_cache_put(domain, True, _sorted_mx_hosts(answers), answers.rrset.ttl)
+    except (dns.resolver.NoAnswer, dns.resolver.NXDOMAIN):
+        try:
+            answers = await resolver.resolve(domain, "A", lifetime=timeout)
+            return _mx_cache_put(domain, True, [domain], answers.rrset.ttl)
+        except Exception:
+            return _mx_cache_put(domain, False, [])
+    except dns.resolver.NoNameservers:
+        return _mx_cache_put(domain, False, [])
 
-def validate_email(
-    email: str,
-    level: ValidationLevel = ValidationLevel.DOMAIN,
-    check_mx: bool = False,
-) -> ValidationResult:
-    """
-    Comprehensive email validation.
 
-    Args:
-        email: Email address to validate
-        level: Validation strictness level
-        check_mx: Whether to perform MX record lookup (network call)
-
-    Returns:
-        ValidationResult with all findings
-    """
-    result = ValidationResult(email=email.strip().lower())
+def _validate_offline(email: str, level: ValidationLevel) -> tuple[ValidationResult, bool]:
+    """Run syntax and domain checks; returns the result and whether an MX lookup is still due."""
+    email = email.strip().lower()
+    result = ValidationResult(email=email)
 
     # Step 1: Syntax validation
-    syntax_valid, local_part, domain, tld, errors = validate_syntax(email)
+    syntax_valid, local_part, domain, tld, errors = _check_syntax(email)
     result.local_part = local_part
     result.domain = domain
     result.tld = tld
@@ -276,23 +431,22 @@ def validate_email(
         result.valid = False
         result.risk = RiskLevel.CRITICAL
         result.score = 0
-        return result
+        return result, False
 
     if level == ValidationLevel.SYNTAX:
         result.valid = True
-        return result
+        return result, False
 
     # Step 2: Domain-level checks
-    result.is_disposable = check_disposable(domain)
-    result.is_free_provider = check_free_provider(domain)
-    result.is_role_based = check_role_based(local_part)
+    result.is_disposable, result.is_free_provider = _classify_domain(domain)
+    result.is_role_based = _is_role_based(local_part)
 
     if result.is_disposable:
         result.errors.append("Disposable email domain detected")
         result.valid = False
         result.risk = RiskLevel.CRITICAL
         result.score = 5
-        return result
+        return result, False
 
     # Score deductions
     if result.is_role_based:
@@ -312,7 +466,7 @@ def validate_email(
         result.score -= 5
 
     # Suspicious patterns
-    if re.match(r"^[a-z]{1,2}\d{5,}$", local_part):
+    if SUSPICIOUS_LOCAL_REGEX.match(local_part):
         result.warnings.append("Suspicious pattern: short prefix + many digits")
         result.score -= 15
         result.risk = RiskLevel.HIGH
@@ -324,33 +478,64 @@ def validate_email(
     if level in (ValidationLevel.DOMAIN, ValidationLevel.SYNTAX):
         result.valid = True
         result.score = max(0, result.score)
-        return result
+        return result, False
+
+    return result, True
+
 
-    # Step 3: MX record check
-    if level in (ValidationLevel.MX, ValidationLevel.FULL) or check_mx:
-        has_mx, mx_hosts = check_mx_records(domain)
-        result.has_mx_records = has_mx
-        result.mx_records = mx_hosts
+def _apply_mx(result: ValidationResult, has_mx: bool, mx_hosts: list[str]) -> ValidationResult:
+    """Step 3: fold an MX lookup into a result that passed the offline checks."""
+    result.has_mx_records = has_mx
+    result.mx_records = mx_hosts
 
-        if not has_mx:
-            result.errors.append("No MX or A records found for domain")
-            result.valid = False
-            result.risk = RiskLevel.CRITICAL
-            result.score = max(0, result.score - 50)
-            return result
+    if not has_mx:
+        result.errors.append("No MX or A records found for domain")
+        result.valid = False
+        result.risk = RiskLevel.CRITICAL
+        result.score = max(0, result.score - 50)
+        return result
 
     result.valid = True
     result.score = max(0, min(100, result.score))
     return result
 
 
-def validate_emails_bulk(
+def validate_email(
+    email: str,
+    level: ValidationLevel = ValidationLevel.DOMAIN,
+    check_mx: bool = False,
+) -> ValidationResult:
+    """
+    Comprehensive email validation.
+
+    Args:
+        email: Email address to validate
+        level: Validation strictness level
+        check_mx: Whether to perform MX record lookup (network call)
+
+    Returns:
+        ValidationResult with all findings
+    """
+    result, needs_mx = _validate_offline(email, level)
+    if not needs_mx:
+        return result
+    return _apply_mx(result, *check_mx_records(result.domain))
+
+
+# Cap on in-flight DNS queries during bulk validation
+_MX_CONCURRENCY = 64
+
+
+async def validate_emails_bulk(
     emails: list[str],
     level: ValidationLevel = ValidationLevel.DOMAIN,
 ) -> dict:
     """
     Validate a batch of emails and return summary statistics.
 
+    Each distinct address is validated once and repeats share its result;
+    MX lookups (level mx/full) run concurrently, once per distinct domain.
+
     Returns:
         {
             "total": int,
@@ -363,6 +548,29 @@ def validate_emails_bulk(
             "results": [ValidationResult.to_dict(), ...]
         }
     """
+    distinct = list(dict.fromkeys(emails))
+    prelim = [_validate_offline(email, level) for email in distinct]
+
+    unique_domains = list({r.domain for r, needs_mx in prelim if needs_mx})
+    if unique_domains:
+        semaphore = asyncio.Semaphore(_MX_CONCURRENCY)
+
+        async def lookup(domain: str) -> tuple[bool, list[str]]:
+            async with semaphore:
+                return await check_mx_records_async(domain)
+
+        lookups = await asyncio.gather(*(lookup(d) for d in unique_domains))
+        mx_by_domain = dict(zip(unique_domains, lookups))
+    else:
+        mx_by_domain = {}
+
+    by_email: dict[str, tuple[ValidationResult, dict]] = {}
+    for email, (r, needs_mx) in zip(distinct, prelim):
+        if needs_mx:
+            has_mx, mx_hosts = mx_by_domain[r.domain]
+            _apply_mx(r, has_mx, list(mx_hosts))
+        by_email[email] = r, r.to_dict()
+
     results = []
     risk_dist = {"low": 0, "medium": 0, "high": 0, "critical": 0}
     valid_count = 0
@@ -371,8 +579,8 @@ def validate_emails_bulk(
     role_based_count = 0
 
     for email in emails:
-        r = validate_email(email, level=level, check_mx=False)
-        results.append(r.to_dict())
+        r, as_dict = by_email[email]
+        results.append(as_dict)
         risk_dist[r.risk.value] += 1
         total_score += r.score
         if r.valid:
@@ -1,16 +1,24 @@
 """Lead scoring engine — calculates, updates, and manages contact scores."""
 
+import hashlib
 import json
 import math
+import time
+from bisect import bisect_right
+from collections.abc import AsyncIterator
 from datetime import datetime, timezone
 from typing import Optional
 
-from sqlalchemy import delete, func, select
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models import Contact
+from app.config import get_settings
+from app.models import Contact, new_uuid, utcnow
 from app.models.lead_score import ContactScore, ScoreEvent, ScoringRule, SuppressionList
 
+settings = get_settings()
 
 # ── Grade thresholds ───────────────────────────────────
 GRADE_THRESHOLDS = [
@@ -33,21 +41,24 @@ LIFECYCLE_THRESHOLDS = [
 ]
 
 
+# Ascending cutoffs for bisect; index i covers [cutoff[i], cutoff[i+1])
+_GRADE_CUTOFFS = [threshold for threshold, _ in reversed(GRADE_THRESHOLDS)]
+_GRADE_LABELS = [grade for _, grade in reversed(GRADE_THRESHOLDS)]
+_LIFECYCLE_CUTOFFS = [threshold for threshold, _ in reversed(LIFECYCLE_THRESHOLDS)]
+_LIFECYCLE_LABELS = [stage for _, stage in reversed(LIFECYCLE_THRESHOLDS)]
+
+
 def _score_to_grade(score: float) -> str:
-    for threshold, grade in GRADE_THRESHOLDS:
-        if score >= threshold:
-            return grade
-    return "F"
+    idx = bisect_right(_GRADE_CUTOFFS, score) - 1
+    return _GRADE_LABELS[idx] if idx >= 0 else "F"
 
 
 def _score_to_lifecycle(score: float, current: str) -> str:
     """Determine lifecycle stage from score. Never auto-demote from customer/evangelist."""
     if current in ("customer", "evangelist"):
         return current
-    for threshold, stage in LIFECYCLE_THRESHOLDS:
-        if score >= threshold:
-            return stage
-    return "subscriber"
+    idx = bisect_right(_LIFECYCLE_CUTOFFS, score) - 1
+    return _LIFECYCLE_LABELS[idx] if idx >= 0 else "subscriber"
 
 
 # ── Profile completeness scoring ───────────────────────
@@ -77,11 +88,14 @@ def calculate_profile_score(contact: Contact) -> float:
 
 
 # ── Recency scoring ───────────────────────────────────
-def calculate_recency_score(last_activity: Optional[datetime]) -> float:
+def calculate_recency_score(
+    last_activity: Optional[datetime], now: Optional[datetime] = None
+) -> float:
     """Score 0-20 based on recency of last engagement. Decays over 90 days."""
     if not last_activity:
         return 0.0
-    now = datetime.now(timezone.utc)
+    if now is None:
+        now = datetime.now(timezone.utc)
     if last_activity.tzinfo is None:
         last_activity = last_activity.replace(tzinfo=timezone.utc)
     days_ago = (now - last_activity).total_seconds() / 86400
@@ -94,18 +108,33 @@ def calculate_recency_score(last_activity: Optional[datetime]) -> float:
 
 
 # ── Core scoring engine ───────────────────────────────
-async def record_score_event(
+async def _load_contact_score(db: AsyncSession, contact_id: str) -> ContactScore:
+    """Fetch the contact's score row, creating it if missing."""
+    result = await db.execute(
+        select(ContactScore).where(ContactScore.contact_id == contact_id)
+    )
+    contact_score = result.scalar_one_or_none()
+
+    if not contact_score:
+        contact_score = ContactScore(contact_id=contact_id, total_score=0, engagement_score=0)
+        db.add(contact_score)
+        await db.flush()
+    return contact_score
+
+
+def _stage_score_event(
     db: AsyncSession,
-    contact_id: str,
+    contact_score: ContactScore,
     event_type: str,
     points: float,
-    reason: str = "",
-    rule_id: Optional[str] = None,
-    metadata: Optional[dict] = None,
+    reason: str,
+    rule_id: Optional[str],
+    metadata: Optional[dict],
+    now: datetime,
 ) -> ScoreEvent:
-    """Record a scoring event and update the contact's total score."""
+    """Add a scoring event and apply it to the in-memory score; the caller commits."""
     event = ScoreEvent(
-        contact_id=contact_id,
+        contact_id=contact_score.contact_id,
         rule_id=rule_id,
         event_type=event_type,
         points=points,
@@ -114,19 +143,8 @@ async def record_score_event(
     )
     db.add(event)
 
-    # Upsert contact score
-    result = await db.execute(
-        select(ContactScore).where(ContactScore.contact_id == contact_id)
-    )
-    contact_score = result.scalar_one_or_none()
-
-    if not contact_score:
-        contact_score = ContactScore(contact_id=contact_id, total_score=0, engagement_score=0)
-        db.add(contact_score)
-        await db.flush()
-
     contact_score.engagement_score = max(0, (contact_score.engagement_score or 0) + points)
-    contact_score.last_activity_at = datetime.now(timezone.utc)
+    contact_score.last_activity_at = now
 
     # Recalculate total
     contact_score.recency_score = calculate_recency_score(contact_score.last_activity_at)
@@ -139,8 +157,25 @@ async def record_score_event(
     contact_score.lifecycle_stage = _score_to_lifecycle(
         contact_score.total_score, contact_score.lifecycle_stage
     )
-    contact_score.score_updated_at = datetime.now(timezone.utc)
+    contact_score.score_updated_at = now
+    return event
+
 
+async def record_score_event(
+    db: AsyncSession,
+    contact_id: str,
+    event_type: str,
+    points: float,
+    reason: str = "",
+    rule_id: Optional[str] = None,
+    metadata: Optional[dict] = None,
+) -> ScoreEvent:
+    """Record a scoring event and update the contact's total score."""
+    contact_score = await _load_contact_score(db, contact_id)
+    event = _stage_score_event(
+        db, contact_score, event_type, points, reason, rule_id, metadata,
+        datetime.now(timezone.utc),
+    )
     await db.commit()
     return event
 
@@ -203,6 +238,78 @@ async def recalculate_contact_score(db: AsyncSession, contact_id: str) -> Contac
     return contact_score
 
 
+async def recalculate_all_scores_bulk(db: AsyncSession, batch_size: int = 1000) -> int:
+    """Recalculate every contact's score in batches. Returns the number of contacts scored.
+
+    Same formula as recalculate_contact_score, with one aggregate query and one
+    executemany write per batch instead of several round-trips per contact.
+    """
+    now = datetime.now(timezone.utc)
+    events = (
+        select(
+            ScoreEvent.contact_id,
+            func.coalesce(func.sum(ScoreEvent.points), 0).label("points"),
+            func.max(ScoreEvent.created_at).label("last_event"),
+        )
+        .group_by(ScoreEvent.contact_id)
+        .subquery()
+    )
+
+    scored = 0
+    last_id = ""
+    while True:
+        rows = (
+            await db.execute(
+                select(
+                    Contact,
+                    events.c.points,
+                    events.c.last_event,
+                    ContactScore.id,
+                    ContactScore.lifecycle_stage,
+                )
+                .outerjoin(events, events.c.contact_id == Contact.id)
+                .outerjoin(ContactScore, ContactScore.contact_id == Contact.id)
+                .where(Contact.id > last_id)
+                .order_by(Contact.id)
+                .limit(batch_size)
+            )
+        ).all()
+        if not rows:
+            break
+
+        updates, inserts = [], []
+        for contact, points, last_event, score_id, stage in rows:
+            engagement = max(0, float(points or 0))
+            profile_score = calculate_profile_score(contact)
+            recency_score = calculate_recency_score(last_event, now)
+            total = engagement + profile_score + recency_score
+            values = {
+                "engagement_score": engagement,
+                "profile_score": profile_score,
+                "recency_score": recency_score,
+                "total_score": total,
+                "grade": _score_to_grade(total),
+                "lifecycle_stage": _score_to_lifecycle(total, stage or "subscriber"),
+                "last_activity_at": last_event,
+                "score_updated_at": now,
+            }
+            if score_id:
+                updates.append({"id": score_id, **values})
+            else:
+                inserts.append({"contact_id": contact.id, **values})
+
+        if updates:
+            await db.execute(update(ContactScore), updates)
+        if inserts:
+            await db.execute(insert(ContactScore), inserts)
+        await db.commit()
+
+        scored += len(rows)
+        last_id = rows[-1][0].id
+
+    return scored
+
+
 async def get_score_leaderboard(
     db: AsyncSession,
     limit: int = 50,
@@ -210,6 +317,12 @@ async def get_score_leaderboard(
     lifecycle_stage: Optional[str] = None,
 ) -> list[dict]:
     """Get top scored contacts — leaderboard view."""
+    stmt = _leaderboard_stmt(min_score, lifecycle_stage).limit(limit)
+    result = await db.execute(stmt)
+    return [_leaderboard_row(row) for row in result.all()]
+
+
+def _leaderboard_stmt(min_score: float, lifecycle_stage: Optional[str]):
     stmt = (
         select(ContactScore, Contact.email, Contact.first_name, Contact.last_name)
         .join(Contact, Contact.id == ContactScore.contact_id)
@@ -217,30 +330,39 @@ async def get_score_leaderboard(
     )
     if lifecycle_stage:
         stmt = stmt.where(ContactScore.lifecycle_stage == lifecycle_stage)
-    stmt = stmt.order_by(ContactScore.total_score.desc()).limit(limit)
-
-    result = await db.execute(stmt)
-    rows = result.all()
-
-    return [
-        {
-            "contact_id": row.ContactScore.contact_id,
-            "email": row.email,
-            "name": f"{row.first_name or ''} {row.last_name or ''}".strip(),
-            "total_score": round(row.ContactScore.total_score, 2),
-            "engagement_score": round(row.ContactScore.engagement_score, 2),
-            "profile_score": round(row.ContactScore.profile_score, 2),
-            "recency_score": round(row.ContactScore.recency_score, 2),
-            "grade": row.ContactScore.grade,
-            "lifecycle_stage": row.ContactScore.lifecycle_stage,
-            "last_activity_at": (
-                row.ContactScore.last_activity_at.isoformat()
-                if row.ContactScore.last_activity_at
-                else None
-            ),
-        }
-        for row in rows
-    ]
+    return stmt.order_by(ContactScore.total_score.desc())
+
+
+def _leaderboard_row(row) -> dict:
+    score = row.ContactScore
+    return {
+        "contact_id": score.contact_id,
+        "email": row.email,
+        "name": f"{row.first_name or ''} {row.last_name or ''}".strip(),
+        "total_score": round(score.total_score, 2),
+        "engagement_score": round(score.engagement_score, 2),
+        "profile_score": round(score.profile_score, 2),
+        "recency_score": round(score.recency_score, 2),
+        "grade": score.grade,
+        "lifecycle_stage": score.lifecycle_stage,
+        "last_activity_at": score.last_activity_at.isoformat() if score.last_activity_at else None,
+    }
+
+
+async def stream_score_leaderboard(
+    db: AsyncSession,
+    limit: Optional[int] = None,
+    min_score: float = 0,
+    lifecycle_stage: Optional[str] = None,
+    batch_size: int = 500,
+) -> AsyncIterator[dict]:
+    """Yield leaderboard rows one at a time from a server-side cursor (bulk export)."""
+    stmt = _leaderboard_stmt(min_score, lifecycle_stage).execution_options(yield_per=batch_size)
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    result = await db.stream(stmt)
+    async for row in result:
+        yield _leaderboard_row(row)
 
 
 async def get_lifecycle_distribution(db: AsyncSession) -> dict:
@@ -264,20 +386,26 @@ async def process_scoring_rules(
         )
     )
     rules = result.scalars().all()
-    events = []
 
+    # Per-rule event counts for every capped rule, in one query
+    capped_ids = [r.id for r in rules if r.max_per_contact and r.max_per_contact > 0]
+    counts: dict[str, int] = {}
+    if capped_ids:
+        count_rows = await db.execute(
+            select(ScoreEvent.rule_id, func.count(ScoreEvent.id))
+            .where(
+                ScoreEvent.contact_id == contact_id,
+                ScoreEvent.rule_id.in_(capped_ids),
+            )
+            .group_by(ScoreEvent.rule_id)
+        )
+        counts = dict(count_rows.all())
+
+    matched = []
     for rule in rules:
         # Check max_per_contact limit
         if rule.max_per_contact and rule.max_per_contact > 0:
-            count = (
-                await db.execute(
-                    select(func.count(ScoreEvent.id)).where(
-                        ScoreEvent.contact_id == contact_id,
-                        ScoreEvent.rule_id == rule.id,
-                    )
-                )
-            ).scalar() or 0
-            if count >= rule.max_per_contact:
+            if counts.get(rule.id, 0) >= rule.max_per_contact:
                 continue
 
         # Check condition filter
@@ -293,21 +421,88 @@ async def process_scoring_rules(
             except (json.JSONDecodeError, TypeError):
                 pass
 
-        event = await record_score_event(
+        matched.append(rule)
+
+    if not matched:
+        return []
+
+    # Apply every matched rule to one score row and commit once
+    contact_score = await _load_contact_score(db, contact_id)
+    now = datetime.now(timezone.utc)
+    events = [
+        _stage_score_event(
             db,
-            contact_id=contact_id,
+            contact_score,
             event_type=event_type,
             points=rule.points,
             reason=f"Rule: {rule.name}",
             rule_id=rule.id,
             metadata=metadata,
+            now=now,
         )
-        events.append(event)
-
+        for rule in matched
+    ]
+    await db.commit()
     return events
 
 
 # ── Suppression list management ────────────────────────
+class _BloomFilter:
+    """Fixed-size Bloom filter over strings: no false negatives, tunable false positives."""
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        capacity = max(capacity, 1)
+        self._size = max(64, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self._hashes = max(1, round(self._size / capacity * math.log(2)))
+        self._bits = bytearray((self._size + 7) // 8)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self._size for i in range(self._hashes))
+
+    def add(self, item: str) -> None:
+        for pos in self._positions(item):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+
+_suppression_bloom: Optional[_BloomFilter] = None
+_suppression_bloom_expires = 0.0
+
+
+async def _get_suppression_bloom(db: AsyncSession) -> Optional[_BloomFilter]:
+    """Return the in-process suppression filter, rebuilding it from the DB when stale.
+
+    Disabled unless ``suppression_bloom_ttl_seconds`` is set. Entries added by
+    other processes stay invisible until the next rebuild, which would let mail
+    reach suppressed addresses, so only enable it when one process serves the API.
+    """
+    global _suppression_bloom, _suppression_bloom_expires
+    ttl = settings.suppression_bloom_ttl_seconds
+    if ttl <= 0:
+        return None
+    now = time.monotonic()
+    if _suppression_bloom is None or now >= _suppression_bloom_expires:
+        emails = (await db.execute(select(SuppressionList.email))).scalars().all()
+        bloom = _BloomFilter(capacity=max(len(emails) * 2, 1024))
+        for email in emails:
+            bloom.add(email)
+        _suppression_bloom = bloom
+        _suppression_bloom_expires = now + ttl
+    return _suppression_bloom
+
+
+def _dialect_insert(db: AsyncSession):
+    """insert() for the session's dialect, which supports ON CONFLICT on PostgreSQL and SQLite."""
+    if db.get_bind().dialect.name == "postgresql":
+        return pg_insert
+    return sqlite_insert
+
+
 async def add_to_suppression(
     db: AsyncSession,
     email: str,
@@ -315,38 +510,70 @@ async def add_to_suppression(
     source: str = "",
     notes: str = "",
 ) -> SuppressionList:
-    """Add email to global suppression list."""
-    # Check if already exists
-    result = await db.execute(
-        select(SuppressionList).where(SuppressionList.email == email.lower())
-    )
-    existing = result.scalar_one_or_none()
-    if existing:
-        existing.reason = reason
-        existing.source = source
-        existing.notes = notes
-        await db.commit()
-        return existing
-
-    entry = SuppressionList(
-        email=email.lower(),
+    """Add email to global suppression list (upsert: existing entries get the new reason)."""
+    email = email.lower()
+    insert_ = _dialect_insert(db)
+    stmt = insert_(SuppressionList).values(
+        id=new_uuid(),
+        email=email,
         reason=reason,
         source=source,
         notes=notes,
+        created_at=utcnow(),
+    )
+    stmt = (
+        stmt.on_conflict_do_update(
+            index_elements=[SuppressionList.email],
+            set_={"reason": reason, "source": source, "notes": notes},
+        )
+        .returning(SuppressionList)
+        .execution_options(populate_existing=True)
     )
-    db.add(entry)
+    entry = (await db.scalars(stmt)).one()
     await db.commit()
+    if _suppression_bloom is not None:
+        _suppression_bloom.add(email)
     return entry
 
 
 async def check_suppression(db: AsyncSession, email: str) -> Optional[SuppressionList]:
-    """Check if an email is on the suppression list."""
+    """Check if an email is on the suppression list.
+
+    Addresses the Bloom filter rules out skip the DB round-trip; possible hits
+    (including stale ones after a removal) are confirmed with a query.
+    """
+    email = email.lower()
+    bloom = await _get_suppression_bloom(db)
+    if bloom is not None and email not in bloom:
+        return None
     result = await db.execute(
-        select(SuppressionList).where(SuppressionList.email == email.lower())
+        select(SuppressionList).where(SuppressionList.email == email)
     )
     return result.scalar_one_or_none()
 
 
+_SUPPRESSION_IN_BATCH = 500  # stays under SQLite's bound-parameter limit
+
+
+async def check_suppression_bulk(db: AsyncSession, emails: list[str]) -> set[str]:
+    """Return the subset of emails (lower-cased) that are on the suppression list."""
+    candidates = {email.lower() for email in emails}
+    bloom = await _get_suppression_bloom(db)
+    if bloom is not None:
+        candidates = {email for email in candidates if email in bloom}
+
+    suppressed: set[str] = set()
+    batch = list(candidates)
+    for i in range(0, len(batch), _SUPPRESSION_IN_BATCH):
+        result = await db.execute(
+            select(SuppressionList.email).where(
+                SuppressionList.email.in_(batch[i:i + _SUPPRESSION_IN_BATCH])
+            )
+        )
+        suppressed.update(result.scalars())
+    return suppressed
+
+
 async def remove_from_suppression(db: AsyncSession, email: str) -> bool:
     """Remove email from suppression list."""
     result = await db.execute(
@@ -369,3 +596,18 @@ async def list_suppression(
     stmt = stmt.order_by(SuppressionList.created_at.desc()).offset(skip).limit(limit)
     result = await db.execute(stmt)
     return list(result.scalars().all())
+
+
+async def stream_suppression(
+    db: AsyncSession,
+    reason: Optional[str] = None,
+    batch_size: int = 500,
+) -> AsyncIterator[SuppressionList]:
+    """Yield every suppression entry from a server-side cursor (audit export)."""
+    stmt = select(SuppressionList)
+    if reason:
+        stmt = stmt.where(SuppressionList.reason == reason)
+    stmt = stmt.order_by(SuppressionList.created_at.desc()).execution_options(yield_per=batch_size)
+    result = await db.stream_scalars(stmt)
+    async for entry in result:
+        yield entry
@@ -1,38 +1,78 @@
 """Webhook dispatch service — delivers events to registered endpoints with retry and HMAC signing."""
 
+import asyncio
 import hashlib
 import hmac
 import json
 import time
 from datetime import datetime, timezone
+from functools import lru_cache
 
+import httpx
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.webhook import WebhookDelivery, WebhookEndpoint
 
 
-def sign_payload(payload: str, secret: str) -> str:
+@lru_cache(maxsize=1024)
+def _keyed_hmac(secret: str) -> "hmac.HMAC":
+    """HMAC-SHA256 state with the key pads already absorbed; copy() before use."""
+    return hmac.new(secret.encode(), digestmod=hashlib.sha256)
+
+
+def sign_payload(payload: str | bytes, secret: str) -> str:
     """Generate HMAC-SHA256 signature for webhook payload."""
-    return hmac.new(secret.encode(), payload.encode(), hashlib.sha256).hexdigest()
+    mac = _keyed_hmac(secret).copy()
+    mac.update(payload.encode() if isinstance(payload, str) else payload)
+    return mac.hexdigest()
 
 
-async def dispatch_webhook(
-    db: AsyncSession,
-    endpoint: WebhookEndpoint,
-    event_type: str,
-    payload: dict,
-    attempt: int = 1,
-) -> WebhookDelivery:
-    """Send a webhook event to an endpoint and record the delivery."""
-    import httpx
+_http_client: httpx.AsyncClient | None = None
+_http_client_loop: asyncio.AbstractEventLoop | None = None
 
+
+def _get_http_client() -> httpx.AsyncClient:
+    """Shared AsyncClient for webhook deliveries, recreated if the event loop changes."""
+    global _http_client, _http_client_loop
+    loop = asyncio.get_running_loop()
+    if _http_client is None or _http_client_loop is not loop or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=10.0,
+            limits=httpx.Limits(max_connections=200, max_keepalive_connections=100),
+        )
+        _http_client_loop = loop
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Close the shared webhook client (application shutdown)."""
+    global _http_client, _http_client_loop
+    if _http_client is not None:
+        await _http_client.aclose()
+    _http_client = None
+    _http_client_loop = None
+
+
+def _event_body(event_type: str, payload: dict) -> tuple[str, bytes]:
+    """Serialize an event envelope once; returns the JSON text and its UTF-8 bytes."""
     body = json.dumps({
         "event": event_type,
         "timestamp": datetime.now(timezone.utc).isoformat(),
         "data": payload,
     })
+    return body, body.encode()
 
+
+async def _deliver(
+    client: httpx.AsyncClient,
+    endpoint: WebhookEndpoint,
+    event_type: str,
+    body: str,
+    body_bytes: bytes,
+    attempt: int = 1,
+) -> WebhookDelivery:
+    """POST one serialized event to an endpoint and update its stats; the caller persists the delivery."""
     headers = {
         "Content-Type": "application/json",
         "X-Webhook-Event": event_type,
@@ -40,7 +80,7 @@ async def dispatch_webhook(
     }
 
     if endpoint.secret:
-        sig = sign_payload(body, endpoint.secret)
+        sig = sign_payload(body_bytes, endpoint.secret)
         headers["X-Webhook-Signature-256"] = f"sha256={sig}"
 
     delivery = WebhookDelivery(
@@ -52,12 +92,11 @@ async def dispatch_webhook(
 
     start = time.monotonic()
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            resp = await client.post(endpoint.url, content=body, headers=headers)
-            delivery.response_status = resp.status_code
-            delivery.response_body = resp.text[:2000]
-            delivery.success = 200 <= resp.status_code < 300
-            delivery.duration_ms = int((time.monotonic() - start) * 1000)
+        resp = await client.post(endpoint.url, content=body_bytes, headers=headers)
+        delivery.response_status = resp.status_code
+        delivery.response_body = resp.text[:2000]
+        delivery.success = 200 <= resp.status_code < 300
+        delivery.duration_ms = int((time.monotonic() - start) * 1000)
     except Exception as exc:
         delivery.response_status = 0
         delivery.response_body = str(exc)[:2000]
@@ -78,33 +117,68 @@ async def dispatch_webhook(
         if endpoint.consecutive_failures >= (endpoint.max_failures or 10):
             endpoint.active = False
 
+    return delivery
+
+
+async def dispatch_webhook(
+    db: AsyncSession,
+    endpoint: WebhookEndpoint,
+    event_type: str,
+    payload: dict,
+    attempt: int = 1,
+) -> WebhookDelivery:
+    """Send a webhook event to an endpoint and record the delivery."""
+    body, body_bytes = _event_body(event_type, payload)
+    delivery = await _deliver(_get_http_client(), endpoint, event_type, body, body_bytes, attempt)
     db.add(delivery)
     await db.commit()
     return delivery
 
 
+@lru_cache(maxsize=1024)
+def _parse_events(raw: str) -> frozenset[str]:
+    """Parse an endpoint's stored JSON event list (cached on the raw string)."""
+    try:
+        events = json.loads(raw)
+    except (json.JSONDecodeError, TypeError):
+        return frozenset()
+    return frozenset(events) if isinstance(events, list) else frozenset()
+
+
 async def dispatch_event(
     db: AsyncSession,
     event_type: str,
     payload: dict,
 ) -> list[WebhookDelivery]:
-    """Dispatch an event to all matching active endpoints."""
-    stmt = select(WebhookEndpoint).where(WebhookEndpoint.active.is_(True))
+    """Dispatch an event to all matching active endpoints concurrently."""
+    # Coarse filter in SQL on the stored JSON text, so the needle is the JSON-encoded
+    # event type (quotes and backslashes escaped as stored); exact match below
+    stmt = select(WebhookEndpoint).where(
+        WebhookEndpoint.active.is_(True),
+        WebhookEndpoint.events.contains('"*"')
+        | WebhookEndpoint.events.contains(json.dumps(event_type), autoescape=True),
+    )
     result = await db.execute(stmt)
     endpoints = result.scalars().all()
 
-    deliveries = []
+    matching = []
     for ep in endpoints:
         events = ep.events
-        if isinstance(events, str):
-            try:
-                events = json.loads(events)
-            except (json.JSONDecodeError, TypeError):
-                events = []
+        events = _parse_events(events) if isinstance(events, str) else frozenset(events or ())
 
         # Check if endpoint subscribes to this event
         if "*" in events or event_type in events:
-            delivery = await dispatch_webhook(db, ep, event_type, payload)
-            deliveries.append(delivery)
+            matching.append(ep)
+
+    if not matching:
+        return []
 
-    return deliveries
+    # One envelope for the whole fan-out: serialized and encoded once
+    body, body_bytes = _event_body(event_type, payload)
+    client = _get_http_client()
+    deliveries = await asyncio.gather(
+        *(_deliver(client, ep, event_type, body, body_bytes) for ep in matching)
+    )
+    db.add_all(deliveries)
+    await db.commit()
+    return list(deliveries)
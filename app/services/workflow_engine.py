@@ -2,14 +2,60 @@
 
 import json
 import logging
+import operator
+from collections.abc import Awaitable, Callable
+from functools import lru_cache, partial
+from typing import Any, NamedTuple
 
-from sqlalchemy import select
+from sqlalchemy import insert, inspect, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models import Contact, Tag, Workflow, WorkflowLog
 
 logger = logging.getLogger(__name__)
 
+# Contact columns readable by conditions, and the subset update_field may write
+_CONTACT_FIELDS: frozenset[str] = frozenset(Contact.__table__.columns.keys())
+_CONTACT_UPDATABLE_FIELDS: frozenset[str] = _CONTACT_FIELDS - {"id", "email", "created_at"}
+
+
+@lru_cache(maxsize=256)
+def parse_steps(raw: str) -> tuple[dict, ...]:
+    """Parse a workflow's stored steps JSON once per distinct value; treat the dicts as read-only."""
+    try:
+        steps = json.loads(raw)
+    except (json.JSONDecodeError, TypeError):
+        return ()
+    return tuple(steps) if isinstance(steps, list) else ()
+
+
+class CompiledStep(NamedTuple):
+    """A workflow step with its dispatch resolved: run is a predicate, an action coroutine, or None."""
+
+    type: str
+    run: Callable | None
+    step: dict
+
+
+def _compile_steps(steps: tuple[dict, ...]) -> tuple[CompiledStep, ...]:
+    program = []
+    for step in steps:
+        step_type = step.get("type", "action")
+        if step_type == "condition":
+            run = _compile_condition(step)
+        elif step_type == "action":
+            run = partial(_run_action, step.get("action", ""), step)
+        else:
+            run = None
+        program.append(CompiledStep(step_type, run, step))
+    return tuple(program)
+
+
+@lru_cache(maxsize=256)
+def compile_workflow(raw: str) -> tuple[CompiledStep, ...]:
+    """Compile a workflow's stored steps JSON once per distinct value."""
+    return _compile_steps(parse_steps(raw))
+
 
 async def execute_workflow(workflow: Workflow, contact: Contact | None, context: dict, db: AsyncSession) -> list[dict]:
     """
@@ -22,186 +68,302 @@ async def execute_workflow(workflow: Workflow, contact: Contact | None, context:
         {"type": "action", "action": "send_email", "subject": "Welcome!", "body": "Hello!"},
     ]
 
-    Returns list of step results.
+    Returns list of step results (one per step). When a condition fails, the steps
+    after it are logged as a single WorkflowLog row at the first skipped index,
+    with result {"skipped_range": [first, last]}.
     """
     steps_raw = workflow.steps
-    if isinstance(steps_raw, str):
-        try:
-            steps = json.loads(steps_raw)
-        except (json.JSONDecodeError, TypeError):
-            steps = []
-    else:
-        steps = steps_raw or []
+    program = compile_workflow(steps_raw) if isinstance(steps_raw, str) else _compile_steps(tuple(steps_raw or ()))
+
+    # Preload every tag the steps reference in one query
+    tag_names = {
+        op.step["tag_name"] for op in program
+        if op.step.get("action") in ("tag", "remove_tag") and op.step.get("tag_name")
+    }
+    tag_cache: dict[str, Tag | None] = {}
+    if tag_names and contact:
+        result = await db.execute(select(Tag).where(Tag.name.in_(tag_names)))
+        tag_cache = dict.fromkeys(tag_names)
+        tag_cache.update((tag.name, tag) for tag in result.scalars())
+    tag_ids = None
+    if tag_names and contact:
+        # Callers normally selectin-load tags; load them here once if they did not
+        state = inspect(contact)
+        if state.persistent and "tags" in state.unloaded:
+            await db.refresh(contact, ["tags"])
+        # Ids of the contact's tags, kept in step with contact.tags by the tag actions
+        tag_ids = {tag.id for tag in contact.tags}
 
     results = []
-
-    for i, step in enumerate(steps):
-        step_type = step.get("type", "action")
-
-        if step_type == "condition":
-            passed = evaluate_condition(step, contact, context)
+    # Log rows are written in one executemany INSERT after the loop
+    contact_id = contact.id if contact else None
+    log_rows = []
+
+    def log(step_index: int, status: str, result_json: str) -> None:
+        log_rows.append({
+            "workflow_id": workflow.id,
+            "contact_id": contact_id,
+            "step_index": step_index,
+            "status": status,
+            "result": result_json,
+        })
+
+    for i, op in enumerate(program):
+        if op.type == "condition":
+            passed = op.run(contact, context)
             status = "completed" if passed else "skipped"
             result = {"step": i, "type": "condition", "passed": passed}
             results.append(result)
-
-            # Log
-            db.add(WorkflowLog(
-                workflow_id=workflow.id,
-                contact_id=contact.id if contact else None,
-                step_index=i,
-                status=status,
-                result=json.dumps(result),
-            ))
+            log(i, status, json.dumps(result))
 
             if not passed:
-                # Skip remaining steps
-                for j in range(i + 1, len(steps)):
-                    skip_result = {"step": j, "type": steps[j].get("type", "action"), "skipped": True}
-                    results.append(skip_result)
-                    db.add(WorkflowLog(
-                        workflow_id=workflow.id,
-                        contact_id=contact.id if contact else None,
-                        step_index=j,
-                        status="skipped",
-                        result=json.dumps(skip_result),
-                    ))
+                # Skip remaining steps; they share one aggregate log row
+                for j in range(i + 1, len(program)):
+                    results.append({"step": j, "type": program[j].type, "skipped": True})
+                if i + 1 < len(program):
+                    log(i + 1, "skipped", json.dumps({"skipped_range": [i + 1, len(program) - 1]}))
                 break
 
-        elif step_type == "action":
-            action_result = await execute_action(step, contact, context, db)
+        elif op.type == "action":
+            action_result = await op.run(contact, context, db, tag_cache, tag_ids)
             results.append({"step": i, "type": "action", **action_result})
+            log(
+                i,
+                "completed" if action_result.get("success") else "failed",
+                json.dumps({"step": i, **action_result}),
+            )
 
-            db.add(WorkflowLog(
-                workflow_id=workflow.id,
-                contact_id=contact.id if contact else None,
-                step_index=i,
-                status="completed" if action_result.get("success") else "failed",
-                result=json.dumps({"step": i, **action_result}),
-            ))
-
-        elif step_type == "delay":
+        elif op.type == "delay":
             # In a real system, this would schedule a delayed execution
             # For now we just log it
-            result = {"step": i, "type": "delay", "hours": step.get("hours", 0), "noted": True}
+            result = {"step": i, "type": "delay", "hours": op.step.get("hours", 0), "noted": True}
             results.append(result)
-            db.add(WorkflowLog(
-                workflow_id=workflow.id,
-                contact_id=contact.id if contact else None,
-                step_index=i,
-                status="completed",
-                result=json.dumps(result),
-            ))
+            log(i, "completed", json.dumps(result))
 
+    if log_rows:
+        await db.execute(insert(WorkflowLog), log_rows)
     await db.commit()
     return results
 
 
-def evaluate_condition(step: dict, contact: Contact | None, context: dict) -> bool:
-    """Evaluate a condition step against contact data or context."""
-    field = step.get("field", "")
-    operator = step.get("operator", "eq")
-    value = step.get("value", "")
+def _never(actual: Any) -> bool:
+    return False
+
 
-    # Get the actual value from contact or context
-    actual = None
-    if contact and hasattr(contact, field):
-        actual = getattr(contact, field)
-    elif field in context:
-        actual = context[field]
+def _op_eq(value: Any) -> Callable[[Any], bool]:
+    value_str = str(value).lower()
+    return lambda actual: str(actual).lower() == value_str
 
-    if actual is None:
-        return operator == "is_null"
 
-    # String comparison
-    actual_str = str(actual).lower()
+def _op_neq(value: Any) -> Callable[[Any], bool]:
     value_str = str(value).lower()
+    return lambda actual: str(actual).lower() != value_str
 
-    if operator == "eq":
-        return actual_str == value_str
-    elif operator == "neq":
-        return actual_str != value_str
-    elif operator == "contains":
-        return value_str in actual_str
-    elif operator == "not_contains":
-        return value_str not in actual_str
-    elif operator == "gt":
-        try:
-            return float(actual) > float(value)
-        except (ValueError, TypeError):
-            return False
-    elif operator == "lt":
+
+def _op_contains(value: Any) -> Callable[[Any], bool]:
+    value_str = str(value).lower()
+    return lambda actual: value_str in str(actual).lower()
+
+
+def _op_not_contains(value: Any) -> Callable[[Any], bool]:
+    value_str = str(value).lower()
+    return lambda actual: value_str not in str(actual).lower()
+
+
+def _numeric_op(compare: Callable[[float, float], bool]) -> Callable[[Any], Callable[[Any], bool]]:
+    def build(value: Any) -> Callable[[Any], bool]:
         try:
-            return float(actual) < float(value)
+            value_float = float(value)
         except (ValueError, TypeError):
+            return _never
+
+        def predicate(actual: Any) -> bool:
+            try:
+                return compare(float(actual), value_float)
+            except (ValueError, TypeError):
+                return False
+
+        return predicate
+
+    return build
+
+
+def _op_is_true(value: Any) -> Callable[[Any], bool]:
+    return bool
+
+
+def _op_is_false(value: Any) -> Callable[[Any], bool]:
+    return lambda actual: not actual
+
+
+def _op_is_null(value: Any) -> Callable[[Any], bool]:
+    return _never
+
+
+def _op_unknown(op_name: str) -> Callable[[Any], Callable[[Any], bool]]:
+    def build(value: Any) -> Callable[[Any], bool]:
+        def predicate(actual: Any) -> bool:
+            logger.warning(f"Unknown operator: {op_name}")
             return False
-    elif operator == "is_true":
-        return bool(actual)
-    elif operator == "is_false":
-        return not bool(actual)
-    elif operator == "is_null":
-        return actual is None
-    else:
-        logger.warning(f"Unknown operator: {operator}")
-        return False
 
+        return predicate
 
-async def execute_action(step: dict, contact: Contact | None, context: dict, db: AsyncSession) -> dict:
-    """Execute an action step."""
-    action = step.get("action", "")
+    return build
 
-    try:
-        if action == "tag" and contact:
-            tag_name = step.get("tag_name", "")
-            if tag_name:
-                # Find or create tag
-                result = await db.execute(select(Tag).where(Tag.name == tag_name))
-                tag = result.scalar_one_or_none()
-                if not tag:
-                    tag = Tag(name=tag_name)
-                    db.add(tag)
-                    await db.flush()
-                if tag not in contact.tags:
-                    contact.tags.append(tag)
-            return {"success": True, "action": "tag", "tag_name": tag_name}
-
-        elif action == "remove_tag" and contact:
-            tag_name = step.get("tag_name", "")
-            if tag_name:
-                result = await db.execute(select(Tag).where(Tag.name == tag_name))
-                tag = result.scalar_one_or_none()
-                if tag and tag in contact.tags:
-                    contact.tags.remove(tag)
-            return {"success": True, "action": "remove_tag", "tag_name": tag_name}
-
-        elif action == "update_field" and contact:
-            field = step.get("field", "")
-            value = step.get("value", "")
-            if field and hasattr(contact, field) and field not in ("id", "email", "created_at"):
-                setattr(contact, field, value)
-            return {"success": True, "action": "update_field", "field": field, "value": value}
-
-        elif action == "send_email":
-            # In production, this would send via the email service
-            # For now, we log the intent
-            return {
-                "success": True,
-                "action": "send_email",
-                "subject": step.get("subject", ""),
-                "to": contact.email if contact else "unknown",
-                "queued": True,
-            }
-
-        elif action == "unsubscribe" and contact:
-            contact.subscribed = False
-            return {"success": True, "action": "unsubscribe"}
-
-        elif action == "subscribe" and contact:
-            contact.subscribed = True
-            return {"success": True, "action": "subscribe"}
 
-        else:
-            return {"success": False, "action": action, "error": "Unknown action or no contact"}
+# Operator builders: each takes the step's literal value once at compile time and
+# returns a predicate over the (non-None) actual value
+_OPS: dict[str, Callable[[Any], Callable[[Any], bool]]] = {
+    "eq": _op_eq,
+    "neq": _op_neq,
+    "contains": _op_contains,
+    "not_contains": _op_not_contains,
+    "gt": _numeric_op(operator.gt),
+    "lt": _numeric_op(operator.lt),
+    "is_true": _op_is_true,
+    "is_false": _op_is_false,
+    "is_null": _op_is_null,
+}
+
+
+def _compile_condition(step: dict) -> Callable[[Contact | None, dict], bool]:
+    """Resolve a condition step's field source, operator and literal value into a predicate."""
+    field = step.get("field", "")
+    op_name = step.get("operator", "eq")
+    build = _OPS.get(op_name) or _op_unknown(op_name)
+    predicate = build(step.get("value", ""))
+    is_null = op_name == "is_null"
+    contact_field = field in _CONTACT_FIELDS
+
+    def condition(contact: Contact | None, context: dict) -> bool:
+        # Get the actual value from contact or context
+        actual = getattr(contact, field) if contact and contact_field else context.get(field)
+        if actual is None:
+            return is_null
+        return predicate(actual)
 
+    return condition
+
+
+def evaluate_condition(step: dict, contact: Contact | None, context: dict) -> bool:
+    """Evaluate a condition step against contact data or context."""
+    return _compile_condition(step)(contact, context)
+
+
+async def _get_tag(db: AsyncSession, tag_name: str, tag_cache: dict[str, Tag | None] | None) -> Tag | None:
+    """Look up a tag by name, consulting and filling tag_cache when given."""
+    if tag_cache is not None and tag_name in tag_cache:
+        return tag_cache[tag_name]
+    result = await db.execute(select(Tag).where(Tag.name == tag_name))
+    tag = result.scalar_one_or_none()
+    if tag_cache is not None:
+        tag_cache[tag_name] = tag
+    return tag
+
+
+async def _action_tag(step: dict, contact: Contact, context: dict, db: AsyncSession, tag_cache, tag_ids) -> dict:
+    tag_name = step.get("tag_name", "")
+    if tag_name:
+        if tag_ids is None:
+            tag_ids = {t.id for t in contact.tags}
+        # Find or create tag
+        tag = await _get_tag(db, tag_name, tag_cache)
+        if not tag:
+            tag = Tag(name=tag_name)
+            db.add(tag)
+            await db.flush()
+            if tag_cache is not None:
+                tag_cache[tag_name] = tag
+        if tag.id not in tag_ids:
+            contact.tags.append(tag)
+            tag_ids.add(tag.id)
+    return {"success": True, "action": "tag", "tag_name": tag_name}
+
+
+async def _action_remove_tag(step: dict, contact: Contact, context: dict, db: AsyncSession, tag_cache, tag_ids) -> dict:
+    tag_name = step.get("tag_name", "")
+    if tag_name:
+        if tag_ids is None:
+            tag_ids = {t.id for t in contact.tags}
+        tag = await _get_tag(db, tag_name, tag_cache)
+        if tag and tag.id in tag_ids:
+            contact.tags.remove(tag)
+            tag_ids.discard(tag.id)
+    return {"success": True, "action": "remove_tag", "tag_name": tag_name}
+
+
+async def _action_update_field(step: dict, contact: Contact, context: dict, db: AsyncSession, tag_cache, tag_ids) -> dict:
+    field = step.get("field", "")
+    value = step.get("value", "")
+    if field in _CONTACT_UPDATABLE_FIELDS:
+        setattr(contact, field, value)
+    return {"success": True, "action": "update_field", "field": field, "value": value}
+
+
+async def _action_send_email(step: dict, contact: Contact | None, context: dict, db: AsyncSession, tag_cache, tag_ids) -> dict:
+    # In production, this would send via the email service
+    # For now, we log the intent
+    return {
+        "success": True,
+        "action": "send_email",
+        "subject": step.get("subject", ""),
+        "to": contact.email if contact else "unknown",
+        "queued": True,
+    }
+
+
+async def _action_unsubscribe(step: dict, contact: Contact, context: dict, db: AsyncSession, tag_cache, tag_ids) -> dict:
+    contact.subscribed = False
+    return {"success": True, "action": "unsubscribe"}
+
+
+async def _action_subscribe(step: dict, contact: Contact, context: dict, db: AsyncSession, tag_cache, tag_ids) -> dict:
+    contact.subscribed = True
+    return {"success": True, "action": "subscribe"}
+
+
+# Action handlers and whether each needs a contact to act on
+_ACTIONS: dict[str, tuple[Callable[..., Awaitable[dict]], bool]] = {
+    "tag": (_action_tag, True),
+    "remove_tag": (_action_remove_tag, True),
+    "update_field": (_action_update_field, True),
+    "send_email": (_action_send_email, False),
+    "unsubscribe": (_action_unsubscribe, True),
+    "subscribe": (_action_subscribe, True),
+}
+
+
+async def _run_action(
+    action: str,
+    step: dict,
+    contact: Contact | None,
+    context: dict,
+    db: AsyncSession,
+    tag_cache: dict[str, Tag | None] | None = None,
+    tag_ids: set[str] | None = None,
+) -> dict:
+    handler, needs_contact = _ACTIONS.get(action, (None, False))
+    if handler is None or (needs_contact and not contact):
+        return {"success": False, "action": action, "error": "Unknown action or no contact"}
+    try:
+        return await handler(step, contact, context, db, tag_cache, tag_ids)
     except Exception as e:
         logger.error(f"Action execution failed: {e}")
         return {"success": False, "action": action, "error": str(e)}
+
+
+async def execute_action(
+    step: dict,
+    contact: Contact | None,
+    context: dict,
+    db: AsyncSession,
+    tag_cache: dict[str, Tag | None] | None = None,
+    tag_ids: set[str] | None = None,
+) -> dict:
+    """
+    Execute an action step.
+
+    tag_cache maps tag names to preloaded tags (None = known missing); tag_ids is
+    the set of the contact's tag ids, updated in place by tag/remove_tag.
+    """
+    return await _run_action(step.get("action", ""), step, contact, context, db, tag_cache, tag_ids)
@@ -1,6 +1,11 @@
 """Celery app configuration."""
 
+import asyncio
+from collections.abc import Coroutine
+from typing import Any
+
 from celery import Celery
+from celery.signals import worker_process_init, worker_process_shutdown
 
 from app.config import get_settings
 
@@ -24,3 +29,38 @@ celery_app.conf.update(
 )
 
 celery_app.autodiscover_tasks(["app.tasks"])
+
+# One event loop per worker process, so the DB pool and HTTP clients survive between tasks
+_worker_loop: asyncio.AbstractEventLoop | None = None
+
+
+@worker_process_init.connect
+def _init_worker_loop(**kwargs):
+    global _worker_loop
+    from app.database import engine
+
+    # Connections inherited from the parent process must not be reused after fork
+    engine.sync_engine.dispose(close=False)
+    _worker_loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(_worker_loop)
+
+
+@worker_process_shutdown.connect
+def _close_worker_loop(**kwargs):
+    global _worker_loop
+    if _worker_loop is None:
+        return
+    from app.database import engine
+    from app.services.email import close_smtp_pool
+
+    _worker_loop.run_until_complete(close_smtp_pool())
+    _worker_loop.run_until_complete(engine.dispose())
+    _worker_loop.close()
+    _worker_loop = None
+
+
+def run_async(coro: Coroutine[Any, Any, Any]) -> Any:
+    """Run a coroutine on the worker's persistent loop (a fresh loop outside a worker process)."""
+    if _worker_loop is None:
+        return asyncio.run(coro)
+    return _worker_loop.run_until_complete(coro)
@@ -1,70 +1,262 @@
 """Email campaign sending tasks."""
 
 import asyncio
+import json
 import logging
 
-from app.tasks.celery_app import celery_app
+from aiosmtplib import SMTPException
+from celery import chord
+from sqlalchemy.exc import InterfaceError, OperationalError
+
+from app.tasks.celery_app import celery_app, run_async
 
 logger = logging.getLogger(__name__)
 
+# Recipients per concurrent send batch (and EmailEvent rows per executemany INSERT)
+EVENT_INSERT_BATCH = 1000
+
+# Recipients per Celery shard; each shard is one send_contact_batch_task
+CAMPAIGN_SHARD_SIZE = 500
+
+# Seconds a campaign's resolved recipient ids stay cached for task retries
+CONTACT_IDS_TTL = 86400
+
+# Dropped DB connections, lock contention and an unreachable SMTP server: worth retrying a shard for
+_TRANSIENT_ERRORS = (OperationalError, InterfaceError, SMTPException, OSError)
+
 
 @celery_app.task(bind=True, max_retries=3, default_retry_delay=60)
 def send_campaign_task(self, campaign_id: str):
-    """Send all emails for a campaign."""
-    asyncio.run(_send_campaign(campaign_id))
+    """Fan a campaign out to per-shard send tasks, then finalize with the summed counts."""
+    # Retries reuse the recipients resolved by the first attempt
+    contact_ids = _cached_contact_ids(campaign_id) if self.request.retries else None
+    try:
+        if contact_ids is None:
+            contact_ids = run_async(_campaign_contact_ids(campaign_id))
+            if contact_ids is None:
+                return
+            _cache_contact_ids(campaign_id, contact_ids)
+        if not contact_ids:
+            run_async(_finalize_campaign(campaign_id, []))
+            return
+
+        shards = [
+            send_contact_batch_task.s(campaign_id, contact_ids[i:i + CAMPAIGN_SHARD_SIZE])
+            for i in range(0, len(contact_ids), CAMPAIGN_SHARD_SIZE)
+        ]
+        chord(shards)(_finalize_signature(campaign_id))
+    except Exception as exc:
+        logger.error(f"Campaign {campaign_id} dispatch failed: {exc}")
+        raise self.retry(exc=exc)
+
+
+def _finalize_signature(campaign_id: str):
+    """Chord callback that finalizes the campaign, or marks it failed if a shard gives up."""
+    return finalize_campaign_task.s(campaign_id).on_error(mark_campaign_failed_task.s(campaign_id))
+
+
+def _contact_ids_key(campaign_id: str) -> str:
+    return f"campaign:{campaign_id}:ids"
+
+
+def _cache_contact_ids(campaign_id: str, contact_ids: list[str]):
+    """Store resolved recipient ids in the result backend for retries; best effort."""
+    try:
+        celery_app.backend.set(_contact_ids_key(campaign_id), json.dumps(contact_ids))
+        celery_app.backend.expire(_contact_ids_key(campaign_id), CONTACT_IDS_TTL)
+    except Exception as e:
+        logger.warning(f"Could not cache recipients for campaign {campaign_id}: {e}")
+
+
+def _cached_contact_ids(campaign_id: str) -> list[str] | None:
+    """Recipient ids cached by an earlier attempt, or None if unavailable."""
+    try:
+        raw = celery_app.backend.get(_contact_ids_key(campaign_id))
+    except Exception as e:
+        logger.warning(f"Could not read cached recipients for campaign {campaign_id}: {e}")
+        return None
+    return json.loads(raw) if raw else None
+
+
+@celery_app.task(bind=True, max_retries=3, default_retry_delay=60)
+def send_contact_batch_task(self, campaign_id: str, contact_ids: list[str]) -> dict:
+    """Send one shard of a campaign; returns {"sent": n, "bounced": n}.
+
+    Transient DB/SMTP errors retry the shard; recipients already recorded are not sent again.
+    """
+    try:
+        return run_async(_send_contacts(campaign_id, contact_ids))
+    except _TRANSIENT_ERRORS as exc:
+        logger.warning(f"Campaign {campaign_id} shard failed, retrying: {exc}")
+        raise self.retry(exc=exc)
+
+
+@celery_app.task
+def finalize_campaign_task(shard_results: list[dict], campaign_id: str):
+    """Chord callback: write aggregate counts and mark the campaign sent."""
+    run_async(_finalize_campaign(campaign_id, shard_results))
+
+
+@celery_app.task
+def mark_campaign_failed_task(request, exc, traceback, campaign_id: str):
+    """Chord errback: a shard failed for good, so the campaign will never be finalized."""
+    logger.error(f"Campaign {campaign_id} failed in task {request.id}: {exc}")
+    run_async(_fail_campaign(campaign_id))
 
 
 async def _send_campaign(campaign_id: str):
-    from uuid import UUID
+    """Send a whole campaign in-process (same steps as the Celery fan-out, run serially)."""
+    contact_ids = await _campaign_contact_ids(campaign_id)
+    if contact_ids is None:
+        return
+    shard_results = [
+        await _send_contacts(campaign_id, contact_ids[i:i + CAMPAIGN_SHARD_SIZE])
+        for i in range(0, len(contact_ids), CAMPAIGN_SHARD_SIZE)
+    ]
+    await _finalize_campaign(campaign_id, shard_results)
+
 
+async def _campaign_contact_ids(campaign_id: str) -> list[str] | None:
+    """Ids of the campaign's target contacts, or None if the campaign does not exist."""
     from sqlalchemy import select
 
     from app.database import async_session
-    from app.models import Campaign, Contact, EmailEvent
-    from app.services.email import send_email
+    from app.models import Campaign, Contact
 
     async with async_session() as db:
-        result = await db.execute(select(Campaign).where(Campaign.id == UUID(campaign_id)))
-        campaign = result.scalar_one_or_none()
-        if not campaign:
+        result = await db.execute(select(Campaign.segment_id).where(Campaign.id == campaign_id))
+        row = result.one_or_none()
+        if row is None:
             logger.error(f"Campaign {campaign_id} not found")
-            return
+            return None
 
         # Get target contacts (from segment or all subscribed)
-        stmt = select(Contact).where(Contact.subscribed.is_(True))
-        if campaign.segment_id:
+        stmt = select(Contact.id).where(Contact.subscribed.is_(True))
+        if row.segment_id:
             from app.models import contact_segments
             stmt = stmt.join(contact_segments).where(
-                contact_segments.c.segment_id == campaign.segment_id
+                contact_segments.c.segment_id == row.segment_id
             )
 
-        result = await db.execute(stmt)
-        contacts = result.scalars().all()
-
-        sent_count = 0
-        for contact in contacts:
-            success = await send_email(
-                to_email=contact.email,
-                subject=campaign.subject,
-                html_body=campaign.html_body,
-                text_body=campaign.text_body,
-                from_name=campaign.from_name,
-                from_email=campaign.from_email,
+        result = await db.execute(stmt.order_by(Contact.id))
+        return list(result.scalars().all())
+
+
+async def _send_contacts(campaign_id: str, contact_ids: list[str]) -> dict:
+    """Send the campaign to the given contacts and record their EmailEvents.
+
+    Each batch's events are committed before the next batch is sent, and contacts
+    that already have an event for the campaign are skipped, so a retried shard
+    resumes rather than mailing its recipients twice. Counts cover every attempt.
+    """
+    from sqlalchemy import func, insert, select
+
+    from app.config import get_settings
+    from app.database import async_session
+    from app.models import Campaign, Contact, EmailEvent
+    from app.services.email import send_email
+
+    async with async_session() as db:
+        campaign = (
+            await db.execute(select(Campaign).where(Campaign.id == campaign_id))
+        ).scalar_one_or_none()
+        if not campaign:
+            logger.error(f"Campaign {campaign_id} not found")
+            return {"sent": 0, "bounced": 0}
+
+        recorded = select(EmailEvent.contact_id).where(EmailEvent.campaign_id == campaign_id)
+        semaphore = asyncio.Semaphore(get_settings().smtp_concurrency)
+
+        async def send_one(contact: Contact) -> bool:
+            async with semaphore:
+                return await send_email(
+                    to_email=contact.email,
+                    subject=campaign.subject,
+                    html_body=campaign.html_body,
+                    text_body=campaign.text_body,
+                    from_name=campaign.from_name,
+                    from_email=campaign.from_email,
+                )
+
+        # Send each batch concurrently, then record its events in one INSERT
+        for i in range(0, len(contact_ids), EVENT_INSERT_BATCH):
+            batch = (await db.execute(
+                select(Contact).where(
+                    Contact.id.in_(contact_ids[i:i + EVENT_INSERT_BATCH]),
+                    Contact.subscribed.is_(True),
+                    Contact.id.not_in(recorded),
+                )
+            )).scalars().all()
+            if not batch:
+                continue
+            outcomes = await asyncio.gather(*(send_one(c) for c in batch), return_exceptions=True)
+            # Sends that raised (SMTP unreachable) stay unrecorded so the shard retry covers them
+            finished = [
+                (contact, success)
+                for contact, success in zip(batch, outcomes)
+                if not isinstance(success, BaseException)
+            ]
+            if finished:
+                await db.execute(insert(EmailEvent), [
+                    {
+                        "campaign_id": campaign.id,
+                        "contact_id": contact.id,
+                        "event_type": "sent" if success else "bounced",
+                    }
+                    for contact, success in finished
+                ])
+                await db.commit()
+            errors = [e for e in outcomes if isinstance(e, BaseException)]
+            if errors:
+                raise errors[0]
+
+        counts = dict((await db.execute(
+            select(EmailEvent.event_type, func.count(EmailEvent.id))
+            .where(
+                EmailEvent.campaign_id == campaign_id,
+                EmailEvent.contact_id.in_(contact_ids),
+                EmailEvent.event_type.in_(("sent", "bounced")),
             )
-            event_type = "sent" if success else "bounced"
-            db.add(EmailEvent(
-                campaign_id=campaign.id,
-                contact_id=contact.id,
-                event_type=event_type,
-            ))
-            if success:
-                sent_count += 1
+            .group_by(EmailEvent.event_type)
+        )).all())
+        return {"sent": counts.get("sent", 0), "bounced": counts.get("bounced", 0)}
+
+
+async def _finalize_campaign(campaign_id: str, shard_results: list[dict]):
+    """Store the summed shard counts and mark the campaign sent."""
+    from datetime import datetime, timezone
+
+    from sqlalchemy import select
+
+    from app.database import async_session
+    from app.models import Campaign
+
+    sent_count = sum(r["sent"] for r in shard_results)
+    bounced_count = sum(r["bounced"] for r in shard_results)
+
+    async with async_session() as db:
+        result = await db.execute(select(Campaign).where(Campaign.id == campaign_id))
+        campaign = result.scalar_one_or_none()
+        if not campaign:
+            logger.error(f"Campaign {campaign_id} not found")
+            return
 
         campaign.total_sent = sent_count
-        campaign.total_bounced = len(contacts) - sent_count
+        campaign.total_bounced = bounced_count
         campaign.status = "sent"
-        from datetime import datetime, timezone
         campaign.sent_at = datetime.now(timezone.utc)
         await db.commit()
 
-        logger.info(f"Campaign {campaign_id}: sent={sent_count}, bounced={len(contacts) - sent_count}")
+    logger.info(f"Campaign {campaign_id}: sent={sent_count}, bounced={bounced_count}")
+
+
+async def _fail_campaign(campaign_id: str):
+    """Mark a campaign failed after one of its shards exhausted its retries."""
+    from sqlalchemy import update
+
+    from app.database import async_session
+    from app.models import Campaign
+
+    async with async_session() as db:
+        await db.execute(update(Campaign).where(Campaign.id == campaign_id).values(status="failed"))
+        await db.commit()
@@ -1,31 +1,45 @@
-"""Test fixtures — create/drop tables for each async test session."""
+"""Test fixtures — one schema per run, one rolled-back transaction per test."""
 
-import asyncio
 import os
 from collections.abc import AsyncGenerator
+from datetime import datetime, timezone
 
 import pytest
 import pytest_asyncio
 from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event, insert
+from sqlalchemy.ext.asyncio import AsyncSession
 
-# Force SQLite test database *before* any app import
-os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///./test_mal.db"
-os.environ["DATABASE_URL_SYNC"] = "sqlite:///./test_mal.db"
+# Force SQLite test database *before* any app import; in-memory URLs get a StaticPool,
+# so every session shares the one private connection
+os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///:memory:"
+os.environ["DATABASE_URL_SYNC"] = "sqlite:///:memory:"
+# Minimum bcrypt work factor; hashes stay valid, just cheap to compute
+os.environ["BCRYPT_ROUNDS"] = "4"
 
-from app.database import Base, engine  # noqa: E402
+from app.database import Base, async_session, engine  # noqa: E402
 from app.main import app  # noqa: E402
+from app.models import Contact  # noqa: E402
+from app.services.auth import hash_password  # noqa: E402
 
 
-@pytest.fixture(scope="session")
-def event_loop():
-    loop = asyncio.new_event_loop()
-    yield loop
-    loop.close()
+@pytest_asyncio.fixture(scope="session")
+async def _schema():
+    """Create all tables once for the session, drop them at the end."""
+    # Let SQLAlchemy own BEGIN so SAVEPOINTs nest inside the per-test transaction;
+    # the in-memory database needs no journal durability
+    @event.listens_for(engine.sync_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=MEMORY")
+        cursor.execute("PRAGMA synchronous=OFF")
+        cursor.close()
 
+    @event.listens_for(engine.sync_engine, "begin")
+    def _explicit_begin(conn):
+        conn.exec_driver_sql("BEGIN")
 
-@pytest_asyncio.fixture(autouse=True)
-async def _setup_db():
-    """Create all tables before each test, drop after."""
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
     yield
@@ -33,8 +47,56 @@ async def _setup_db():
         await conn.run_sync(Base.metadata.drop_all)
 
 
+@pytest_asyncio.fixture(autouse=True)
+async def _setup_db(_schema):
+    """Run each test in an outer transaction that is rolled back afterwards.
+
+    Every async_session() (the app's get_db included) binds to the test connection
+    and turns its commits into SAVEPOINT releases.
+    """
+    session_kw = dict(async_session.kw)
+    async with engine.connect() as conn:
+        await conn.begin()
+        async_session.configure(bind=conn, join_transaction_mode="create_savepoint")
+        try:
+            yield
+        finally:
+            async_session.kw = session_kw
+            await conn.rollback()
+
+
 @pytest_asyncio.fixture
+async def db() -> AsyncGenerator[AsyncSession, None]:
+    """A session joined to the test's rolled-back transaction."""
+    async with async_session() as session:
+        yield session
+
+
+@pytest.fixture
+def make_contacts():
+    """Insert contacts from column dicts in one executemany INSERT, then commit."""
+    async def insert_contacts(db: AsyncSession, rows: list[dict]) -> None:
+        await db.execute(insert(Contact), rows)
+        await db.commit()
+
+    return insert_contacts
+
+
+@pytest.fixture(scope="session")
+def known_user_hash() -> str:
+    """bcrypt hash of the shared test password "test-password-123", computed once per run."""
+    return hash_password("test-password-123")
+
+
+@pytest.fixture(scope="session")
+def now_utc() -> datetime:
+    """One aware timestamp for tests that only need *a* created_at, not the current time."""
+    return datetime.now(timezone.utc)
+
+
+@pytest_asyncio.fixture(scope="session")
 async def client() -> AsyncGenerator[AsyncClient, None]:
+    """One client for the whole run; tests that change its headers must restore them."""
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://test") as ac:
         yield ac
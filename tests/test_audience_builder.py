@@ -3,10 +3,8 @@
 import json
 
 import pytest
-import pytest_asyncio
 
 from app.services.audience_builder import Audience, AudienceBuilder, AudienceRule
-from app.models import Contact
 
 
 class TestAudienceModel:
@@ -35,19 +33,12 @@ class TestAudienceRuleModel:
 
 
 class TestAudienceBuilder:
-    @pytest_asyncio.fixture
-    async def db(self):
-        from app.database import engine, Base, async_session
-        async with engine.begin() as conn:
-            await conn.run_sync(Base.metadata.create_all)
-        async with async_session() as session:
-            yield session
-        async with engine.begin() as conn:
-            await conn.run_sync(Base.metadata.drop_all)
+    @pytest.fixture
+    def builder(self, db):
+        return AudienceBuilder(db)
 
     @pytest.mark.asyncio
-    async def test_create_audience(self, db):
-        builder = AudienceBuilder(db)
+    async def test_create_audience(self, builder):
         a = await builder.create_audience(
             "US VIPs", [{"field": "country", "operator": "eq", "value": "US"}],
         )
@@ -55,8 +46,7 @@ class TestAudienceBuilder:
         assert a.id is not None
 
     @pytest.mark.asyncio
-    async def test_create_with_match_any(self, db):
-        builder = AudienceBuilder(db)
+    async def test_create_with_match_any(self, builder):
         a = await builder.create_audience(
             "Multi", [
                 {"field": "country", "operator": "eq", "value": "US"},
@@ -67,36 +57,31 @@ class TestAudienceBuilder:
         assert a.match_type == "any"
 
     @pytest.mark.asyncio
-    async def test_validate_invalid_field(self, db):
-        builder = AudienceBuilder(db)
+    async def test_validate_invalid_field(self, builder):
         with pytest.raises(ValueError, match="Invalid field"):
             await builder.create_audience(
                 "Bad", [{"field": "nonexistent", "operator": "eq", "value": "x"}],
             )
 
     @pytest.mark.asyncio
-    async def test_validate_invalid_operator(self, db):
-        builder = AudienceBuilder(db)
+    async def test_validate_invalid_operator(self, builder):
         with pytest.raises(ValueError, match="Invalid operator"):
             await builder.create_audience(
                 "Bad", [{"field": "email", "operator": "like", "value": "x"}],
             )
 
     @pytest.mark.asyncio
-    async def test_validate_missing_field(self, db):
-        builder = AudienceBuilder(db)
+    async def test_validate_missing_field(self, builder):
         with pytest.raises(ValueError, match="must have a 'field'"):
             await builder.create_audience("Bad", [{"operator": "eq", "value": "x"}])
 
     @pytest.mark.asyncio
-    async def test_validate_missing_operator(self, db):
-        builder = AudienceBuilder(db)
+    async def test_validate_missing_operator(self, builder):
         with pytest.raises(ValueError, match="must have an 'operator'"):
             await builder.create_audience("Bad", [{"field": "email", "value": "x"}])
 
     @pytest.mark.asyncio
-    async def test_estimate_empty(self, db):
-        builder = AudienceBuilder(db)
+    async def test_estimate_empty(self, builder):
         a = await builder.create_audience(
             "Empty", [{"field": "country", "operator": "eq", "value": "ZZ"}],
         )
@@ -104,15 +89,14 @@ class TestAudienceBuilder:
         assert size == 0
 
     @pytest.mark.asyncio
-    async def test_estimate_with_contacts(self, db):
+    async def test_estimate_with_contacts(self, db, make_contacts, builder):
         # Add contacts
-        c1 = Contact(email="us1@test.com", country="US", subscribed=True)
-        c2 = Contact(email="us2@test.com", country="US", subscribed=True)
-        c3 = Contact(email="uk1@test.com", country="UK", subscribed=True)
-        db.add_all([c1, c2, c3])
-        await db.commit()
+        await make_contacts(db, [
+            dict(email="us1@test.com", country="US", subscribed=True),
+            dict(email="us2@test.com", country="US", subscribed=True),
+            dict(email="uk1@test.com", country="UK", subscribed=True),
+        ])
 
-        builder = AudienceBuilder(db)
         a = await builder.create_audience(
             "US", [{"field": "country", "operator": "eq", "value": "US"}],
         )
@@ -120,14 +104,13 @@ class TestAudienceBuilder:
         assert size == 2
 
     @pytest.mark.asyncio
-    async def test_get_contacts(self, db):
-        c1 = Contact(email="en1@test.com", language="en", subscribed=True)
-        c2 = Contact(email="en2@test.com", language="en", subscribed=True)
-        c3 = Contact(email="fr1@test.com", language="fr", subscribed=True)
-        db.add_all([c1, c2, c3])
-        await db.commit()
-
-        builder = AudienceBuilder(db)
+    async def test_get_contacts(self, db, make_contacts, builder):
+        await make_contacts(db, [
+            dict(email="en1@test.com", language="en", subscribed=True),
+            dict(email="en2@test.com", language="en", subscribed=True),
+            dict(email="fr1@test.com", language="fr", subscribed=True),
+        ])
+
         a = await builder.create_audience(
             "English", [{"field": "language", "operator": "eq", "value": "en"}],
         )
@@ -135,13 +118,12 @@ class TestAudienceBuilder:
         assert len(contacts) == 2
 
     @pytest.mark.asyncio
-    async def test_exclude_unsubscribed(self, db):
-        c1 = Contact(email="sub@test.com", country="US", subscribed=True)
-        c2 = Contact(email="unsub@test.com", country="US", subscribed=False)
-        db.add_all([c1, c2])
-        await db.commit()
+    async def test_exclude_unsubscribed(self, db, make_contacts, builder):
+        await make_contacts(db, [
+            dict(email="sub@test.com", country="US", subscribed=True),
+            dict(email="unsub@test.com", country="US", subscribed=False),
+        ])
 
-        builder = AudienceBuilder(db)
         a = await builder.create_audience(
             "US All", [{"field": "country", "operator": "eq", "value": "US"}],
             exclude_unsubscribed=True,
@@ -150,13 +132,12 @@ class TestAudienceBuilder:
         assert size == 1
 
     @pytest.mark.asyncio
-    async def test_contains_operator(self, db):
-        c1 = Contact(email="john@gmail.com", subscribed=True)
-        c2 = Contact(email="jane@yahoo.com", subscribed=True)
-        db.add_all([c1, c2])
-        await db.commit()
+    async def test_contains_operator(self, db, make_contacts, builder):
+        await make_contacts(db, [
+            dict(email="john@gmail.com", subscribed=True),
+            dict(email="jane@yahoo.com", subscribed=True),
+        ])
 
-        builder = AudienceBuilder(db)
         a = await builder.create_audience(
             "Gmail", [{"field": "email", "operator": "contains", "value": "gmail"}],
         )
@@ -164,60 +145,53 @@ class TestAudienceBuilder:
         assert len(contacts) == 1
 
     @pytest.mark.asyncio
-    async def test_list_audiences(self, db):
-        builder = AudienceBuilder(db)
+    async def test_list_audiences(self, builder):
         await builder.create_audience("A1", [{"field": "country", "operator": "eq", "value": "US"}])
         await builder.create_audience("A2", [{"field": "country", "operator": "eq", "value": "UK"}])
         audiences = await builder.list_audiences()
         assert len(audiences) == 2
 
     @pytest.mark.asyncio
-    async def test_delete_audience(self, db):
-        builder = AudienceBuilder(db)
+    async def test_delete_audience(self, builder):
         a = await builder.create_audience("Del", [{"field": "country", "operator": "eq", "value": "US"}])
         deleted = await builder.delete_audience(a.id)
         assert deleted is True
         assert await builder.get_audience(a.id) is None
 
     @pytest.mark.asyncio
-    async def test_delete_nonexistent(self, db):
-        builder = AudienceBuilder(db)
+    async def test_delete_nonexistent(self, builder):
         deleted = await builder.delete_audience("nope")
         assert deleted is False
 
     @pytest.mark.asyncio
-    async def test_update_audience(self, db):
-        builder = AudienceBuilder(db)
+    async def test_update_audience(self, builder):
         a = await builder.create_audience("Old", [{"field": "country", "operator": "eq", "value": "US"}])
         updated = await builder.update_audience(a.id, name="New Name")
         assert updated.name == "New Name"
 
     @pytest.mark.asyncio
-    async def test_update_nonexistent(self, db):
-        builder = AudienceBuilder(db)
+    async def test_update_nonexistent(self, builder):
         result = await builder.update_audience("nope", name="x")
         assert result is None
 
     @pytest.mark.asyncio
-    async def test_preview_rules(self, db):
-        c1 = Contact(email="a@test.com", country="US", subscribed=True)
-        db.add(c1)
-        await db.commit()
+    async def test_preview_rules(self, db, make_contacts, builder):
+        await make_contacts(db, [
+            dict(email="a@test.com", country="US", subscribed=True),
+        ])
 
-        builder = AudienceBuilder(db)
         count = await builder.preview_rules(
             [{"field": "country", "operator": "eq", "value": "US"}],
         )
         assert count == 1
 
     @pytest.mark.asyncio
-    async def test_neq_operator(self, db):
-        c1 = Contact(email="a@test.com", country="US", subscribed=True)
-        c2 = Contact(email="b@test.com", country="UK", subscribed=True)
-        db.add_all([c1, c2])
-        await db.commit()
+    async def test_neq_operator(self, db, make_contacts, builder):
+        await make_contacts(db, [
+            dict(email="a@test.com", country="US", subscribed=True),
+            dict(email="b@test.com", country="UK", subscribed=True),
+        ])
 
-        builder = AudienceBuilder(db)
         a = await builder.create_audience(
             "Not US", [{"field": "country", "operator": "neq", "value": "US"}],
         )
@@ -226,13 +200,12 @@ class TestAudienceBuilder:
         assert contacts[0].country == "UK"
 
     @pytest.mark.asyncio
-    async def test_is_set_operator(self, db):
-        c1 = Contact(email="a@test.com", phone="123", subscribed=True)
-        c2 = Contact(email="b@test.com", phone="", subscribed=True)
-        db.add_all([c1, c2])
-        await db.commit()
+    async def test_is_set_operator(self, db, make_contacts, builder):
+        await make_contacts(db, [
+            dict(email="a@test.com", phone="123", subscribed=True),
+            dict(email="b@test.com", phone="", subscribed=True),
+        ])
 
-        builder = AudienceBuilder(db)
         a = await builder.create_audience(
             "Has Phone", [{"field": "phone", "operator": "is_set"}],
         )
@@ -240,14 +213,13 @@ class TestAudienceBuilder:
         assert len(contacts) == 1
 
     @pytest.mark.asyncio
-    async def test_starts_with_operator(self, db):
-        c1 = Contact(email="a@test.com", first_name="John", subscribed=True)
-        c2 = Contact(email="b@test.com", first_name="Jane", subscribed=True)
-        c3 = Contact(email="c@test.com", first_name="Bob", subscribed=True)
-        db.add_all([c1, c2, c3])
-        await db.commit()
-
-        builder = AudienceBuilder(db)
+    async def test_starts_with_operator(self, db, make_contacts, builder):
+        await make_contacts(db, [
+            dict(email="a@test.com", first_name="John", subscribed=True),
+            dict(email="b@test.com", first_name="Jane", subscribed=True),
+            dict(email="c@test.com", first_name="Bob", subscribed=True),
+        ])
+
         a = await builder.create_audience(
             "J Names", [{"field": "first_name", "operator": "starts_with", "value": "J"}],
         )
@@ -255,16 +227,61 @@ class TestAudienceBuilder:
         assert len(contacts) == 2
 
     @pytest.mark.asyncio
-    async def test_in_operator(self, db):
-        c1 = Contact(email="a@test.com", country="US", subscribed=True)
-        c2 = Contact(email="b@test.com", country="UK", subscribed=True)
-        c3 = Contact(email="c@test.com", country="DE", subscribed=True)
-        db.add_all([c1, c2, c3])
-        await db.commit()
-
-        builder = AudienceBuilder(db)
+    async def test_in_operator(self, db, make_contacts, builder):
+        await make_contacts(db, [
+            dict(email="a@test.com", country="US", subscribed=True),
+            dict(email="b@test.com", country="UK", subscribed=True),
+            dict(email="c@test.com", country="DE", subscribed=True),
+        ])
+
         a = await builder.create_audience(
             "English", [{"field": "country", "operator": "in", "value": json.dumps(["US", "UK"])}],
         )
         contacts = await builder.get_contacts(a)
         assert len(contacts) == 2
+
+    @pytest.mark.asyncio
+    async def test_overlap_analysis(self, db, make_contacts, builder):
+        await make_contacts(db, [
+            dict(email="a@test.com", country="US", language="en", subscribed=True),
+            dict(email="b@test.com", country="US", language="fr", subscribed=True),
+            dict(email="c@test.com", country="UK", language="en", subscribed=True),
+        ])
+
+        us = await builder.create_audience("US", [{"field": "country", "operator": "eq", "value": "US"}])
+        en = await builder.create_audience("EN", [{"field": "language", "operator": "eq", "value": "en"}])
+        result = await builder.overlap_analysis(us.id, en.id)
+        assert result["overlap"] == 1
+        assert result["union"] == 3
+        assert result["jaccard_index"] == round(1 / 3, 4)
+
+    @pytest.mark.asyncio
+    async def test_same_field_rules_fuse_into_in(self, db, make_contacts, builder):
+        await make_contacts(db, [
+            dict(email="a@test.com", country="US", subscribed=True),
+            dict(email="b@test.com", country="UK", subscribed=True),
+            dict(email="c@test.com", country="DE", subscribed=True),
+        ])
+        rules = [{"field": "country", "operator": "eq", "value": v} for v in ("US", "UK", "US")]
+        a = await builder.create_audience("US or UK", rules, match_type="any")
+        assert "IN" in str(await builder.build_query(a))
+        assert await builder.estimate_size(a) == 2
+
+        rules = [{"field": "country", "operator": "neq", "value": v} for v in ("US", "UK")]
+        assert await builder.preview_rules(rules) == 1
+
+    @pytest.mark.asyncio
+    async def test_estimate_sizes_matches_single_estimates(self, db, make_contacts, builder):
+        await make_contacts(db, [
+            dict(email="a@test.com", country="US", language="en", subscribed=True),
+            dict(email="b@test.com", country="US", language="fr", subscribed=False),
+            dict(email="c@test.com", country="UK", language="en", subscribed=True),
+        ])
+        us = await builder.create_audience("US", [{"field": "country", "operator": "eq", "value": "US"}])
+        en = await builder.create_audience("EN", [{"field": "language", "operator": "eq", "value": "en"}])
+        everyone = await builder.create_audience("All", [], exclude_unsubscribed=False)
+
+        sizes = await builder.estimate_sizes([us.id, en.id, everyone.id, "missing"])
+        assert sizes == {us.id: 1, en.id: 2, everyone.id: 3}
+        for audience in (us, en, everyone):
+            assert await builder.estimate_size(audience) == sizes[audience.id]
@@ -11,6 +11,11 @@ def test_password_hashing():
     assert not verify_password("wrong", hashed)
 
 
+def test_verify_known_user(known_user_hash):
+    assert verify_password("test-password-123", known_user_hash)
+    assert not verify_password("TEST-PASSWORD-123", known_user_hash)
+
+
 def test_jwt_token():
     token = create_access_token({"sub": "user@example.com"})
     payload = decode_token(token)
@@ -4,7 +4,6 @@ import json
 from datetime import datetime, timedelta, timezone
 
 import pytest
-import pytest_asyncio
 
 from app.api.automation_rules import (
     AutomationLog,
@@ -14,6 +13,9 @@ from app.api.automation_rules import (
     RuleUpdate,
 )
 
+# Fixed instant for cooldown and execution-timestamp assertions
+FIXED_NOW = datetime(2026, 1, 15, 12, 0, tzinfo=timezone.utc)
+
 
 # ── Model tests ──────────────────────────────────────────
 
@@ -48,18 +50,12 @@ class TestAutomationLogModel:
 # ── Rule Engine tests ────────────────────────────────────
 
 class TestRuleEngine:
-    @pytest_asyncio.fixture
-    async def db(self):
-        from app.database import engine, Base, async_session
-        async with engine.begin() as conn:
-            await conn.run_sync(Base.metadata.create_all)
-        async with async_session() as session:
-            yield session
-        async with engine.begin() as conn:
-            await conn.run_sync(Base.metadata.drop_all)
+    @pytest.fixture
+    def rule_engine(self, db):
+        return RuleEngine(db, now=lambda: FIXED_NOW)
 
     @pytest.mark.asyncio
-    async def test_get_matching_rules(self, db):
+    async def test_get_matching_rules(self, db, rule_engine):
         rule = AutomationRule(
             name="Welcome", trigger_type="contact_created",
             actions=json.dumps([{"type": "send_email", "config": {"template_id": "t1"}}]),
@@ -67,81 +63,72 @@ class TestRuleEngine:
         db.add(rule)
         await db.commit()
 
-        engine = RuleEngine(db)
-        matches = await engine.get_matching_rules("contact_created")
+        matches = await rule_engine.get_matching_rules("contact_created")
         assert len(matches) == 1
         assert matches[0].name == "Welcome"
 
     @pytest.mark.asyncio
-    async def test_no_matching_rules(self, db):
-        engine = RuleEngine(db)
-        matches = await engine.get_matching_rules("nonexistent")
+    async def test_no_matching_rules(self, rule_engine):
+        matches = await rule_engine.get_matching_rules("nonexistent")
         assert len(matches) == 0
 
     @pytest.mark.asyncio
-    async def test_inactive_rules_excluded(self, db):
+    async def test_inactive_rules_excluded(self, db, rule_engine):
         rule = AutomationRule(
             name="Inactive", trigger_type="contact_created", active=False,
         )
         db.add(rule)
         await db.commit()
 
-        engine = RuleEngine(db)
-        matches = await engine.get_matching_rules("contact_created")
+        matches = await rule_engine.get_matching_rules("contact_created")
         assert len(matches) == 0
 
     def test_check_conditions_empty(self):
         rule = AutomationRule(
             name="No Cond", trigger_type="test", conditions="[]",
         )
-        engine = RuleEngine.__new__(RuleEngine)
-        assert engine.check_conditions(rule, {}) is True
+        assert RuleEngine.check_conditions(rule, {}) is True
 
     def test_check_conditions_eq(self):
         rule = AutomationRule(
             name="EQ", trigger_type="test",
             conditions=json.dumps([{"field": "country", "operator": "eq", "value": "US"}]),
         )
-        engine = RuleEngine.__new__(RuleEngine)
-        assert engine.check_conditions(rule, {"country": "US"}) is True
-        assert engine.check_conditions(rule, {"country": "UK"}) is False
+        assert RuleEngine.check_conditions(rule, {"country": "US"}) is True
+        assert RuleEngine.check_conditions(rule, {"country": "UK"}) is False
 
     def test_check_conditions_gt(self):
         rule = AutomationRule(
             name="GT", trigger_type="test",
             conditions=json.dumps([{"field": "score", "operator": "gt", "value": 50}]),
         )
-        engine = RuleEngine.__new__(RuleEngine)
-        assert engine.check_conditions(rule, {"score": 100}) is True
-        assert engine.check_conditions(rule, {"score": 30}) is False
+        assert RuleEngine.check_conditions(rule, {"score": 100}) is True
+        assert RuleEngine.check_conditions(rule, {"score": 30}) is False
 
     def test_check_conditions_contains(self):
         rule = AutomationRule(
             name="Contains", trigger_type="test",
             conditions=json.dumps([{"field": "email", "operator": "contains", "value": "gmail"}]),
         )
-        engine = RuleEngine.__new__(RuleEngine)
-        assert engine.check_conditions(rule, {"email": "user@gmail.com"}) is True
-        assert engine.check_conditions(rule, {"email": "user@yahoo.com"}) is False
+        assert RuleEngine.check_conditions(rule, {"email": "user@gmail.com"}) is True
+        assert RuleEngine.check_conditions(rule, {"email": "user@yahoo.com"}) is False
 
     def test_check_conditions_in(self):
         rule = AutomationRule(
             name="In", trigger_type="test",
             conditions=json.dumps([{"field": "tag", "operator": "in", "value": ["vip", "premium"]}]),
         )
-        engine = RuleEngine.__new__(RuleEngine)
-        assert engine.check_conditions(rule, {"tag": "vip"}) is True
-        assert engine.check_conditions(rule, {"tag": "basic"}) is False
+        assert RuleEngine.check_conditions(rule, {"tag": "vip"}) is True
+        assert RuleEngine.check_conditions(rule, {"tag": "basic"}) is False
 
     def test_check_conditions_is_set(self):
         rule = AutomationRule(
             name="IsSet", trigger_type="test",
             conditions=json.dumps([{"field": "phone", "operator": "is_set"}]),
         )
-        engine = RuleEngine.__new__(RuleEngine)
-        assert engine.check_conditions(rule, {"phone": "123"}) is True
-        assert engine.check_conditions(rule, {"phone": ""}) is False
-        assert engine.check_conditions(rule, {"phone": None}) is False
+        assert RuleEngine.check_conditions(rule, {"phone": "123"}) is True
+        assert RuleEngine.check_conditions(rule, {"phone": ""}) is False
+        assert RuleEngine.check_conditions(rule, {"phone": None}) is False
 
     def test_check_conditions_multiple(self):
         rule = AutomationRule(
@@ -151,51 +138,45 @@ class TestRuleEngine:
                 {"field": "score", "operator": "gte", "value": 50},
             ]),
         )
-        engine = RuleEngine.__new__(RuleEngine)
-        assert engine.check_conditions(rule, {"country": "US", "score": 60}) is True
-        assert engine.check_conditions(rule, {"country": "US", "score": 30}) is False
+        assert RuleEngine.check_conditions(rule, {"country": "US", "score": 60}) is True
+        assert RuleEngine.check_conditions(rule, {"country": "US", "score": 30}) is False
 
     def test_execution_limit_not_reached(self):
         rule = AutomationRule(
             name="Limit", trigger_type="test",
             max_executions=10, total_executions=5,
         )
-        engine = RuleEngine.__new__(RuleEngine)
-        assert engine.check_execution_limits(rule) is True
+        assert RuleEngine.check_execution_limits(rule) is True
 
     def test_execution_limit_reached(self):
         rule = AutomationRule(
             name="Limit", trigger_type="test",
             max_executions=10, total_executions=10,
         )
-        engine = RuleEngine.__new__(RuleEngine)
-        assert engine.check_execution_limits(rule) is False
+        assert RuleEngine.check_execution_limits(rule) is False
 
     def test_execution_limit_unlimited(self):
         rule = AutomationRule(
             name="Unlimited", trigger_type="test",
             max_executions=0, total_executions=9999,
         )
-        engine = RuleEngine.__new__(RuleEngine)
-        assert engine.check_execution_limits(rule) is True
+        assert RuleEngine.check_execution_limits(rule) is True
 
     def test_cooldown_active(self):
         rule = AutomationRule(
             name="Cool", trigger_type="test",
             cooldown_minutes=60,
-            last_executed_at=datetime.now(timezone.utc) - timedelta(minutes=30),
+            last_executed_at=FIXED_NOW - timedelta(minutes=30),
         )
-        engine = RuleEngine.__new__(RuleEngine)
-        assert engine.check_execution_limits(rule) is False
+        assert RuleEngine.check_execution_limits(rule, FIXED_NOW) is False
 
     def test_cooldown_expired(self):
         rule = AutomationRule(
             name="Cool", trigger_type="test",
             cooldown_minutes=60,
-            last_executed_at=datetime.now(timezone.utc) - timedelta(minutes=90),
+            last_executed_at=FIXED_NOW - timedelta(minutes=90),
         )
-        engine = RuleEngine.__new__(RuleEngine)
-        assert engine.check_execution_limits(rule) is True
+        assert RuleEngine.check_execution_limits(rule, FIXED_NOW) is True
 
     def test_parse_actions(self):
         rule = AutomationRule(
@@ -205,13 +186,23 @@ class TestRuleEngine:
                 {"type": "send_email", "config": {"template_id": "t1"}},
             ]),
         )
-        engine = RuleEngine.__new__(RuleEngine)
-        actions = engine.parse_actions(rule)
+        actions = RuleEngine.parse_actions(rule)
         assert len(actions) == 2
         assert actions[0]["type"] == "add_tag"
 
+    def test_parsed_conditions_follow_json_updates(self):
+        rule = AutomationRule(
+            name="Cached", trigger_type="contact_created",
+            conditions=json.dumps([{"field": "country", "operator": "eq", "value": "US"}]),
+        )
+        assert rule.parsed_conditions is rule.parsed_conditions
+        rule.conditions = json.dumps([{"field": "country", "operator": "eq", "value": "UK"}])
+        assert RuleEngine.check_conditions(rule, {"country": "UK"}) is True
+        rule.conditions = "not json"
+        assert rule.parsed_conditions == ()
+
     @pytest.mark.asyncio
-    async def test_execute_rule_success(self, db):
+    async def test_execute_rule_success(self, db, rule_engine):
         rule = AutomationRule(
             name="Exec", trigger_type="contact_created",
             actions=json.dumps([{"type": "add_tag", "config": {"tag_name": "new"}}]),
@@ -219,13 +210,13 @@ class TestRuleEngine:
         db.add(rule)
         await db.commit()
 
-        engine = RuleEngine(db)
-        log = await engine.execute_rule(rule, "ct1", {})
+        log = await rule_engine.execute_rule(rule, "ct1", {})
         assert log.status == "success"
         assert rule.total_executions == 1
+        assert rule.last_executed_at == FIXED_NOW
 
     @pytest.mark.asyncio
-    async def test_execute_rule_conditions_not_met(self, db):
+    async def test_execute_rule_conditions_not_met(self, db, rule_engine):
         rule = AutomationRule(
             name="Cond", trigger_type="test",
             conditions=json.dumps([{"field": "country", "operator": "eq", "value": "US"}]),
@@ -234,12 +225,11 @@ class TestRuleEngine:
         db.add(rule)
         await db.commit()
 
-        engine = RuleEngine(db)
-        log = await engine.execute_rule(rule, "ct1", context={"country": "UK"})
+        log = await rule_engine.execute_rule(rule, "ct1", context={"country": "UK"})
         assert log.status == "skipped"
 
     @pytest.mark.asyncio
-    async def test_execute_unknown_action(self, db):
+    async def test_execute_unknown_action(self, db, rule_engine):
         rule = AutomationRule(
             name="Unknown", trigger_type="test",
             actions=json.dumps([{"type": "unknown_action", "config": {}}]),
@@ -247,12 +237,11 @@ class TestRuleEngine:
         db.add(rule)
         await db.commit()
 
-        engine = RuleEngine(db)
-        log = await engine.execute_rule(rule, "ct1")
+        log = await rule_engine.execute_rule(rule, "ct1")
         assert log.status == "failed"
 
     @pytest.mark.asyncio
-    async def test_fire_event(self, db):
+    async def test_fire_event(self, db, rule_engine):
         rule1 = AutomationRule(
             name="R1", trigger_type="contact_created",
             actions=json.dumps([{"type": "add_tag", "config": {"tag_name": "new"}}]),
@@ -264,12 +253,15 @@ class TestRuleEngine:
         db.add_all([rule1, rule2])
         await db.commit()
 
-        engine = RuleEngine(db)
-        logs = await engine.fire_event("contact_created", "ct1")
+        logs = await rule_engine.fire_event("contact_created", "ct1")
         assert len(logs) == 2
+        assert [log.status for log in logs] == ["success", "success"]
+        stats = await rule_engine.get_rule_stats(rule1.id)
+        assert stats["total"] == 1
+        assert rule1.total_executions == rule2.total_executions == 1
 
     @pytest.mark.asyncio
-    async def test_get_rule_stats(self, db):
+    async def test_get_rule_stats(self, db, rule_engine):
         rule = AutomationRule(
             name="Stats", trigger_type="test",
             actions=json.dumps([{"type": "add_tag", "config": {"tag_name": "x"}}]),
@@ -277,12 +269,15 @@ class TestRuleEngine:
         db.add(rule)
         await db.commit()
 
-        engine = RuleEngine(db)
-        await engine.execute_rule(rule, "ct1")
-        await engine.execute_rule(rule, "ct2")
-        stats = await engine.get_rule_stats(rule.id)
-        assert stats["total"] == 2
+        await rule_engine.execute_rule(rule, "ct1")
+        await rule_engine.execute_rule(rule, "ct2")
+        rule.conditions = json.dumps([{"field": "country", "operator": "eq", "value": "US"}])
+        await rule_engine.execute_rule(rule, "ct3", context={"country": "UK"})
+        stats = await rule_engine.get_rule_stats(rule.id)
+        assert stats["total"] == 3
         assert stats["success"] == 2
+        assert (stats["failed"], stats["skipped"]) == (0, 1)
+        assert stats["success_rate"] == 66.67
 
 
 # ── Schema tests ─────────────────────────────────────────
@@ -347,3 +342,16 @@ async def test_fire_event_endpoint(client):
     assert resp.status_code == 200
     data = resp.json()
     assert "rules_matched" in data
+
+
+@pytest.mark.asyncio
+async def test_rule_changes_visible_to_fire(client):
+    fire = {"trigger_type": "tag_added", "contact_id": "ct-1"}
+    assert (await client.post("/api/v1/automation-rules/fire", json=fire)).json()["rules_matched"] == 0
+
+    resp = await client.post("/api/v1/automation-rules/", json={"name": "On tag", "trigger_type": "tag_added"})
+    rule_id = resp.json()["id"]
+    assert (await client.post("/api/v1/automation-rules/fire", json=fire)).json()["rules_matched"] == 1
+
+    await client.patch(f"/api/v1/automation-rules/{rule_id}", json={"trigger_type": "tag_removed"})
+    assert (await client.post("/api/v1/automation-rules/fire", json=fire)).json()["rules_matched"] == 0
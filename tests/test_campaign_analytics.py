@@ -1,5 +1,8 @@
 """Tests for campaign analytics service."""
 
+from dataclasses import asdict
+
+import pytest
 
 from app.services.campaign_analytics import (
     CampaignMetrics,
@@ -18,14 +21,6 @@ class TestFunnelStep:
         assert step.stage == "sent"
         assert step.count == 1000
 
-    def test_to_dict(self):
-        step = FunnelStep(stage="opened", count=500, rate=50.0, drop_off_rate=50.0)
-        d = step.to_dict()
-        assert d["stage"] == "opened"
-        assert d["count"] == 500
-        assert d["rate"] == 50.0
-        assert d["drop_off_rate"] == 50.0
-
     def test_rate_rounding(self):
         step = FunnelStep(stage="clicked", count=123, rate=12.3456789)
         d = step.to_dict()
@@ -41,29 +36,6 @@ class TestCampaignMetrics:
         assert m.total_sent == 0
         assert m.open_rate == 0.0
 
-    def test_to_dict_complete(self):
-        m = CampaignMetrics(
-            campaign_id="c1",
-            campaign_name="Spring Sale",
-            total_sent=1000,
-            total_opened=400,
-            total_clicked=100,
-            total_bounced=20,
-            total_unsubscribed=5,
-            open_rate=40.82,
-            click_rate=10.0,
-            ctor=25.0,
-            bounce_rate=2.0,
-            unsubscribe_rate=0.5,
-            engagement_score=78.5,
-        )
-        d = m.to_dict()
-        assert d["campaign_name"] == "Spring Sale"
-        assert d["total_sent"] == 1000
-        assert d["open_rate"] == 40.82
-        assert d["engagement_score"] == 78.5
-        assert isinstance(d["funnel"], list)
-
     def test_to_dict_with_funnel(self):
         m = CampaignMetrics(
             campaign_id="c1",
@@ -93,20 +65,6 @@ class TestCohortData:
         assert cd.cohort_period == "2026-W08"
         assert cd.retention_rate == 80.0
 
-    def test_to_dict(self):
-        cd = CohortData(
-            cohort_period="2026-W08",
-            cohort_size=50,
-            period_offset=2,
-            active_count=30,
-            retention_rate=60.0,
-        )
-        d = cd.to_dict()
-        assert d["cohort_period"] == "2026-W08"
-        assert d["period_offset"] == 2
-        assert d["retention_rate"] == 60.0
-
-
 class TestTimeSeriesPoint:
     """Tests for TimeSeriesPoint dataclass."""
 
@@ -115,12 +73,35 @@ class TestTimeSeriesPoint:
         assert p.period == "2026-02-28"
         assert p.value == 42.5
 
-    def test_to_dict(self):
+    def test_value_rounding(self):
         p = TimeSeriesPoint(period="2026-02-28", value=42.567, label="clicked")
-        d = p.to_dict()
-        assert d["period"] == "2026-02-28"
-        assert d["value"] == 42.57  # rounded to 2 decimals
-        assert d["label"] == "clicked"
+        assert p.to_dict()["value"] == 42.57  # rounded to 2 decimals
+
+
+@pytest.mark.parametrize("obj", [
+    FunnelStep(stage="opened", count=500, rate=50.0, drop_off_rate=50.0),
+    CampaignMetrics(
+        campaign_id="c1",
+        campaign_name="Spring Sale",
+        total_sent=1000,
+        total_opened=400,
+        total_clicked=100,
+        total_bounced=20,
+        total_unsubscribed=5,
+        open_rate=40.82,
+        click_rate=10.0,
+        ctor=25.0,
+        bounce_rate=2.0,
+        unsubscribe_rate=0.5,
+        engagement_score=78.5,
+        funnel=[FunnelStep(stage="sent", count=1000, rate=100.0)],
+    ),
+    CohortData(cohort_period="2026-W08", cohort_size=50, period_offset=2, active_count=30, retention_rate=60.0),
+    TimeSeriesPoint(period="2026-02-28", value=42.5, label="clicked"),
+], ids=lambda obj: type(obj).__name__)
+def test_to_dict_matches_fields(obj):
+    """With already-rounded values, to_dict is a plain field copy."""
+    assert obj.to_dict() == asdict(obj)
 
 
 class TestFunnelStage:
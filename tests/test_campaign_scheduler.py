@@ -4,7 +4,6 @@ import json
 from datetime import datetime, timedelta, timezone
 
 import pytest
-import pytest_asyncio
 
 from app.services.campaign_scheduler import (
     CampaignSchedule,
@@ -12,6 +11,15 @@ from app.services.campaign_scheduler import (
     SendLog,
 )
 
+# No db needed: throttle, counter and next-run helpers only touch the schedule passed in
+_BARE_SCHEDULER = CampaignScheduler.__new__(CampaignScheduler)
+
+
+@pytest.fixture
+def now() -> datetime:
+    """Fixed "current" instant; tests pass it to the scheduler instead of reading the clock."""
+    return datetime(2026, 3, 1, tzinfo=timezone.utc)
+
 
 # ── Model tests ──────────────────────────────────────────
 
@@ -54,29 +62,18 @@ class TestSendLogModel:
 # ── Scheduler service tests ─────────────────────────────
 
 class TestSchedulerService:
-    @pytest_asyncio.fixture
-    async def db(self):
-        from app.database import engine, Base, async_session
-        async with engine.begin() as conn:
-            await conn.run_sync(Base.metadata.create_all)
-        async with async_session() as session:
-            yield session
-        async with engine.begin() as conn:
-            await conn.run_sync(Base.metadata.drop_all)
-
     @pytest.mark.asyncio
-    async def test_create_schedule(self, db):
+    async def test_create_schedule(self, db, now):
         scheduler = CampaignScheduler(db)
-        now = datetime.now(timezone.utc) + timedelta(hours=1)
-        s = await scheduler.create_schedule("camp-1", now)
+        send_at = now + timedelta(hours=1)
+        s = await scheduler.create_schedule("camp-1", send_at)
         assert s.campaign_id == "camp-1"
         assert s.status == "pending"
         assert s.schedule_type == "one_time"
 
     @pytest.mark.asyncio
-    async def test_create_recurring_schedule(self, db):
+    async def test_create_recurring_schedule(self, db, now):
         scheduler = CampaignScheduler(db)
-        now = datetime.now(timezone.utc)
         s = await scheduler.create_schedule(
             "camp-2", now, schedule_type="recurring",
             recurrence_rule={"interval": "daily"}, max_runs=10,
@@ -85,38 +82,38 @@ class TestSchedulerService:
         assert s.max_runs == 10
 
     @pytest.mark.asyncio
-    async def test_get_due_schedules(self, db):
+    async def test_get_due_schedules(self, db, now):
         scheduler = CampaignScheduler(db)
-        past = datetime.now(timezone.utc) - timedelta(hours=1)
-        future = datetime.now(timezone.utc) + timedelta(hours=1)
+        past = now - timedelta(hours=1)
+        future = now + timedelta(hours=1)
         await scheduler.create_schedule("camp-due", past)
         await scheduler.create_schedule("camp-not-due", future)
-        due = await scheduler.get_due_schedules()
+        due = await scheduler.get_due_schedules(now)
         assert len(due) == 1
         assert due[0].campaign_id == "camp-due"
 
     @pytest.mark.asyncio
-    async def test_pause_schedule(self, db):
+    async def test_pause_schedule(self, db, now):
         scheduler = CampaignScheduler(db)
-        now = datetime.now(timezone.utc) + timedelta(hours=1)
-        s = await scheduler.create_schedule("camp-pause", now)
+        send_at = now + timedelta(hours=1)
+        s = await scheduler.create_schedule("camp-pause", send_at)
         paused = await scheduler.pause_schedule(s.id)
         assert paused.status == "paused"
 
     @pytest.mark.asyncio
-    async def test_resume_schedule(self, db):
+    async def test_resume_schedule(self, db, now):
         scheduler = CampaignScheduler(db)
-        now = datetime.now(timezone.utc) + timedelta(hours=1)
-        s = await scheduler.create_schedule("camp-resume", now)
+        send_at = now + timedelta(hours=1)
+        s = await scheduler.create_schedule("camp-resume", send_at)
         await scheduler.pause_schedule(s.id)
         resumed = await scheduler.resume_schedule(s.id)
         assert resumed.status == "pending"
 
     @pytest.mark.asyncio
-    async def test_cancel_schedule(self, db):
+    async def test_cancel_schedule(self, db, now):
         scheduler = CampaignScheduler(db)
-        now = datetime.now(timezone.utc) + timedelta(hours=1)
-        s = await scheduler.create_schedule("camp-cancel", now)
+        send_at = now + timedelta(hours=1)
+        s = await scheduler.create_schedule("camp-cancel", send_at)
         cancelled = await scheduler.cancel_schedule(s.id)
         assert cancelled.status == "cancelled"
 
@@ -126,49 +123,45 @@ class TestSchedulerService:
         result = await scheduler.cancel_schedule("nonexistent-id")
         assert result is None
 
-    def test_throttle_ok(self):
+    def test_throttle_ok(self, now):
         s = CampaignSchedule(campaign_id="c1", max_per_hour=100, max_per_day=1000)
         s.sent_this_hour = 50
         s.sent_today = 500
-        scheduler = CampaignScheduler.__new__(CampaignScheduler)
-        assert scheduler.check_throttle(s) is True
+        assert _BARE_SCHEDULER.check_throttle(s, now) is True
 
-    def test_throttle_hourly_limit(self):
+    def test_throttle_hourly_limit(self, now):
         s = CampaignSchedule(campaign_id="c1", max_per_hour=100, max_per_day=1000)
         s.sent_this_hour = 100
-        s.last_hour_reset = datetime.now(timezone.utc)
-        scheduler = CampaignScheduler.__new__(CampaignScheduler)
-        assert scheduler.check_throttle(s) is False
+        s.last_hour_reset = now
+        assert _BARE_SCHEDULER.check_throttle(s, now) is False
 
-    def test_throttle_daily_limit(self):
+    def test_throttle_daily_limit(self, now):
         s = CampaignSchedule(campaign_id="c1", max_per_hour=0, max_per_day=100)
         s.sent_today = 100
-        s.last_day_reset = datetime.now(timezone.utc)
-        scheduler = CampaignScheduler.__new__(CampaignScheduler)
-        assert scheduler.check_throttle(s) is False
+        s.last_day_reset = now
+        assert _BARE_SCHEDULER.check_throttle(s, now) is False
 
-    def test_throttle_hourly_reset(self):
+    def test_throttle_hourly_reset(self, now):
         s = CampaignSchedule(campaign_id="c1", max_per_hour=100)
         s.sent_this_hour = 100
-        s.last_hour_reset = datetime.now(timezone.utc) - timedelta(hours=2)
-        scheduler = CampaignScheduler.__new__(CampaignScheduler)
-        assert scheduler.check_throttle(s) is True
+        s.last_hour_reset = now
+        later = now + timedelta(hours=2)
+        assert _BARE_SCHEDULER.check_throttle(s, later) is True
         assert s.sent_this_hour == 0
+        assert s.last_hour_reset == later
 
-    def test_throttle_no_limit(self):
+    def test_throttle_no_limit(self, now):
         s = CampaignSchedule(campaign_id="c1", max_per_hour=0, max_per_day=0)
         s.sent_this_hour = 9999
         s.sent_today = 9999
-        scheduler = CampaignScheduler.__new__(CampaignScheduler)
-        assert scheduler.check_throttle(s) is True
+        assert _BARE_SCHEDULER.check_throttle(s, now) is True
 
     def test_increment_counters(self):
         s = CampaignSchedule(campaign_id="c1")
-        scheduler = CampaignScheduler.__new__(CampaignScheduler)
-        scheduler.increment_counters(s)
+        _BARE_SCHEDULER.increment_counters(s)
         assert s.sent_this_hour == 1
         assert s.sent_today == 1
-        scheduler.increment_counters(s)
+        _BARE_SCHEDULER.increment_counters(s)
         assert s.sent_this_hour == 2
 
     @pytest.mark.asyncio
@@ -186,18 +179,16 @@ class TestSchedulerService:
         assert log.error == "SMTP error"
 
     @pytest.mark.asyncio
-    async def test_complete_one_time(self, db):
+    async def test_complete_one_time(self, db, now):
         scheduler = CampaignScheduler(db)
-        now = datetime.now(timezone.utc)
         s = await scheduler.create_schedule("camp-done", now)
         await scheduler.complete_run(s)
         assert s.status == "completed"
         assert s.runs_completed == 1
 
     @pytest.mark.asyncio
-    async def test_complete_recurring(self, db):
+    async def test_complete_recurring(self, db, now):
         scheduler = CampaignScheduler(db)
-        now = datetime.now(timezone.utc)
         s = await scheduler.create_schedule(
             "camp-rec", now, schedule_type="recurring",
             recurrence_rule={"interval": "daily"},
@@ -209,9 +200,8 @@ class TestSchedulerService:
         assert s.next_run_at is not None
 
     @pytest.mark.asyncio
-    async def test_complete_recurring_max_reached(self, db):
+    async def test_complete_recurring_max_reached(self, db, now):
         scheduler = CampaignScheduler(db)
-        now = datetime.now(timezone.utc)
         s = await scheduler.create_schedule(
             "camp-max", now, schedule_type="recurring",
             recurrence_rule={"interval": "daily"}, max_runs=1,
@@ -222,75 +212,49 @@ class TestSchedulerService:
     @pytest.mark.asyncio
     async def test_get_send_stats(self, db):
         scheduler = CampaignScheduler(db)
-        await scheduler.log_send("stats-1", "c1", "ct1", "sent")
-        await scheduler.log_send("stats-1", "c1", "ct2", "sent")
-        await scheduler.log_send("stats-1", "c1", "ct3", "failed", "err")
+        logged = await scheduler.log_sends_bulk([
+            {"schedule_id": "stats-1", "campaign_id": "c1", "contact_id": "ct1", "status": "sent"},
+            {"schedule_id": "stats-1", "campaign_id": "c1", "contact_id": "ct2", "status": "sent"},
+            {"schedule_id": "stats-1", "campaign_id": "c1", "contact_id": "ct3", "status": "failed", "error": "err"},
+        ])
+        assert logged == 3
         stats = await scheduler.get_send_stats("stats-1")
         assert stats["total"] == 3
         assert stats["sent"] == 2
         assert stats["failed"] == 1
         assert stats["success_rate"] > 0
 
-    def test_calc_next_run_daily(self):
-        scheduler = CampaignScheduler.__new__(CampaignScheduler)
-        s = CampaignSchedule(
-            campaign_id="c1", schedule_type="recurring",
-            recurrence_rule=json.dumps({"interval": "daily"}),
-        )
-        now = datetime.now(timezone.utc)
-        s.next_run_at = now
-        nxt = scheduler._calc_next_run(s)
-        assert nxt == now + timedelta(days=1)
-
-    def test_calc_next_run_weekly(self):
-        scheduler = CampaignScheduler.__new__(CampaignScheduler)
-        s = CampaignSchedule(
-            campaign_id="c1", schedule_type="recurring",
-            recurrence_rule=json.dumps({"interval": "weekly"}),
-        )
-        now = datetime.now(timezone.utc)
-        s.next_run_at = now
-        nxt = scheduler._calc_next_run(s)
-        assert nxt == now + timedelta(weeks=1)
-
-    def test_calc_next_run_hourly(self):
-        scheduler = CampaignScheduler.__new__(CampaignScheduler)
-        s = CampaignSchedule(
-            campaign_id="c1", schedule_type="recurring",
-            recurrence_rule=json.dumps({"interval": "hourly"}),
-        )
-        now = datetime.now(timezone.utc)
-        s.next_run_at = now
-        nxt = scheduler._calc_next_run(s)
-        assert nxt == now + timedelta(hours=1)
-
-    def test_calc_next_run_monthly(self):
-        scheduler = CampaignScheduler.__new__(CampaignScheduler)
+    @pytest.mark.parametrize("interval,delta", [
+        ("daily", timedelta(days=1)),
+        ("weekly", timedelta(weeks=1)),
+        ("hourly", timedelta(hours=1)),
+        ("monthly", timedelta(days=30)),
+    ])
+    def test_calc_next_run(self, interval, delta, now):
         s = CampaignSchedule(
             campaign_id="c1", schedule_type="recurring",
-            recurrence_rule=json.dumps({"interval": "monthly"}),
+            recurrence_rule=json.dumps({"interval": interval}),
         )
-        now = datetime.now(timezone.utc)
         s.next_run_at = now
-        nxt = scheduler._calc_next_run(s)
-        assert nxt == now + timedelta(days=30)
+        nxt = _BARE_SCHEDULER._calc_next_run(s)
+        assert nxt == now + delta
 
     @pytest.mark.asyncio
-    async def test_schedule_with_throttle(self, db):
+    async def test_schedule_with_throttle(self, db, now):
         scheduler = CampaignScheduler(db)
-        now = datetime.now(timezone.utc) + timedelta(hours=1)
+        send_at = now + timedelta(hours=1)
         s = await scheduler.create_schedule(
-            "camp-th", now, max_per_hour=500, max_per_day=5000,
+            "camp-th", send_at, max_per_hour=500, max_per_day=5000,
         )
         assert s.max_per_hour == 500
         assert s.max_per_day == 5000
 
     @pytest.mark.asyncio
-    async def test_schedule_with_ab_test(self, db):
+    async def test_schedule_with_ab_test(self, db, now):
         scheduler = CampaignScheduler(db)
-        now = datetime.now(timezone.utc) + timedelta(hours=1)
+        send_at = now + timedelta(hours=1)
         s = await scheduler.create_schedule(
-            "camp-ab", now, ab_test_id="ab-1",
+            "camp-ab", send_at, ab_test_id="ab-1",
             auto_pick_winner=True, winner_wait_hours=6,
         )
         assert s.ab_test_id == "ab-1"
@@ -0,0 +1,105 @@
+"""Tests for the SMTP email service connection pool."""
+
+import aiosmtplib
+import pytest
+
+from app.services import email
+
+
+class FakeSMTP:
+    def __init__(self, fail_with: Exception | None = None):
+        self.is_connected = True
+        self.sent: list[str] = []
+        self.fail_with = fail_with
+
+    async def sendmail(self, sender, recipients, message):
+        if self.fail_with:
+            raise self.fail_with
+        self.sent.extend(recipients)
+
+    async def quit(self):
+        self.is_connected = False
+
+    def close(self):
+        self.is_connected = False
+
+
+@pytest.fixture
+async def fake_connections(monkeypatch):
+    opened: list[FakeSMTP] = []
+
+    async def fake_connect():
+        smtp = FakeSMTP()
+        opened.append(smtp)
+        return smtp
+
+    monkeypatch.setattr(email, "_connect_smtp", fake_connect)
+    await email.close_smtp_pool()
+    yield opened
+    await email.close_smtp_pool()
+
+
+async def test_sends_reuse_one_connection(fake_connections):
+    for i in range(3):
+        assert await email.send_email_smtp(f"user{i}@example.com", "Hi", "<p>Hi</p>")
+    assert len(fake_connections) == 1
+    assert fake_connections[0].sent == ["user0@example.com", "user1@example.com", "user2@example.com"]
+
+
+async def test_dropped_connection_is_replaced(fake_connections):
+    stale = FakeSMTP(fail_with=aiosmtplib.SMTPServerDisconnected("idle timeout"))
+    email._get_smtp_pool().put_nowait(stale)
+
+    assert await email.send_email_smtp("user@example.com", "Hi", "<p>Hi</p>")
+    assert len(fake_connections) == 1
+    assert fake_connections[0].sent == ["user@example.com"]
+
+
+async def test_failed_send_discards_connection(fake_connections):
+    broken = FakeSMTP(fail_with=aiosmtplib.SMTPResponseException(554, "rejected"))
+    email._get_smtp_pool().put_nowait(broken)
+
+    assert not await email.send_email_smtp("user@example.com", "Hi", "<p>Hi</p>")
+    assert not broken.is_connected
+    assert email._get_smtp_pool().empty()
+
+
+@pytest.mark.parametrize("start_tls", [None, True, False])
+async def test_connect_passes_start_tls_setting(monkeypatch, start_tls):
+    opened = {}
+
+    class RecordingSMTP(FakeSMTP):
+        def __init__(self, **kwargs):
+            super().__init__()
+            opened.update(kwargs)
+
+        async def connect(self):
+            pass
+
+    monkeypatch.setattr(email.aiosmtplib, "SMTP", RecordingSMTP)
+    monkeypatch.setattr(email.settings, "smtp_start_tls", start_tls)
+    monkeypatch.setattr(email.settings, "smtp_user", "")
+
+    await email._connect_smtp()
+    # None leaves aiosmtplib's opportunistic STARTTLS in place
+    assert opened["start_tls"] is start_tls
+
+
+async def test_header_injection_is_refused(fake_connections):
+    assert not await email.send_email_smtp("victim@x.com\r\nBcc: evil@y.com", "Hi", "<p>Hi</p>")
+    assert fake_connections == []
+
+
+def test_to_header_is_encoded():
+    assert email._to_header("jöhn@exämple.com") == b"To: =?utf-8?b?asO2aG5AZXjDpG1wbGUuY29t?=\r\n"
+
+
+async def test_unreachable_server_raises(monkeypatch):
+    async def refuse_connect():
+        raise aiosmtplib.SMTPConnectError("connection refused")
+
+    monkeypatch.setattr(email, "_connect_smtp", refuse_connect)
+    await email.close_smtp_pool()
+
+    with pytest.raises(aiosmtplib.SMTPConnectError):
+        await email.send_email_smtp("user@example.com", "Hi", "<p>Hi</p>")
@@ -0,0 +1,176 @@
+"""Tests for campaign sending tasks."""
+
+import pytest
+from sqlalchemy import func, select
+
+from app.database import async_session
+from app.models import Campaign, Contact, EmailEvent
+from app.tasks import email_tasks
+
+
+async def _make_campaign(n_contacts: int) -> str:
+    async with async_session() as db:
+        campaign = Campaign(name="Launch", subject="Hi", html_body="<p>Hi</p>")
+        db.add(campaign)
+        db.add_all([Contact(email=f"user{i}@example.com") for i in range(n_contacts)])
+        db.add(Contact(email="gone@example.com", subscribed=False))
+        await db.commit()
+        return campaign.id
+
+
+async def test_send_campaign_records_events_across_shards(monkeypatch):
+    import app.services.email as email
+
+    async def fake_send_email(to_email, **kwargs):
+        return not to_email.startswith("user0@")
+
+    monkeypatch.setattr(email, "send_email", fake_send_email)
+    monkeypatch.setattr(email_tasks, "EVENT_INSERT_BATCH", 2)
+    monkeypatch.setattr(email_tasks, "CAMPAIGN_SHARD_SIZE", 3)
+    campaign_id = await _make_campaign(5)
+
+    await email_tasks._send_campaign(campaign_id)
+
+    async with async_session() as db:
+        campaign = await db.get(Campaign, campaign_id)
+        counts = dict((await db.execute(
+            select(EmailEvent.event_type, func.count(EmailEvent.id))
+            .where(EmailEvent.campaign_id == campaign_id)
+            .group_by(EmailEvent.event_type)
+        )).all())
+
+    assert counts == {"sent": 4, "bounced": 1}
+    assert (campaign.status, campaign.total_sent, campaign.total_bounced) == ("sent", 4, 1)
+
+
+async def test_send_campaign_caps_concurrent_sends(monkeypatch):
+    import asyncio
+
+    import app.services.email as email
+    from app.config import get_settings
+
+    in_flight = peak = 0
+
+    async def slow_send_email(**kwargs):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return True
+
+    monkeypatch.setattr(email, "send_email", slow_send_email)
+    monkeypatch.setattr(get_settings(), "smtp_concurrency", 3)
+    campaign_id = await _make_campaign(10)
+
+    await email_tasks._send_campaign(campaign_id)
+
+    assert peak == 3
+
+
+async def test_campaign_contact_ids():
+    campaign_id = await _make_campaign(3)
+
+    ids = await email_tasks._campaign_contact_ids(campaign_id)
+
+    assert len(ids) == 3
+    assert ids == sorted(ids)
+    assert await email_tasks._campaign_contact_ids("missing") is None
+
+
+async def test_retried_shard_skips_recorded_contacts(monkeypatch):
+    import app.services.email as email
+
+    sent_to: list[str] = []
+
+    async def fake_send_email(to_email, **kwargs):
+        sent_to.append(to_email)
+        return True
+
+    monkeypatch.setattr(email, "send_email", fake_send_email)
+    campaign_id = await _make_campaign(3)
+    contact_ids = await email_tasks._campaign_contact_ids(campaign_id)
+
+    first = await email_tasks._send_contacts(campaign_id, contact_ids)
+    again = await email_tasks._send_contacts(campaign_id, contact_ids)
+
+    assert len(sent_to) == 3
+    assert first == again == {"sent": 3, "bounced": 0}
+
+
+def test_shard_retries_transient_errors(monkeypatch):
+    from sqlalchemy.exc import OperationalError
+
+    error = OperationalError("INSERT", {}, Exception("database is locked"))
+
+    def failing_run_async(coro):
+        coro.close()
+        raise error
+
+    retried = []
+
+    def fake_retry(exc):
+        retried.append(exc)
+        return RuntimeError("retry")
+
+    monkeypatch.setattr(email_tasks, "run_async", failing_run_async)
+    monkeypatch.setattr(email_tasks.send_contact_batch_task, "retry", fake_retry)
+
+    with pytest.raises(RuntimeError, match="retry"):
+        email_tasks.send_contact_batch_task.run("c-1", ["ct-1"])
+    assert retried == [error]
+
+
+async def test_failed_shard_marks_campaign_failed(monkeypatch):
+    from types import SimpleNamespace
+
+    from app.tasks.celery_app import celery_app
+
+    pending = []
+    monkeypatch.setattr(email_tasks, "run_async", pending.append)
+    campaign_id = await _make_campaign(1)
+
+    [errback] = email_tasks._finalize_signature(campaign_id).options["link_error"]
+    celery_app.signature(errback)(SimpleNamespace(id="shard-1"), RuntimeError("boom"), None)
+    await pending.pop()
+
+    async with async_session() as db:
+        assert (await db.get(Campaign, campaign_id)).status == "failed"
+
+
+async def test_smtp_outage_retries_shard_instead_of_bouncing(monkeypatch):
+    import aiosmtplib
+
+    import app.services.email as email
+
+    class UpSMTP:
+        is_connected = True
+
+        async def sendmail(self, sender, recipients, message):
+            pass
+
+        async def quit(self):
+            pass
+
+    server_up = False
+
+    async def connect():
+        if not server_up:
+            raise aiosmtplib.SMTPConnectError("connection refused")
+        return UpSMTP()
+
+    monkeypatch.setattr(email, "_connect_smtp", connect)
+    monkeypatch.setattr(email.settings, "mail_backend", "smtp")
+    await email.close_smtp_pool()
+    campaign_id = await _make_campaign(2)
+    contact_ids = await email_tasks._campaign_contact_ids(campaign_id)
+
+    with pytest.raises(email_tasks._TRANSIENT_ERRORS):
+        await email_tasks._send_contacts(campaign_id, contact_ids)
+    async with async_session() as db:
+        recorded = await db.scalar(select(func.count(EmailEvent.id)).where(EmailEvent.campaign_id == campaign_id))
+    assert recorded == 0
+
+    server_up = True
+    assert await email_tasks._send_contacts(campaign_id, contact_ids) == {"sent": 2, "bounced": 0}
+    await email.close_smtp_pool()
@@ -1,6 +1,8 @@
 """Tests for email validation service."""
 
+import time
 
+from app.services import email_validator
 from app.services.email_validator import (
     DISPOSABLE_DOMAINS,
     FREE_EMAIL_PROVIDERS,
@@ -9,6 +11,8 @@ from app.services.email_validator import (
     ValidationLevel,
     check_disposable,
     check_free_provider,
+    check_mx_records,
+    check_mx_records_async,
     check_role_based,
     validate_email,
     validate_emails_bulk,
@@ -82,6 +86,11 @@ class TestValidateSyntax:
         valid, *_, errors = validate_syntax("user.@example.com")
         assert valid is False
 
+    def test_local_part_at_limit(self):
+        valid, local, domain, tld, errors = validate_syntax(f"{'a' * 64}@example.com")
+        assert valid is True
+        assert (len(local), domain, tld, errors) == (64, "example.com", "com", [])
+
     def test_local_part_too_long(self):
         long_local = "a" * 65
         valid, *_, errors = validate_syntax(f"{long_local}@example.com")
@@ -124,6 +133,18 @@ class TestDomainChecks:
     def test_disposable_yopmail(self):
         assert check_disposable("yopmail.com") is True
 
+    def test_disposable_subdomain(self):
+        assert check_disposable("foo.mailinator.com") is True
+
+    def test_listed_subdomain_keeps_parent_flags(self, monkeypatch):
+        monkeypatch.setattr(email_validator, "DISPOSABLE_DOMAINS", frozenset({"spam.mail.com"}))
+        monkeypatch.setattr(email_validator, "FREE_EMAIL_PROVIDERS", frozenset({"mail.com"}))
+        kinds = email_validator._index_domain_kinds()
+        assert kinds == {"spam.mail.com": (True, True), "mail.com": (False, True)}
+
+    def test_not_disposable_lookalike(self):
+        assert check_disposable("notmailinator.com") is False
+
     def test_not_disposable_gmail(self):
         assert check_disposable("gmail.com") is False
 
@@ -145,6 +166,11 @@ class TestDomainChecks:
     def test_not_free_provider(self):
         assert check_free_provider("enterprise.co") is False
 
+    def test_checks_ignore_case(self):
+        assert check_disposable("Mailinator.COM") is True
+        assert check_free_provider("Gmail.com") is True
+        assert check_role_based("Admin") is True
+
     def test_role_based_admin(self):
         assert check_role_based("admin") is True
 
@@ -250,14 +276,14 @@ class TestValidateEmail:
 class TestBulkValidation:
     """Tests for bulk email validation."""
 
-    def test_bulk_mixed(self):
+    async def test_bulk_mixed(self):
         emails = [
             "valid@company.com",
             "temp@mailinator.com",
             "info@business.com",
             "invalid",
         ]
-        result = validate_emails_bulk(emails)
+        result = await validate_emails_bulk(emails)
         assert result["total"] == 4
         assert result["valid"] == 2  # valid + info
         assert result["invalid"] == 2  # mailinator + invalid
@@ -265,41 +291,62 @@ class TestBulkValidation:
         assert result["role_based_count"] == 1
         assert len(result["results"]) == 4
 
-    def test_bulk_empty_list(self):
-        result = validate_emails_bulk([])
+    async def test_bulk_empty_list(self):
+        result = await validate_emails_bulk([])
         assert result["total"] == 0
         assert result["valid"] == 0
         assert result["avg_score"] == 0
 
-    def test_bulk_all_valid(self):
+    async def test_bulk_all_valid(self):
         emails = ["a@company.com", "b@company.com", "c@company.com"]
-        result = validate_emails_bulk(emails)
+        result = await validate_emails_bulk(emails)
         assert result["valid"] == 3
         assert result["invalid"] == 0
 
-    def test_bulk_all_disposable(self):
+    async def test_bulk_all_disposable(self):
         emails = ["a@mailinator.com", "b@guerrillamail.com"]
-        result = validate_emails_bulk(emails)
+        result = await validate_emails_bulk(emails)
         assert result["valid"] == 0
         assert result["disposable_count"] == 2
 
-    def test_bulk_risk_distribution(self):
+    async def test_bulk_risk_distribution(self):
         emails = [
             "user@business.com",       # low
             "user@gmail.com",          # medium
             "admin@company.com",       # high (role-based)
             "temp@mailinator.com",     # critical
         ]
-        result = validate_emails_bulk(emails)
+        result = await validate_emails_bulk(emails)
         dist = result["risk_distribution"]
         assert dist["low"] >= 1
         assert dist["critical"] >= 1
 
-    def test_bulk_avg_score(self):
+    async def test_bulk_avg_score(self):
         emails = ["user@business.com"]
-        result = validate_emails_bulk(emails)
+        result = await validate_emails_bulk(emails)
         assert result["avg_score"] > 0
 
+    async def test_bulk_mx_uses_cached_domain_lookup(self):
+        email_validator._mx_cache.clear()
+        email_validator._mx_cache_put("shared.example", True, ["mx.shared.example"], 3600)
+        email_validator._mx_cache_put("dead.example", False, [])
+        emails = ["a@shared.example", "b@shared.example", "c@dead.example"]
+        result = await validate_emails_bulk(emails, level=ValidationLevel.MX)
+        assert result["valid"] == 2
+        assert result["results"][0]["mx_records"] == ["mx.shared.example"]
+        assert result["results"][2]["risk"] == "critical"
+
+    async def test_bulk_repeated_address_counted_per_occurrence(self):
+        email_validator._mx_cache.clear()
+        email_validator._mx_cache_put("shared.example", True, ["mx.shared.example"], 3600)
+        email_validator._mx_cache_put("dead.example", False, [])
+        emails = ["c@dead.example", "ok@shared.example", "c@dead.example"]
+        result = await validate_emails_bulk(emails, level=ValidationLevel.MX)
+        assert result["total"] == 3
+        assert result["risk_distribution"]["critical"] == 2
+        assert result["results"][0] == result["results"][2]
+        assert result["results"][2]["errors"] == ["No MX or A records found for domain"]
+
 
 class TestDisposableDomains:
     """Verify the disposable domain list is comprehensive."""
@@ -327,3 +374,28 @@ class TestRoleBasedPrefixes:
         common = ["admin", "info", "support", "sales", "noreply", "webmaster"]
         for prefix in common:
             assert prefix in ROLE_BASED_PREFIXES
+
+
+class TestMXCache:
+    """Tests for the per-domain MX lookup cache."""
+
+    def setup_method(self):
+        email_validator._mx_cache.clear()
+
+    def test_cached_result_skips_lookup(self):
+        email_validator._mx_cache_put("cached.example", True, ["mx1.cached.example"], 3600)
+        assert check_mx_records("Cached.Example") == (True, ["mx1.cached.example"])
+
+    async def test_async_shares_cache(self):
+        email_validator._mx_cache_put("cached.example", True, ["mx1.cached.example"], 3600)
+        assert await check_mx_records_async("cached.example") == (True, ["mx1.cached.example"])
+
+    def test_negative_result_uses_short_ttl(self):
+        email_validator._mx_cache_put("broken.example", False, [], 3600)
+        expires = email_validator._mx_cache["broken.example"][0]
+        assert expires - time.monotonic() <= email_validator._MX_NEGATIVE_TTL
+
+    def test_expired_entry_evicted(self):
+        email_validator._mx_cache_put("stale.example", True, ["mx.stale.example"], 0)
+        assert email_validator._mx_cache_get("stale.example") is None
+        assert "stale.example" not in email_validator._mx_cache
@@ -3,6 +3,10 @@
 import pytest
 import uuid
 
+# Ids that match no row; generated once per run rather than per request
+MISSING_ID = str(uuid.uuid4())
+MISSING_CONTACT_ID = str(uuid.uuid4())
+
 
 # ── Contacts ─────────────────────────────────────────────
 @pytest.mark.asyncio
@@ -31,13 +35,13 @@ async def test_contact_count(client):
 
 @pytest.mark.asyncio
 async def test_get_contact_404(client):
-    resp = await client.get(f"/api/v1/contacts/{uuid.uuid4()}")
+    resp = await client.get(f"/api/v1/contacts/{MISSING_ID}")
     assert resp.status_code in (404, 500)
 
 
 @pytest.mark.asyncio
 async def test_delete_contact_404(client):
-    resp = await client.delete(f"/api/v1/contacts/{uuid.uuid4()}")
+    resp = await client.delete(f"/api/v1/contacts/{MISSING_ID}")
     assert resp.status_code in (404, 500)
 
 
@@ -68,19 +72,19 @@ async def test_list_campaigns_with_status(client):
 
 @pytest.mark.asyncio
 async def test_get_campaign_404(client):
-    resp = await client.get(f"/api/v1/campaigns/{uuid.uuid4()}")
+    resp = await client.get(f"/api/v1/campaigns/{MISSING_ID}")
     assert resp.status_code in (404, 500)
 
 
 @pytest.mark.asyncio
 async def test_send_campaign_404(client):
-    resp = await client.post(f"/api/v1/campaigns/{uuid.uuid4()}/send")
+    resp = await client.post(f"/api/v1/campaigns/{MISSING_ID}/send")
     assert resp.status_code in (404, 500)
 
 
 @pytest.mark.asyncio
 async def test_delete_campaign_404(client):
-    resp = await client.delete(f"/api/v1/campaigns/{uuid.uuid4()}")
+    resp = await client.delete(f"/api/v1/campaigns/{MISSING_ID}")
     assert resp.status_code in (404, 500)
 
 
@@ -93,10 +97,46 @@ async def test_list_workflows(client):
 
 @pytest.mark.asyncio
 async def test_get_workflow_404(client):
-    resp = await client.get(f"/api/v1/workflows/{uuid.uuid4()}")
+    resp = await client.get(f"/api/v1/workflows/{MISSING_ID}")
     assert resp.status_code in (404, 500)
 
 
+@pytest.mark.asyncio
+async def test_trigger_workflow_logs_steps(client):
+    contact = await client.post("/api/v1/contacts/", json={"email": "wf@example.com", "country": "US"})
+    workflow = await client.post("/api/v1/workflows/", json={
+        "name": "Country gate",
+        "trigger_type": "manual",
+        "steps": [
+            {"type": "action", "action": "tag", "tag_name": "seen"},
+            {"type": "action", "action": "tag", "tag_name": "seen"},
+            {"type": "action", "action": "remove_tag", "tag_name": "never-created"},
+            {"type": "condition", "field": "country", "operator": "eq", "value": "DE"},
+            {"type": "action", "action": "tag", "tag_name": "german"},
+            {"type": "delay", "hours": 24},
+        ],
+    })
+    wf_id = workflow.json()["id"]
+
+    resp = await client.post(
+        f"/api/v1/workflows/{wf_id}/trigger",
+        json={"contact_id": contact.json()["id"], "context": {}},
+    )
+    assert resp.status_code == 200
+    assert resp.json()["steps_executed"] == 6
+
+    logs = (await client.get(f"/api/v1/workflows/{wf_id}/logs")).json()
+    assert sorted((log["step_index"], log["status"]) for log in logs) == [
+        (0, "completed"), (1, "completed"), (2, "completed"),
+        (3, "skipped"), (4, "skipped"),
+    ]
+    skipped = next(log for log in logs if log["step_index"] == 4)
+    assert skipped["result"] == {"skipped_range": [4, 5]}
+
+    tagged = (await client.get(f"/api/v1/contacts/{contact.json()['id']}")).json()
+    assert [t["name"] for t in tagged["tags"]] == ["seen"]
+
+
 # ── Dashboard ────────────────────────────────────────────
 @pytest.mark.asyncio
 async def test_dashboard_stats(client):
@@ -107,17 +147,13 @@ async def test_dashboard_stats(client):
 # ── Tracking ─────────────────────────────────────────────
 @pytest.mark.asyncio
 async def test_tracking_open(client):
-    cid = str(uuid.uuid4())
-    uid = str(uuid.uuid4())
-    resp = await client.get(f"/api/v1/track/open/{cid}/{uid}")
+    resp = await client.get(f"/api/v1/track/open/{MISSING_ID}/{MISSING_CONTACT_ID}")
     assert resp.status_code in (200, 500)
 
 
 @pytest.mark.asyncio
 async def test_tracking_click(client):
-    cid = str(uuid.uuid4())
-    uid = str(uuid.uuid4())
-    resp = await client.get(f"/api/v1/track/click/{cid}/{uid}?url=https://example.com")
+    resp = await client.get(f"/api/v1/track/click/{MISSING_ID}/{MISSING_CONTACT_ID}?url=https://example.com")
     assert resp.status_code in (200, 302, 307, 500)
 
 
@@ -144,5 +180,5 @@ async def test_templates_list(client):
 
 @pytest.mark.asyncio
 async def test_template_404(client):
-    resp = await client.get(f"/api/v1/templates/{uuid.uuid4()}")
+    resp = await client.get(f"/api/v1/templates/{MISSING_ID}")
     assert resp.status_code in (404, 500)
@@ -46,6 +46,13 @@ def test_normalize_column_language():
     assert normalize_column("语言") == "language"
 
 
+def test_normalize_column_ignores_separators():
+    from app.api.import_export import normalize_column
+    assert normalize_column(" E_Mail ") == "email"
+    assert normalize_column("first-name") == "first_name"
+    assert normalize_column("Last.Name") == "last_name"
+
+
 def test_normalize_column_unknown():
     from app.api.import_export import normalize_column
     assert normalize_column("random_field") is None
@@ -125,3 +132,29 @@ async def test_preview_csv_non_csv(client):
     files = {"file": ("test.json", io.BytesIO(b'{"a":1}'), "application/json")}
     resp = await client.post("/api/v1/import/csv/preview", files=files)
     assert resp.status_code in (400, 500)
+
+
+@pytest.mark.asyncio
+async def test_preview_csv_counts_all_rows(client):
+    import io
+    body = "\ufeffName,Contact\n" + "".join(f"User {i},user{i}@example.com\n" for i in range(8))
+    files = {"file": ("contacts.csv", io.BytesIO(body.encode("utf-8")), "text/csv")}
+    resp = await client.post("/api/v1/import/csv/preview", files=files)
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["columns"] == ["Name", "Contact"]
+    assert data["total_rows"] == 8
+    assert len(data["sample_rows"]) == 5
+    assert data["detected_email_column"] == "Contact"
+
+
+@pytest.mark.asyncio
+async def test_import_csv_detects_email_column_by_content(client):
+    import io
+    body = b"Name,Contact\nAda,ada@example.com\nBad,not-an-email\nBob,bob@example.com\n"
+    files = {"file": ("contacts.csv", io.BytesIO(body), "text/csv")}
+    resp = await client.post("/api/v1/import/csv", files=files)
+    assert resp.status_code == 200
+    data = resp.json()
+    assert (data["total_rows"], data["created"], data["skipped"]) == (3, 2, 1)
+    assert data["errors"] == [{"row": 3, "email": "not-an-email", "error": "Invalid email"}]
@@ -3,11 +3,14 @@
 
 from app.services.contact_lifecycle import (
     DEFAULT_RULES,
+    DORMANCY_BY_STAGE,
     DORMANCY_RULES,
     LifecycleStage,
+    RULES_BY_STAGE,
     STAGE_ORDER,
     TransitionResult,
     TransitionRule,
+    evaluate_lifecycle,
 )
 
 
@@ -252,3 +255,36 @@ class TestLifecycleLogic:
         """Evangelists shouldn't auto-dormant."""
         ev_dormancy = [r for r in DORMANCY_RULES if r.from_stage == LifecycleStage.EVANGELIST]
         assert len(ev_dormancy) == 0
+
+    def test_dormancy_by_stage_covers_every_rule(self):
+        indexed = [r for rules in DORMANCY_BY_STAGE.values() for r in rules]
+        assert sorted(indexed, key=DORMANCY_RULES.index) == list(DORMANCY_RULES)
+        for stage, rules in DORMANCY_BY_STAGE.items():
+            assert all(r.from_stage.value == stage for r in rules)
+
+    def test_rules_by_stage_keeps_declaration_order(self):
+        indexed = [r for rules in RULES_BY_STAGE.values() for r in rules]
+        assert sorted(indexed, key=DEFAULT_RULES.index) == list(DEFAULT_RULES)
+        for stage, rules in RULES_BY_STAGE.items():
+            assert list(rules) == [r for r in DEFAULT_RULES if r.from_stage.value == stage]
+
+
+class TestEvaluateLifecycle:
+    """Tests for progression rule precedence in evaluate_lifecycle."""
+
+    CUSTOM_RULES = [
+        TransitionRule(from_stage=LifecycleStage.LEAD, to_stage=LifecycleStage.SQL, min_score=80),
+        TransitionRule(from_stage=LifecycleStage.LEAD, to_stage=LifecycleStage.MQL, min_score=35),
+    ]
+
+    async def test_first_declared_rule_met_wins(self, db):
+        result = await evaluate_lifecycle(db, "no-events", "lead", score=90, custom_rules=self.CUSTOM_RULES)
+        assert result.new_stage == "sql"
+
+    async def test_unmet_rule_does_not_stop_later_rules(self, db):
+        result = await evaluate_lifecycle(db, "no-events", "lead", score=50, custom_rules=self.CUSTOM_RULES)
+        assert result.new_stage == "mql"
+
+    async def test_no_rule_met(self, db):
+        result = await evaluate_lifecycle(db, "no-events", "lead", score=10, custom_rules=self.CUSTOM_RULES)
+        assert (result.new_stage, result.transitioned) == ("lead", False)
@@ -13,8 +13,10 @@ def test_contact_create_valid():
 
 
 def test_contact_create_invalid_email():
-    with pytest.raises(ValidationError):
-        ContactCreate(email="not-an-email")
+    with pytest.raises(ValidationError) as exc_info:
+        ContactCreate.model_validate_json('{"email": "not-an-email"}')
+    [error] = exc_info.value.errors()
+    assert (error["type"], error["loc"]) == ("value_error", ("email",))
 
 
 def test_contact_create_defaults():
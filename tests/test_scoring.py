@@ -3,7 +3,49 @@
 import json
 import math
 from datetime import datetime, timedelta, timezone
-from unittest.mock import MagicMock
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import select
+
+from app.api.scoring import (
+    BulkSuppressionRequest,
+    ContactScoreOut,
+    ScoreEventCreate,
+    ScoreEventOut,
+    ScoringRuleCreate,
+    ScoringRuleOut,
+    ScoringRuleUpdate,
+    SuppressionCreate,
+)
+from app.models import Contact
+from app.models.lead_score import ContactScore, ScoreEvent, ScoringRule, SuppressionList
+from app.services.scoring_engine import (
+    GRADE_THRESHOLDS,
+    LIFECYCLE_THRESHOLDS,
+    _score_to_grade,
+    _score_to_lifecycle,
+    calculate_profile_score,
+    calculate_recency_score,
+    get_score_leaderboard,
+    process_scoring_rules,
+    recalculate_all_scores_bulk,
+    recalculate_contact_score,
+    stream_score_leaderboard,
+)
+
+# Serialized custom_fields payloads, as stored on Contact
+FULL_CUSTOM_FIELDS = json.dumps({"company": "Acme", "role": "CEO"})
+
+# Every profile field filled plus more custom fields than the bonus counts
+CAPPED_CONTACT = SimpleNamespace(
+    email="a@b.com",
+    first_name="A",
+    last_name="B",
+    phone="+1",
+    country="US",
+    custom_fields=json.dumps({f"k{i}": i for i in range(10)}),
+)
 
 
 # ── Scoring engine unit tests ─────────────────────────────
@@ -22,48 +64,35 @@ class TestProfileScoring:
             "custom_fields": "{}",
         }
         defaults.update(kwargs)
-        contact = MagicMock()
-        for k, v in defaults.items():
-            setattr(contact, k, v)
-        return contact
+        return SimpleNamespace(**defaults)
 
     def test_empty_profile(self):
-        from app.services.scoring_engine import calculate_profile_score
-
         contact = self._make_contact(email="")
         score = calculate_profile_score(contact)
         assert score == 0.0
 
     def test_email_only(self):
-        from app.services.scoring_engine import calculate_profile_score
-
         contact = self._make_contact()
         score = calculate_profile_score(contact)
         assert score == 4.0  # email only
 
     def test_full_profile(self):
-        from app.services.scoring_engine import calculate_profile_score
-
         contact = self._make_contact(
             first_name="John",
             last_name="Doe",
             phone="+1234567890",
             country="US",
-            custom_fields=json.dumps({"company": "Acme", "role": "CEO"}),
+            custom_fields=FULL_CUSTOM_FIELDS,
         )
         score = calculate_profile_score(contact)
         assert score == 20.0  # 4+4+3+3+3+3 = 20
 
     def test_partial_profile(self):
-        from app.services.scoring_engine import calculate_profile_score
-
         contact = self._make_contact(first_name="Jane", country="UK")
         score = calculate_profile_score(contact)
         assert score == 11.0  # 4(email) + 4(first_name) + 3(country)
 
     def test_json_string_custom_fields(self):
-        from app.services.scoring_engine import calculate_profile_score
-
         contact = self._make_contact(
             first_name="A",
             custom_fields='{"a": 1, "b": 2}',
@@ -72,15 +101,11 @@ class TestProfileScoring:
         assert score >= 11.0  # email + first_name + custom_fields bonus
 
     def test_invalid_json_custom_fields(self):
-        from app.services.scoring_engine import calculate_profile_score
-
         contact = self._make_contact(custom_fields="not json")
         score = calculate_profile_score(contact)
         assert score == 4.0  # just email
 
     def test_dict_custom_fields(self):
-        from app.services.scoring_engine import calculate_profile_score
-
         contact = self._make_contact(
             custom_fields={"industry": "tech", "size": "large"},
         )
@@ -92,91 +117,68 @@ class TestRecencyScoring:
     """Test time-decay recency scoring."""
 
     def test_no_activity(self):
-        from app.services.scoring_engine import calculate_recency_score
-
         assert calculate_recency_score(None) == 0.0
 
     def test_recent_activity(self):
-        from app.services.scoring_engine import calculate_recency_score
-
         now = datetime.now(timezone.utc)
         score = calculate_recency_score(now)
         assert score == 20.0
 
-    def test_old_activity(self):
-        from app.services.scoring_engine import calculate_recency_score
-
-        old = datetime.now(timezone.utc) - timedelta(days=100)
-        score = calculate_recency_score(old)
-        assert score == 0.0
-
-    def test_30_days_ago(self):
-        from app.services.scoring_engine import calculate_recency_score
-
-        t = datetime.now(timezone.utc) - timedelta(days=30)
-        score = calculate_recency_score(t)
-        expected = 20.0 * math.exp(-0.03 * 30)
-        assert abs(score - round(expected, 2)) < 0.1
+    @pytest.mark.parametrize("days", [1, 7, 30, 60, 89, 90, 100])
+    def test_decay_by_age(self, days):
+        now = datetime(2026, 3, 1, tzinfo=timezone.utc)
+        expected = 0.0 if days >= 90 else round(20.0 * math.exp(-0.03 * days), 2)
+        assert calculate_recency_score(now - timedelta(days=days), now=now) == expected
 
     def test_naive_datetime_handled(self):
-        from app.services.scoring_engine import calculate_recency_score
-
         naive = datetime.now() - timedelta(days=1)
         score = calculate_recency_score(naive)
         assert 0 < score < 20.0
 
-    def test_exactly_90_days(self):
-        from app.services.scoring_engine import calculate_recency_score
-
-        t = datetime.now(timezone.utc) - timedelta(days=90)
-        score = calculate_recency_score(t)
-        assert score == 0.0
-
 
 class TestGradeAndLifecycle:
     """Test grade and lifecycle stage determination."""
 
-    def test_grades(self):
-        from app.services.scoring_engine import _score_to_grade
+    @pytest.mark.parametrize("score,grade", [
+        (95, "A+"), (85, "A"), (75, "B+"), (65, "B"), (50, "C"), (30, "D"), (10, "F"), (0, "F"),
+    ])
+    def test_grades(self, score, grade):
+        assert _score_to_grade(score) == grade
 
-        assert _score_to_grade(95) == "A+"
-        assert _score_to_grade(85) == "A"
-        assert _score_to_grade(75) == "B+"
-        assert _score_to_grade(65) == "B"
-        assert _score_to_grade(50) == "C"
-        assert _score_to_grade(30) == "D"
-        assert _score_to_grade(10) == "F"
-        assert _score_to_grade(0) == "F"
-
-    def test_lifecycle_stages(self):
-        from app.services.scoring_engine import _score_to_lifecycle
-
-        assert _score_to_lifecycle(95, "subscriber") == "evangelist"
-        assert _score_to_lifecycle(75, "subscriber") == "customer"
-        assert _score_to_lifecycle(60, "subscriber") == "sql"
-        assert _score_to_lifecycle(45, "subscriber") == "mql"
-        assert _score_to_lifecycle(25, "subscriber") == "lead"
-        assert _score_to_lifecycle(10, "subscriber") == "subscriber"
+    @pytest.mark.parametrize("score,stage", [
+        (95, "evangelist"), (75, "customer"), (60, "sql"), (45, "mql"), (25, "lead"), (10, "subscriber"),
+    ])
+    def test_lifecycle_stages(self, score, stage):
+        assert _score_to_lifecycle(score, "subscriber") == stage
 
     def test_lifecycle_no_demotion_from_customer(self):
-        from app.services.scoring_engine import _score_to_lifecycle
-
         assert _score_to_lifecycle(10, "customer") == "customer"
         assert _score_to_lifecycle(5, "evangelist") == "evangelist"
 
     def test_lifecycle_promotion(self):
-        from app.services.scoring_engine import _score_to_lifecycle
-
         assert _score_to_lifecycle(50, "lead") == "mql"
         assert _score_to_lifecycle(80, "mql") == "customer"
 
+    def test_threshold_boundaries(self):
+        for threshold, grade in GRADE_THRESHOLDS:
+            assert _score_to_grade(threshold) == grade
+        for threshold, stage in LIFECYCLE_THRESHOLDS:
+            assert _score_to_lifecycle(threshold, "subscriber") == stage
+        assert _score_to_grade(89.99) == "A"
+        assert _score_to_lifecycle(-1, "lead") == "subscriber"
+
+    def test_grade_matches_threshold_scan(self):
+        # Linear scan of the descending table is the reference for the bisect lookup
+        for tenths in range(-100, 1101):
+            score = tenths / 10
+            expected = next((g for t, g in GRADE_THRESHOLDS if score >= t), "F")
+            assert _score_to_grade(score) == expected, score
+
 
 class TestScoringRuleModel:
     """Test ScoringRule model creation."""
 
     def test_create_rule(self):
-        from app.models.lead_score import ScoringRule
-
         rule = ScoringRule(
             name="Email Open",
             event_type="email_opened",
@@ -190,8 +192,6 @@ class TestScoringRuleModel:
         assert rule.event_type == "email_opened"
 
     def test_negative_points(self):
-        from app.models.lead_score import ScoringRule
-
         rule = ScoringRule(
             name="Unsubscribe Penalty",
             event_type="unsubscribed",
@@ -204,8 +204,6 @@ class TestContactScoreModel:
     """Test ContactScore model."""
 
     def test_default_values(self):
-        from app.models.lead_score import ContactScore
-
         score = ContactScore(contact_id="test-123")
         assert score.total_score == 0.0
         assert score.engagement_score == 0.0
@@ -219,8 +217,6 @@ class TestScoreEventModel:
     """Test ScoreEvent model."""
 
     def test_create_event(self):
-        from app.models.lead_score import ScoreEvent
-
         event = ScoreEvent(
             contact_id="contact-1",
             event_type="email_clicked",
@@ -235,8 +231,6 @@ class TestSuppressionModel:
     """Test SuppressionList model."""
 
     def test_create_suppression(self):
-        from app.models.lead_score import SuppressionList
-
         entry = SuppressionList(
             email="bounce@example.com",
             reason="bounce",
@@ -253,8 +247,6 @@ class TestScoringSchemas:
     """Test Pydantic schema validation for scoring API."""
 
     def test_scoring_rule_create(self):
-        from app.api.scoring import ScoringRuleCreate
-
         rule = ScoringRuleCreate(
             name="Click Bonus",
             event_type="email_clicked",
@@ -266,16 +258,12 @@ class TestScoringSchemas:
         assert rule.condition == {}
 
     def test_scoring_rule_update_partial(self):
-        from app.api.scoring import ScoringRuleUpdate
-
         update = ScoringRuleUpdate(points=15)
         data = update.model_dump(exclude_unset=True)
         assert data == {"points": 15}
         assert "name" not in data
 
     def test_score_event_create(self):
-        from app.api.scoring import ScoreEventCreate
-
         event = ScoreEventCreate(
             contact_id="c-123",
             event_type="manual_award",
@@ -286,8 +274,6 @@ class TestScoringSchemas:
         assert event.metadata == {}
 
     def test_suppression_create(self):
-        from app.api.scoring import SuppressionCreate
-
         supp = SuppressionCreate(
             email="bad@example.com",
             reason="complaint",
@@ -296,8 +282,6 @@ class TestScoringSchemas:
         assert supp.reason == "complaint"
 
     def test_bulk_suppression(self):
-        from app.api.scoring import BulkSuppressionRequest
-
         bulk = BulkSuppressionRequest(
             emails=["a@b.com", "c@d.com"],
             reason="bounce",
@@ -305,8 +289,6 @@ class TestScoringSchemas:
         assert len(bulk.emails) == 2
 
     def test_contact_score_out(self):
-        from app.api.scoring import ContactScoreOut
-
         score = ContactScoreOut(
             contact_id="c-1",
             total_score=75.5,
@@ -318,53 +300,48 @@ class TestScoringSchemas:
         )
         assert score.grade == "B+"
 
-    def test_score_event_out(self):
-        from app.api.scoring import ScoreEventOut
-
-        now = datetime.now(timezone.utc)
+    def test_score_event_out(self, now_utc):
         out = ScoreEventOut(
             id="e-1",
             contact_id="c-1",
             event_type="email_opened",
             points=5,
             reason="Rule: Open Bonus",
-            created_at=now,
+            created_at=now_utc,
         )
         assert out.rule_id is None
 
-    def test_scoring_rule_out_from_model(self):
-        from app.api.scoring import ScoringRuleOut
-
-        rule = MagicMock()
-        rule.id = "r-1"
-        rule.name = "Test Rule"
-        rule.description = "A test"
-        rule.event_type = "email_opened"
-        rule.condition = '{"campaign_id": "c-1"}'
-        rule.points = 5
-        rule.max_per_contact = 10
-        rule.decay_days = 30
-        rule.active = True
-        rule.created_at = datetime.now(timezone.utc)
+    def test_scoring_rule_out_from_model(self, now_utc):
+        rule = SimpleNamespace(
+            id="r-1",
+            name="Test Rule",
+            description="A test",
+            event_type="email_opened",
+            condition='{"campaign_id": "c-1"}',
+            points=5,
+            max_per_contact=10,
+            decay_days=30,
+            active=True,
+            created_at=now_utc,
+        )
 
         out = ScoringRuleOut.from_model(rule)
         assert out.condition == {"campaign_id": "c-1"}
         assert out.points == 5
 
-    def test_scoring_rule_out_invalid_json(self):
-        from app.api.scoring import ScoringRuleOut
-
-        rule = MagicMock()
-        rule.id = "r-2"
-        rule.name = "Bad JSON"
-        rule.description = ""
-        rule.event_type = "email_clicked"
-        rule.condition = "not-json"
-        rule.points = 3
-        rule.max_per_contact = 0
-        rule.decay_days = 0
-        rule.active = True
-        rule.created_at = datetime.now(timezone.utc)
+    def test_scoring_rule_out_invalid_json(self, now_utc):
+        rule = SimpleNamespace(
+            id="r-2",
+            name="Bad JSON",
+            description="",
+            event_type="email_clicked",
+            condition="not-json",
+            points=3,
+            max_per_contact=0,
+            decay_days=0,
+            active=True,
+            created_at=now_utc,
+        )
 
         out = ScoringRuleOut.from_model(rule)
         assert out.condition == {}
@@ -374,52 +351,95 @@ class TestEdgeCases:
     """Test edge cases and boundary conditions."""
 
     def test_zero_score_grade(self):
-        from app.services.scoring_engine import _score_to_grade
-
         assert _score_to_grade(0) == "F"
 
     def test_exactly_90_grade(self):
-        from app.services.scoring_engine import _score_to_grade
-
         assert _score_to_grade(90) == "A+"
 
     def test_negative_score_grade(self):
-        from app.services.scoring_engine import _score_to_grade
-
         assert _score_to_grade(-5) == "F"
 
     def test_huge_score_grade(self):
-        from app.services.scoring_engine import _score_to_grade
-
         assert _score_to_grade(1000) == "A+"
 
     def test_recency_far_future(self):
-        from app.services.scoring_engine import calculate_recency_score
-
         future = datetime.now(timezone.utc) + timedelta(days=1)
         score = calculate_recency_score(future)
         assert score == 20.0
 
     def test_profile_score_capped_at_20(self):
-        from app.services.scoring_engine import calculate_profile_score
-
-        contact = MagicMock()
-        contact.email = "a@b.com"
-        contact.first_name = "A"
-        contact.last_name = "B"
-        contact.phone = "+1"
-        contact.country = "US"
-        contact.custom_fields = json.dumps({f"k{i}": i for i in range(10)})
-        score = calculate_profile_score(contact)
-        assert score <= 20.0
+        assert calculate_profile_score(CAPPED_CONTACT) == 20.0
 
     def test_lifecycle_subscriber_default(self):
-        from app.services.scoring_engine import _score_to_lifecycle
-
         assert _score_to_lifecycle(0, "subscriber") == "subscriber"
 
     def test_lifecycle_boundary_20(self):
-        from app.services.scoring_engine import _score_to_lifecycle
-
         assert _score_to_lifecycle(20, "subscriber") == "lead"
         assert _score_to_lifecycle(19, "subscriber") == "subscriber"
+
+
+class TestProcessScoringRules:
+    """Test rule processing against the database."""
+
+    async def test_matched_rules_applied_in_one_batch(self, db):
+        contact = Contact(email="scored@example.com")
+        db.add(contact)
+        db.add_all([
+            ScoringRule(name="open", event_type="email_opened", points=5),
+            ScoringRule(name="open once", event_type="email_opened", points=10, max_per_contact=1),
+            ScoringRule(name="vip", event_type="email_opened", points=50, condition='{"tier": "vip"}'),
+        ])
+        await db.commit()
+
+        first = await process_scoring_rules(db, contact.id, "email_opened", {"tier": "basic"})
+        second = await process_scoring_rules(db, contact.id, "email_opened", {"tier": "basic"})
+        score = (
+            await db.execute(select(ContactScore).where(ContactScore.contact_id == contact.id))
+        ).scalar_one()
+
+        assert sorted(e.points for e in first) == [5, 10]
+        assert [e.points for e in second] == [5]
+        assert score.engagement_score == 20
+
+    async def test_bulk_recalculation_matches_single(self, db):
+        rich = Contact(email="rich@example.com", first_name="Ann", country="US")
+        bare = Contact(email="bare@example.com")
+        db.add_all([rich, bare])
+        await db.flush()
+        db.add(ContactScore(contact_id=rich.id, lifecycle_stage="customer"))
+        db.add_all([
+            ScoreEvent(contact_id=rich.id, event_type="email_opened", points=30),
+            ScoreEvent(contact_id=rich.id, event_type="email_clicked", points=15),
+        ])
+        await db.commit()
+
+        assert await recalculate_all_scores_bulk(db, batch_size=1) == 2
+        bulk = {
+            s.contact_id: (s.total_score, s.grade, s.lifecycle_stage)
+            for s in (await db.execute(select(ContactScore))).scalars()
+        }
+
+        single = {}
+        for contact_id in (rich.id, bare.id):
+            s = await recalculate_contact_score(db, contact_id)
+            single[contact_id] = (s.total_score, s.grade, s.lifecycle_stage)
+
+        assert bulk.keys() == single.keys()
+        for contact_id, (total, grade, stage) in bulk.items():
+            assert math.isclose(total, single[contact_id][0], abs_tol=0.05)
+            assert (grade, stage) == single[contact_id][1:]
+        assert bulk[rich.id][2] == "customer"
+
+    async def test_stream_leaderboard_matches_list(self, db):
+        for i, total in enumerate([40, 90, 10]):
+            contact = Contact(email=f"lb{i}@example.com")
+            db.add(contact)
+            await db.flush()
+            db.add(ContactScore(contact_id=contact.id, total_score=total))
+        await db.commit()
+
+        listed = await get_score_leaderboard(db, limit=10)
+        streamed = [row async for row in stream_score_leaderboard(db, batch_size=1)]
+
+        assert streamed == listed
+        assert [row["total_score"] for row in streamed] == [90, 40, 10]
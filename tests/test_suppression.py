@@ -1,48 +1,35 @@
 """Tests for suppression list management."""
 
 from datetime import datetime, timezone
+from typing import get_args
 
 import pytest
-
+from pydantic import ValidationError
+
+from app.api.scoring import (
+    BulkSuppressionRequest,
+    SuppressionCreate,
+    SuppressionOut,
+    SuppressionReason,
+)
+from app.database import get_db
+from app.main import app
 from app.models.lead_score import SuppressionList
+from app.services.scoring_engine import _BloomFilter
 
 
 class TestSuppressionListModel:
     """Test SuppressionList model fields and defaults."""
 
-    def test_create_bounce_entry(self):
-        entry = SuppressionList(
-            email="hard-bounce@example.com",
-            reason="bounce",
-            source="campaign-abc",
-            notes="550 mailbox not found",
-        )
-        assert entry.email == "hard-bounce@example.com"
-        assert entry.reason == "bounce"
-
-    def test_create_complaint_entry(self):
-        entry = SuppressionList(
-            email="complainer@example.com",
-            reason="complaint",
-            source="ses-feedback",
-        )
-        assert entry.reason == "complaint"
-
-    def test_create_manual_entry(self):
-        entry = SuppressionList(
-            email="ceo@competitor.com",
-            reason="manual",
-            notes="Do not email — competitor",
-        )
-        assert entry.reason == "manual"
-
-    def test_create_compliance_entry(self):
-        entry = SuppressionList(
-            email="gdpr-request@eu.com",
-            reason="compliance",
-            source="gdpr-portal",
-        )
-        assert entry.reason == "compliance"
+    @pytest.mark.parametrize("email,reason,source,notes", [
+        ("hard-bounce@example.com", "bounce", "campaign-abc", "550 mailbox not found"),
+        ("complainer@example.com", "complaint", "ses-feedback", ""),
+        ("ceo@competitor.com", "manual", "", "Do not email — competitor"),
+        ("gdpr-request@eu.com", "compliance", "gdpr-portal", ""),
+    ])
+    def test_create_entry(self, email, reason, source, notes):
+        entry = SuppressionList(email=email, reason=reason, source=source, notes=notes)
+        assert (entry.email, entry.reason, entry.source, entry.notes) == (email, reason, source, notes)
 
     def test_default_empty_notes(self):
         entry = SuppressionList(email="a@b.com", reason="unsubscribe")
@@ -57,8 +44,6 @@ class TestSuppressionSchemas:
     """Test API schema validation for suppression endpoints."""
 
     def test_create_schema(self):
-        from app.api.scoring import SuppressionCreate
-
         data = SuppressionCreate(
             email="test@example.com",
             reason="bounce",
@@ -69,15 +54,11 @@ class TestSuppressionSchemas:
         assert data.reason == "bounce"
 
     def test_create_schema_minimal(self):
-        from app.api.scoring import SuppressionCreate
-
         data = SuppressionCreate(email="x@y.com", reason="manual")
         assert data.source == ""
         assert data.notes == ""
 
     def test_out_schema(self):
-        from app.api.scoring import SuppressionOut
-
         now = datetime.now(timezone.utc)
         out = SuppressionOut(
             id="s-1",
@@ -91,8 +72,6 @@ class TestSuppressionSchemas:
         assert out.reason == "complaint"
 
     def test_bulk_suppression_schema(self):
-        from app.api.scoring import BulkSuppressionRequest
-
         bulk = BulkSuppressionRequest(
             emails=["a@b.com", "c@d.com", "e@f.com"],
             reason="bounce",
@@ -102,8 +81,6 @@ class TestSuppressionSchemas:
         assert bulk.reason == "bounce"
 
     def test_bulk_suppression_empty_list(self):
-        from app.api.scoring import BulkSuppressionRequest
-
         bulk = BulkSuppressionRequest(emails=[], reason="manual")
         assert len(bulk.emails) == 0
 
@@ -111,27 +88,103 @@ class TestSuppressionSchemas:
 class TestSuppressionReasons:
     """Validate all supported suppression reason types."""
 
-    VALID_REASONS = ["bounce", "complaint", "unsubscribe", "manual", "compliance"]
+    VALID_REASONS = get_args(SuppressionReason)
 
     @pytest.mark.parametrize("reason", VALID_REASONS)
     def test_valid_reason(self, reason):
         entry = SuppressionList(email=f"{reason}@test.com", reason=reason)
         assert entry.reason == reason
 
+    def test_unknown_reason_rejected(self):
+        with pytest.raises(ValidationError):
+            SuppressionCreate(email="a@b.com", reason="spam")
+
 
 class TestSuppressionEmail:
     """Test email handling in suppression list."""
 
-    def test_email_stored(self):
-        entry = SuppressionList(email="Test@Example.COM", reason="manual")
-        assert entry.email == "Test@Example.COM"  # Storage preserves case; normalization is in service
-
-    def test_long_email(self):
-        long_local = "a" * 64
-        long_domain = "b" * 250 + ".com"
-        entry = SuppressionList(email=f"{long_local}@{long_domain}", reason="manual")
-        assert len(entry.email) > 100
-
-    def test_email_with_plus(self):
-        entry = SuppressionList(email="user+tag@gmail.com", reason="unsubscribe")
-        assert "+" in entry.email
+    @pytest.mark.parametrize("email", [
+        "Test@Example.COM",  # Storage preserves case; normalization is in service
+        "a" * 64 + "@" + "b" * 250 + ".com",
+        "user+tag@gmail.com",
+    ])
+    def test_email_stored_verbatim(self, email):
+        entry = SuppressionList(email=email, reason="manual")
+        assert entry.email == email
+
+
+class TestSuppressionBloomFilter:
+    """Test the in-process Bloom filter in front of suppression lookups."""
+
+    def test_no_false_negatives(self):
+        bloom = _BloomFilter(capacity=1000)
+        emails = [f"user{i}@example.com" for i in range(1000)]
+        for email in emails:
+            bloom.add(email)
+        assert all(email in bloom for email in emails)
+
+    def test_rejects_most_absent(self):
+        bloom = _BloomFilter(capacity=1000, error_rate=0.01)
+        for i in range(1000):
+            bloom.add(f"user{i}@example.com")
+        false_hits = sum(f"other{i}@example.com" in bloom for i in range(1000))
+        assert false_hits < 50
+
+
+class TestSuppressionEndpoints:
+    """Test suppression export and bulk check endpoints."""
+
+    async def test_export_csv(self, client):
+        for email, reason in [("a@x.com", "bounce"), ("b@x.com", "complaint")]:
+            await client.post("/api/v1/suppression", json={"email": email, "reason": reason})
+
+        resp = await client.get("/api/v1/suppression/export/csv", params={"reason": "bounce"})
+        assert resp.status_code == 200
+        lines = resp.text.strip().splitlines()
+        assert lines[0] == "email,reason,source,notes,created_at"
+        assert len(lines) == 2
+        assert lines[1].startswith("a@x.com,bounce,")
+
+    async def test_export_csv_uses_injected_session(self, client, db):
+        db.add(SuppressionList(email="pending@x.com", reason="manual"))
+
+        async def override():
+            yield db
+
+        app.dependency_overrides[get_db] = override
+        try:
+            resp = await client.get("/api/v1/suppression/export/csv")
+        finally:
+            app.dependency_overrides.pop(get_db)
+        assert resp.status_code == 200
+        assert "pending@x.com,manual," in resp.text
+
+    async def test_check_bulk(self, client):
+        await client.post("/api/v1/suppression", json={"email": "Gone@x.com", "reason": "bounce"})
+
+        resp = await client.post(
+            "/api/v1/suppression/check/bulk",
+            json={"emails": ["gone@x.com", "GONE@X.COM", "here@x.com"]},
+        )
+        assert resp.status_code == 200
+        assert resp.json() == {"suppressed": ["gone@x.com"], "count": 1}
+
+    async def test_re_adding_updates_existing_entry(self, client):
+        first = await client.post("/api/v1/suppression", json={"email": "dup@x.com", "reason": "bounce"})
+        second = await client.post(
+            "/api/v1/suppression",
+            json={"email": "DUP@x.com", "reason": "complaint", "source": "ses"},
+        )
+        assert first.json()["id"] == second.json()["id"]
+        assert second.json()["reason"] == "complaint"
+
+        stats = await client.get("/api/v1/suppression/stats")
+        assert stats.json() == {"total": 1, "by_reason": {"complaint": 1}}
+
+    async def test_entry_from_another_process_is_seen(self, client, db):
+        check = {"email": "late@x.com"}
+        assert (await client.get("/api/v1/suppression/check", params=check)).json()["suppressed"] is False
+        # Written straight to the table, bypassing this process's add_to_suppression
+        db.add(SuppressionList(email="late@x.com", reason="complaint"))
+        await db.commit()
+        assert (await client.get("/api/v1/suppression/check", params=check)).json()["suppressed"] is True
@@ -2,7 +2,7 @@
 
 import pytest
 
-from app.api.templates import render_template_string
+from app.api.templates import _compile_template, render_template_string
 
 
 def test_render_simple():
@@ -47,3 +47,10 @@ def test_render_no_variables():
 def test_render_invalid_syntax():
     with pytest.raises(ValueError, match="Template syntax error"):
         render_template_string("{% invalid %}", {})
+
+
+def test_render_reuses_compiled_template():
+    first = render_template_string("Hi {{ name }}", {"name": "Ann"})
+    second = render_template_string("Hi {{ name }}", {"name": "Bob"})
+    assert (first, second) == ("Hi Ann", "Hi Bob")
+    assert _compile_template.cache_info().hits >= 1
@@ -46,10 +46,9 @@ def test_webhook_update_schema():
     assert u.url is None
 
 
-def test_webhook_out_from_model():
+def test_webhook_out_from_model(now_utc):
     from app.api.webhooks import WebhookOut
     from app.models.webhook import WebhookEndpoint
-    from datetime import datetime, timezone
     wh = WebhookEndpoint(url="https://x.com/hook", events='["*"]')
     wh.id = "test-id"
     wh.active = True
@@ -58,16 +57,15 @@ def test_webhook_out_from_model():
     wh.total_deliveries = 5
     wh.total_failures = 1
     wh.max_failures = 10
-    wh.created_at = datetime.now(timezone.utc)
+    wh.created_at = now_utc
     out = WebhookOut.from_model(wh)
     assert out.events == ["*"]
     assert out.total_deliveries == 5
 
 
-def test_webhook_out_invalid_json_events():
+def test_webhook_out_invalid_json_events(now_utc):
     from app.api.webhooks import WebhookOut
     from app.models.webhook import WebhookEndpoint
-    from datetime import datetime, timezone
     wh = WebhookEndpoint(url="https://x.com", events="bad json")
     wh.id = "t"
     wh.active = True
@@ -76,7 +74,7 @@ def test_webhook_out_invalid_json_events():
     wh.total_deliveries = 0
     wh.total_failures = 0
     wh.max_failures = 10
-    wh.created_at = datetime.now(timezone.utc)
+    wh.created_at = now_utc
     out = WebhookOut.from_model(wh)
     assert out.events == []
 
@@ -100,9 +98,9 @@ def test_test_webhook_request_defaults():
 # ── Dispatcher tests ─────────────────────────────────────
 def test_sign_payload():
     from app.services.webhook_dispatcher import sign_payload
-    sig = sign_payload('{"event":"test"}', "secret123")
-    assert isinstance(sig, str)
-    assert len(sig) == 64  # SHA-256 hex
+    # Known HMAC-SHA256 hex digest of this payload/secret pair
+    expected = "7cce7a0b40cfffedbef6a37a2ba46eebe31fa2a61452e99c589ffe564ed8e49d"
+    assert sign_payload('{"event":"test"}', "secret123") == expected
 
 
 def test_sign_payload_consistency():
@@ -119,6 +117,81 @@ def test_sign_payload_different_secrets():
     assert s1 != s2
 
 
+def test_sign_payload_matches_hmac():
+    import hashlib
+    import hmac
+
+    from app.services.webhook_dispatcher import sign_payload
+    expected = hmac.new(b"key", b"hello", hashlib.sha256).hexdigest()
+    assert sign_payload("hello", "key") == expected
+    assert sign_payload(b"hello", "key") == expected
+
+
+def test_parse_events():
+    from app.services.webhook_dispatcher import _parse_events
+    assert _parse_events('["email.opened", "*"]') == frozenset({"email.opened", "*"})
+    assert _parse_events("not json") == frozenset()
+    assert _parse_events('{"a": 1}') == frozenset()
+
+
+@pytest.mark.asyncio
+async def test_dispatch_event_fans_out(monkeypatch, db):
+    import httpx
+
+    from app.models.webhook import WebhookDelivery, WebhookEndpoint
+    from app.services import webhook_dispatcher
+    from sqlalchemy import func, select
+
+    seen = []
+
+    def handler(request):
+        seen.append(str(request.url))
+        return httpx.Response(200 if request.url.host == "ok.example" else 500)
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(webhook_dispatcher, "_get_http_client", lambda: client)
+
+    db.add_all([
+        WebhookEndpoint(url="https://ok.example/hook", events='["contact.created"]'),
+        WebhookEndpoint(url="https://fail.example/hook", events='["*"]', secret="s"),
+        WebhookEndpoint(url="https://other.example/hook", events='["email.opened"]'),
+    ])
+    await db.commit()
+
+    deliveries = await webhook_dispatcher.dispatch_event(db, "contact.created", {"id": "c1"})
+    count = await db.scalar(select(func.count(WebhookDelivery.id)))
+
+    await client.aclose()
+    assert sorted(d.success for d in deliveries) == [False, True]
+    assert len(seen) == 2
+    assert count == 2
+
+
+@pytest.mark.asyncio
+async def test_dispatch_event_matches_json_escaped_event_types(monkeypatch, db):
+    import json
+
+    import httpx
+
+    from app.models.webhook import WebhookEndpoint
+    from app.services import webhook_dispatcher
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(200)))
+    monkeypatch.setattr(webhook_dispatcher, "_get_http_client", lambda: client)
+
+    event_type = 'order."vip"\\100%_off'
+    db.add_all([
+        WebhookEndpoint(url="https://escaped.example/hook", events=json.dumps([event_type])),
+        WebhookEndpoint(url="https://lookalike.example/hook", events=json.dumps(["order.vip100x_off"])),
+    ])
+    await db.commit()
+
+    deliveries = await webhook_dispatcher.dispatch_event(db, event_type, {"id": "o1"})
+
+    await client.aclose()
+    assert [d.success for d in deliveries] == [True]
+
+
 # ── API endpoint tests ──────────────────────────────────
 @pytest.mark.asyncio
 async def test_list_event_types(client):
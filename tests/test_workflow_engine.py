@@ -0,0 +1,112 @@
+"""Tests for workflow condition evaluation and actions."""
+
+import pytest
+
+from app.models import Contact
+from app.services.workflow_engine import evaluate_condition, execute_action
+
+
+def _contact(**kwargs) -> Contact:
+    defaults = {"email": "wf@example.com", "country": "US", "subscribed": True}
+    defaults.update(kwargs)
+    return Contact(**defaults)
+
+
+class TestEvaluateCondition:
+    """Test condition operators against contact fields and context."""
+
+    @pytest.mark.parametrize("operator,value,expected", [
+        ("eq", "us", True),
+        ("neq", "US", False),
+        ("contains", "u", True),
+        ("not_contains", "de", True),
+    ])
+    def test_string_operators(self, operator, value, expected):
+        step = {"field": "country", "operator": operator, "value": value}
+        assert evaluate_condition(step, _contact(), {}) is expected
+
+    def test_numeric_operators_use_context(self):
+        assert evaluate_condition({"field": "orders", "operator": "gt", "value": 2}, None, {"orders": 3})
+        assert not evaluate_condition({"field": "orders", "operator": "lt", "value": "x"}, None, {"orders": 3})
+
+    def test_missing_value_matches_is_null_only(self):
+        assert evaluate_condition({"field": "missing", "operator": "is_null"}, _contact(), {})
+        assert not evaluate_condition({"field": "missing", "operator": "eq", "value": ""}, _contact(), {})
+
+    def test_relationships_are_not_contact_fields(self):
+        step = {"field": "tags", "operator": "eq", "value": "vip"}
+        assert evaluate_condition(step, _contact(), {"tags": "vip"})
+
+    def test_boolean_and_unknown_operators(self):
+        assert evaluate_condition({"field": "subscribed", "operator": "is_true"}, _contact(), {})
+        assert not evaluate_condition({"field": "subscribed", "operator": "is_false"}, _contact(), {})
+        assert not evaluate_condition({"field": "country", "operator": "is_null"}, _contact(), {})
+        assert not evaluate_condition({"field": "country", "operator": "regex", "value": "."}, _contact(), {})
+
+
+class TestExecuteAction:
+    """Test actions that only touch the in-memory contact."""
+
+    async def test_update_field_skips_protected_fields(self):
+        contact = _contact()
+        await execute_action({"action": "update_field", "field": "email", "value": "x@y.com"}, contact, {}, None)
+        await execute_action({"action": "update_field", "field": "language", "value": "de"}, contact, {}, None)
+        assert contact.email == "wf@example.com"
+        assert contact.language == "de"
+
+
+class TestParseSteps:
+    """Test cached parsing of stored workflow steps."""
+
+    def test_parses_once_per_value(self):
+        from app.services.workflow_engine import parse_steps
+
+        raw = '[{"type": "delay", "hours": 1}]'
+        assert parse_steps(raw) == ({"type": "delay", "hours": 1},)
+        assert parse_steps(raw) is parse_steps(raw)
+
+    def test_invalid_json_yields_no_steps(self):
+        from app.services.workflow_engine import parse_steps
+
+        assert parse_steps("not json") == ()
+        assert parse_steps('{"type": "delay"}') == ()
+
+
+class TestCompileWorkflow:
+    """Test compiled workflow programs."""
+
+    def test_compiles_once_per_value(self):
+        from app.services.workflow_engine import compile_workflow
+
+        raw = '[{"type": "condition", "field": "country", "operator": "eq", "value": "us"}, {"type": "delay"}]'
+        program = compile_workflow(raw)
+        assert program is compile_workflow(raw)
+        assert [op.type for op in program] == ["condition", "delay"]
+        assert program[0].run(_contact(), {})
+        assert program[1].run is None
+
+    async def test_compiled_action_needs_contact(self):
+        from app.services.workflow_engine import compile_workflow
+
+        program = compile_workflow('[{"type": "action", "action": "subscribe"}]')
+        result = await program[0].run(None, {}, None, None)
+        assert result == {"success": False, "action": "subscribe", "error": "Unknown action or no contact"}
+
+
+class TestExecuteWorkflow:
+    """Test workflow execution against the database."""
+
+    async def test_loads_unloaded_tags_once(self, db):
+        from app.models import Workflow
+        from app.services.workflow_engine import execute_workflow
+
+        contact = _contact(email="lazy@example.com")
+        workflow = Workflow(name="Tagger", trigger_type="manual",
+                            steps='[{"type": "action", "action": "tag", "tag_name": "lazy"}]')
+        db.add_all([contact, workflow])
+        await db.commit()
+        db.expire(contact, ["tags"])
+
+        results = await execute_workflow(workflow, contact, {}, db)
+        assert results[0]["success"]
+        assert [t.name for t in contact.tags] == ["lazy"]